@@ -0,0 +1,77 @@
+"""
+Team: MSG - AXIANS
+
+Compare two benchmark results saved by benchmarks.run or benchmarks.micro.
+
+Exits with status 1 if a latency percentile grew, or a throughput dropped, by more
+than --threshold percent on any endpoint.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/flow-abc123-....json benchmarks/results/flow-def456-....json
+"""
+import argparse
+import json
+
+# Metric, and whether a higher value is better
+_METRICS = (("throughput_rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False))
+
+
+def _change(old: float, new: float) -> float | None:
+    return (new - old) / old * 100 if old else None
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list:
+    """
+    Print the changes of every endpoint measured in both results.
+
+    Returns:
+        list: The regressions beyond ``threshold`` percent, as readable strings.
+    """
+    _regressions = []
+    _baseline_levels = {_level["concurrency"]: _level for _level in baseline["levels"]}
+    for _level in candidate["levels"]:
+        _baseline_level = _baseline_levels.get(_level["concurrency"])
+        if _baseline_level is None:
+            continue
+        print(f"\nconcurrency {_level['concurrency']}: {baseline['commit']} -> {candidate['commit']}")
+        print(f"{'endpoint':<58}" + "".join(f"{_metric:>30}" for _metric, _ in _METRICS))
+        for _name, _endpoint in _level["endpoints"].items():
+            _baseline_endpoint = _baseline_level["endpoints"].get(_name)
+            if _baseline_endpoint is None:
+                continue
+            _cells = []
+            for _metric, _higher_is_better in _METRICS:
+                _old, _new = _baseline_endpoint.get(_metric), _endpoint.get(_metric)
+                if _old is None or _new is None:
+                    _cells.append(f"{'-':>30}")
+                    continue
+                _percent = _change(_old, _new)
+                _cells.append(f"{f'{_old} -> {_new}':>22}{'' if _percent is None else f'{_percent:+.1f}%':>8}")
+                if _percent is not None and (-_percent if _higher_is_better else _percent) > threshold:
+                    _regressions.append(f"{_name} @ {_level['concurrency']}: {_metric} {_old} -> {_new}")
+            print(f"{_name:<58}" + "".join(_cells))
+    return _regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark results.")
+    parser.add_argument("baseline", help="JSON results of the reference commit.")
+    parser.add_argument("candidate", help="JSON results of the commit under test.")
+    parser.add_argument("--threshold", type=float, default=10,
+                        help="Percent of degradation reported as a regression.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as _file:
+        _baseline = json.load(_file)
+    with open(args.candidate) as _file:
+        _candidate = json.load(_file)
+    _regressions = compare(_baseline, _candidate, args.threshold)
+    if _regressions:
+        print(f"\n{len(_regressions)} regressions beyond {args.threshold}%:")
+        for _regression in _regressions:
+            print(f"  {_regression}")
+        raise SystemExit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Team: MSG - AXIANS
+
+In-process microbenchmarks of the per-request overheads of the application.
+
+Results use the format of benchmarks.run, with one entry per case and the latency
+fields holding the cost of a single operation, so they are compared the same way.
+
+Benchmarks:
+    logging  CustomLogger call cost: queued versus direct file writes, and disabled levels
+    auth     get_current_user cost with the token version cached or looked up, JWT decoding,
+             and the login rate limiter check per backend
+
+Usage:
+    python -m benchmarks.micro logging [--number 20000] [--repeat 20]
+    python -m benchmarks.micro auth [--number 2000] [--repeat 20]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from .run import _percentile, save_results
+
+
+def _measure(operation, number: int, repeat: int) -> dict:
+    """
+    Time ``repeat`` rounds of ``number`` calls of ``operation``, returning the per call statistics.
+    """
+    _per_call = []
+    for _ in range(repeat):
+        _started_at = time.perf_counter()
+        for _ in range(number):
+            operation()
+        _per_call.append((time.perf_counter() - _started_at) / number)
+    _sorted = sorted(_per_call)
+    _mean = sum(_sorted) / len(_sorted)
+    return {
+        "requests": number * repeat,
+        "errors": 0,
+        "throughput_rps": round(1 / _mean, 2),
+        "mean_ms": round(_mean * 1000, 6),
+        "p50_ms": round(_percentile(_sorted, 50) * 1000, 6),
+        "p95_ms": round(_percentile(_sorted, 95) * 1000, 6),
+        "p99_ms": round(_percentile(_sorted, 99) * 1000, 6),
+        "max_ms": round(_sorted[-1] * 1000, 6),
+    }
+
+
+def logging_cases() -> dict:
+    """
+    CustomLogger calls as made by the routes, writing to log files of a temporary directory.
+    """
+    from endpoints.shared.CustomLogger import CustomLogger
+
+    _queued = CustomLogger("benchmark/queued", log_file="queued.log", queued=True)
+    _direct = CustomLogger("benchmark/direct", log_file="direct.log", queued=False)
+    _username = "bench"
+    return {
+        "info, queued file write": lambda: _queued.info("%s [get_all_items] items found", _username),
+        "info, direct file write": lambda: _direct.info("%s [get_all_items] items found", _username),
+        "debug disabled, %-style args": lambda: _queued.debug("%s [get_all_items] items found", _username),
+        "debug disabled, f-string": lambda: _queued.debug(f"{_username} [get_all_items] items found"),
+    }
+
+
+def auth_cases() -> dict:
+    """
+    Authentication of a request token, against a SQLite database of a temporary directory.
+    """
+    import jwt
+
+    from config import ALGORITHM, SECRET_KEY
+    from databases.axion.handlers.primaries.LocalUser import local_user_cache
+    from databases.axion.init_db import db, initialize_database
+    from databases.axion.models.primaries.LocalUser import LocalUser as LocalUserModel
+    from modules.login.throttle import DatabaseBackend, LoginThrottle, MemoryBackend
+    from modules.login.utils import _jwt, _jwt_keys, create_access_token, get_current_user
+
+    initialize_database()
+    _session = db.get_session()
+    _user = LocalUserModel(username="bench", password_hash="not-used")
+    _session.add(_user)
+    _session.commit()
+    _token = create_access_token({"sub": _user.username, "uid": _user.id, "ver": _user.token_version})
+
+    # Limits that are never reached, to time the counting and refund of allowed attempts
+    _memory_throttle = LoginThrottle(MemoryBackend(), window=60, per_ip=10**9, per_username=10**9)
+    _database_throttle = LoginThrottle(DatabaseBackend(), window=60, per_ip=10**9, per_username=10**9)
+
+    def _cache_miss():
+        local_user_cache.invalidate(_user.id)
+        get_current_user(_token, _session)
+
+    return {
+        "get_current_user, version cached": lambda: get_current_user(_token, _session),
+        "get_current_user, version lookup": _cache_miss,
+        "jwt.decode, raw secret": lambda: jwt.decode(_token, SECRET_KEY, algorithms=[ALGORITHM]),
+        "jwt.decode, prepared key": lambda: _jwt.decode(_token, _jwt_keys()[1], algorithms=[ALGORITHM]),
+        "login throttle hit and refund, memory backend": lambda: _memory_throttle.refund(
+            "10.0.0.1", "bench", _memory_throttle.hit("10.0.0.1", "bench")),
+        "login throttle hit and refund, database backend": lambda: _database_throttle.refund(
+            "10.0.0.1", "bench", _database_throttle.hit("10.0.0.1", "bench")),
+    }
+
+
+MICROBENCHMARKS = {
+    "logging": logging_cases,
+    "auth": auth_cases,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="In-process microbenchmarks.")
+    parser.add_argument("benchmark", choices=sorted(MICROBENCHMARKS))
+    parser.add_argument("--number", type=int, default=20000, help="Calls per round.")
+    parser.add_argument("--repeat", type=int, default=20, help="Rounds, the percentiles are over rounds.")
+    parser.add_argument("--output", help="Path of the JSON results, by default under benchmarks/results.")
+    args = parser.parse_args(argv)
+
+    _started_at = datetime.now(timezone.utc)
+    _cwd = os.getcwd()
+    # Load the configuration from the .env file of the working directory before leaving it
+    import config  # noqa: F401
+    with tempfile.TemporaryDirectory(prefix="mjpv-micro-") as _directory:
+        # Log files and databases of the cases are created relative to the working directory
+        os.chdir(_directory)
+        try:
+            _cases = MICROBENCHMARKS[args.benchmark]()
+            _endpoints = {}
+            for _name, _operation in _cases.items():
+                _endpoints[_name] = _measure(_operation, args.number, args.repeat)
+                print(f"{_name:<40}{_endpoints[_name]['mean_ms'] * 1000:>10.2f} us/op"
+                      f"{_endpoints[_name]['p99_ms'] * 1000:>10.2f} us p99")
+        finally:
+            os.chdir(_cwd)
+    save_results(f"micro-{args.benchmark}", _started_at,
+                 [{"concurrency": 1, "endpoints": _endpoints}], args.output,
+                 args={_key: _value for _key, _value in vars(args).items()})
+
+
+if __name__ == "__main__":
+    main()
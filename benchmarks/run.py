@@ -0,0 +1,441 @@
+"""
+Team: MSG - AXIANS
+
+Load benchmarks of the cafeteria API.
+
+Each run starts the real application under uvicorn on a freshly seeded SQLite
+database (or targets --url), drives it with concurrent virtual users and reports
+throughput and p50/p95/p99 latency per endpoint. Results are saved as JSON and
+compared between commits with benchmarks.compare.
+
+Scenarios:
+    flow     login -> list productos -> checkout, and a cierre de caja every --cierre-every iterations
+    login    password verification throughput (see throughput_per_core_rps)
+    refresh  access token renewal with rotating refresh tokens, no password verification
+    catalog  product catalog, plain and conditional requests answered with 304
+    reports  sales reports over a year of data
+    mixed    reads and checkouts mixed by --write-ratio, for SQLite lock contention
+    images   image uploads, then bytes of the original images versus their variants
+
+Usage:
+    python -m benchmarks.run flow --concurrency 1,8,32 --duration 30
+    python -m benchmarks.run mixed --env DB_SQLITE_JOURNAL_MODE=DELETE --env DB_SQLITE_SYNCHRONOUS=FULL
+    python -m benchmarks.run login --env BCRYPT_ROUNDS=10 --workers 4
+    python -m benchmarks.run catalog --url http://localhost:8000 --username admin --password secret
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from .server import REPO_ROOT, run_server
+
+SCENARIOS = ("flow", "login", "refresh", "catalog", "reports", "mixed", "images")
+
+
+class Recorder:
+    """
+    Latencies and errors of the requests made while recording, by endpoint.
+    """
+    def __init__(self):
+        self.recording = False
+        self.latencies = {}
+        self.errors = {}
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs):
+        """
+        Make a request and record it under ``name``, returning None on transport errors.
+        """
+        _started_at = time.perf_counter()
+        try:
+            _response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            _response = None
+        _elapsed = time.perf_counter() - _started_at
+        if self.recording:
+            self.latencies.setdefault(name, []).append(_elapsed)
+            if _response is None or _response.status_code >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        return _response
+
+    def summary(self, elapsed: float) -> dict:
+        """
+        Return the count, error count, throughput and latency percentiles (ms) of every endpoint.
+        """
+        _endpoints = {}
+        for _name, _latencies in sorted(self.latencies.items()):
+            _sorted = sorted(_latencies)
+            _endpoints[_name] = {
+                "requests": len(_sorted),
+                "errors": self.errors.get(_name, 0),
+                "throughput_rps": round(len(_sorted) / elapsed, 2),
+                "mean_ms": round(sum(_sorted) / len(_sorted) * 1000, 3),
+                "p50_ms": round(_percentile(_sorted, 50) * 1000, 3),
+                "p95_ms": round(_percentile(_sorted, 95) * 1000, 3),
+                "p99_ms": round(_percentile(_sorted, 99) * 1000, 3),
+                "max_ms": round(_sorted[-1] * 1000, 3),
+            }
+        return _endpoints
+
+
+def _percentile(sorted_values: list, percentile: float) -> float:
+    return sorted_values[max(0, math.ceil(percentile / 100 * len(sorted_values)) - 1)]
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class Context:
+    """
+    Settings and data shared by the virtual users of a run.
+    """
+    def __init__(self, args, base_url: str):
+        self.args = args
+        self.base_url = base_url
+        self.recorder = Recorder()
+        self.producto_ids = []
+        self.factura_ids = []
+        self.rng = random.Random(args.seed)
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(base_url=self.base_url, timeout=120)
+
+
+async def _login(ctx: Context, client: httpx.AsyncClient) -> dict | None:
+    _response = await ctx.recorder.request(client, "POST /login", "POST", "/login",
+                                           data={"username": ctx.args.username, "password": ctx.args.password})
+    if _response is None or _response.status_code != 200:
+        return None
+    return {"Authorization": f"Bearer {_response.json()['access_token']}"}
+
+async def _session_headers(ctx: Context, client: httpx.AsyncClient, user: dict) -> dict | None:
+    if "headers" not in user:
+        _headers = await _login(ctx, client)
+        if _headers is None:
+            return None
+        user["headers"] = _headers
+    return user["headers"]
+
+async def _checkout(ctx: Context, client: httpx.AsyncClient, headers: dict):
+    _items = [{"producto_id": _id, "cantidad": ctx.rng.randint(1, 3)}
+              for _id in ctx.rng.sample(ctx.producto_ids, min(len(ctx.producto_ids), ctx.rng.randint(1, 4)))]
+    _response = await ctx.recorder.request(client, "POST /administration/checkout", "POST",
+                                           "/administration/checkout", headers=headers,
+                                           json={"fecha": _now(), "items": _items})
+    if _response is not None and _response.status_code == 201:
+        ctx.factura_ids.append(_response.json()["id"])
+
+def _report_range(days: int) -> dict:
+    _hasta = datetime.now()
+    return {"desde": (_hasta - timedelta(days=days)).isoformat(timespec="seconds"),
+            "hasta": _hasta.isoformat(timespec="seconds")}
+
+
+async def flow(ctx: Context, client: httpx.AsyncClient, user: dict):
+    _headers = await _login(ctx, client)
+    if _headers is None:
+        return
+    await ctx.recorder.request(client, "GET /administration/productos", "GET",
+                               "/administration/productos", headers=_headers)
+    await _checkout(ctx, client, _headers)
+    user["iterations"] = user.get("iterations", 0) + 1
+    if ctx.args.cierre_every and user["iterations"] % ctx.args.cierre_every == 0:
+        await ctx.recorder.request(client, "POST /administration/cierre-caja", "POST",
+                                   "/administration/cierre-caja", headers=_headers,
+                                   json={"fecha": _now(), "hasta": _now()})
+
+async def login(ctx: Context, client: httpx.AsyncClient, user: dict):
+    await _login(ctx, client)
+
+async def refresh(ctx: Context, client: httpx.AsyncClient, user: dict):
+    if "refresh_token" not in user:
+        _response = await ctx.recorder.request(client, "POST /login", "POST", "/login",
+                                               data={"username": ctx.args.username, "password": ctx.args.password})
+        if _response is None or _response.status_code != 200:
+            return
+        user["refresh_token"] = _response.json()["refresh_token"]
+    _response = await ctx.recorder.request(client, "POST /login/refresh", "POST", "/login/refresh",
+                                           json={"refresh_token": user.pop("refresh_token")})
+    if _response is not None and _response.status_code == 200:
+        user["refresh_token"] = _response.json()["refresh_token"]
+
+async def catalog(ctx: Context, client: httpx.AsyncClient, user: dict):
+    _headers = await _session_headers(ctx, client, user)
+    if _headers is None:
+        return
+    _response = await ctx.recorder.request(client, "GET /administration/productos", "GET",
+                                           "/administration/productos", headers=_headers)
+    if _response is not None and "etag" in _response.headers:
+        await ctx.recorder.request(client, "GET /administration/productos (If-None-Match)", "GET",
+                                   "/administration/productos",
+                                   headers={**_headers, "If-None-Match": _response.headers["etag"]})
+
+async def reports(ctx: Context, client: httpx.AsyncClient, user: dict):
+    _headers = await _session_headers(ctx, client, user)
+    if _headers is None:
+        return
+    _params = _report_range(365)
+    for _report in ("top-productos", "ventas-por-hora", "ventas-diarias"):
+        await ctx.recorder.request(client, f"GET /administration/reportes/{_report}", "GET",
+                                   f"/administration/reportes/{_report}", headers=_headers, params=_params)
+
+async def mixed(ctx: Context, client: httpx.AsyncClient, user: dict):
+    _headers = await _session_headers(ctx, client, user)
+    if _headers is None:
+        return
+    if ctx.rng.random() < ctx.args.write_ratio:
+        await _checkout(ctx, client, _headers)
+        return
+    _read = ctx.rng.randrange(4)
+    if _read == 0:
+        await ctx.recorder.request(client, "GET /administration/productos", "GET",
+                                   "/administration/productos", headers=_headers)
+    elif _read == 1:
+        await ctx.recorder.request(client, "GET /administration/facturas", "GET",
+                                   "/administration/facturas", params={"limit": 50})
+    elif _read == 2 and ctx.factura_ids:
+        await ctx.recorder.request(client, "GET /administration/factura/{id}/full", "GET",
+                                   f"/administration/factura/{ctx.rng.choice(ctx.factura_ids)}/full")
+    else:
+        await ctx.recorder.request(client, "GET /administration/reportes/top-productos", "GET",
+                                   "/administration/reportes/top-productos", headers=_headers,
+                                   params=_report_range(30))
+
+
+async def _setup(ctx: Context):
+    """
+    Load the productos and some facturas used by the scenarios.
+    """
+    async with ctx.client() as _client:
+        _headers = await _login(ctx, _client)
+        if _headers is None:
+            raise SystemExit(f"Cannot log in as {ctx.args.username}")
+        _cursor = None
+        while True:
+            _response = await _client.get("/administration/productos", headers=_headers,
+                                          params={"cursor": _cursor} if _cursor else None)
+            if _response.status_code != 200:
+                break
+            _page = _response.json()
+            ctx.producto_ids.extend(_item["id"] for _item in _page["items"])
+            _cursor = _page["next_cursor"]
+            if not _cursor:
+                break
+        _response = await _client.get("/administration/facturas", params={"limit": 200})
+        if _response.status_code == 200:
+            ctx.factura_ids.extend(_item["id"] for _item in _response.json()["items"])
+
+async def _run_level(ctx: Context, scenario, concurrency: int) -> dict:
+    """
+    Run ``scenario`` with ``concurrency`` virtual users for the warmup and the measured duration.
+    """
+    ctx.recorder = Recorder()
+    _deadline = time.monotonic() + ctx.args.warmup + ctx.args.duration
+
+    async def _virtual_user():
+        _user = {}
+        async with ctx.client() as _client:
+            while time.monotonic() < _deadline:
+                await scenario(ctx, _client, _user)
+
+    _users = [asyncio.create_task(_virtual_user()) for _ in range(concurrency)]
+    await asyncio.sleep(ctx.args.warmup)
+    ctx.recorder.recording = True
+    _started_at = time.monotonic()
+    await asyncio.gather(*_users)
+    _elapsed = time.monotonic() - _started_at
+    ctx.recorder.recording = False
+
+    _endpoints = ctx.recorder.summary(_elapsed)
+    _requests = sum(_endpoint["requests"] for _endpoint in _endpoints.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(_elapsed, 3),
+        "requests": _requests,
+        "errors": sum(_endpoint["errors"] for _endpoint in _endpoints.values()),
+        "throughput_rps": round(_requests / _elapsed, 2),
+        "throughput_per_core_rps": round(_requests / _elapsed / (os.cpu_count() or 1), 2),
+        "endpoints": _endpoints,
+    }
+
+
+def _make_photo(rng: random.Random, width: int = 1600, height: int = 1200) -> bytes:
+    """
+    Return a JPEG resembling a phone photo: noisy, so it compresses like a real one.
+    """
+    from PIL import Image
+
+    _image = Image.merge("RGB", [Image.effect_noise((width, height), rng.randint(20, 60)) for _ in range(3)])
+    _buffer = io.BytesIO()
+    _image.save(_buffer, "JPEG", quality=90)
+    return _buffer.getvalue()
+
+async def _run_images(ctx: Context, concurrency: int) -> dict:
+    """
+    Upload product images, then measure the bytes served for originals and variants.
+    """
+    ctx.recorder = Recorder()
+    ctx.recorder.recording = True
+    _photos = [_make_photo(ctx.rng) for _ in range(min(ctx.args.images, 8))]
+    _remaining = list(range(ctx.args.images))
+    _started_at = time.monotonic()
+
+    async def _uploader():
+        async with ctx.client() as _client:
+            _headers = await _login(ctx, _client)
+            while _headers is not None and _remaining:
+                _index = _remaining.pop()
+                await ctx.recorder.request(
+                    _client, "POST /administration/producto", "POST", "/administration/producto",
+                    headers=_headers, params={"nombre": f"Imagen {_index}", "precio": 1},
+                    files={"file": (f"foto-{_index}.jpg", _photos[_index % len(_photos)], "image/jpeg")})
+
+    await asyncio.gather(*[_uploader() for _ in range(concurrency)])
+    _elapsed = time.monotonic() - _started_at
+
+    _payload = {"catalog_json_bytes": 0, "images": {}}
+    async with ctx.client() as _client:
+        _headers = await _login(ctx, _client)
+        _items, _cursor = [], None
+        while True:
+            _response = await _client.get("/administration/productos", headers=_headers,
+                                          params={"cursor": _cursor} if _cursor else None)
+            _payload["catalog_json_bytes"] += len(_response.content)
+            _items.extend(_response.json()["items"])
+            _cursor = _response.json()["next_cursor"]
+            if not _cursor:
+                break
+        for _item in _items:
+            if not _item.get("imagen_url"):
+                continue
+            _urls = {"original": _item["imagen_url"], **(_item.get("imagen_variantes") or {})}
+            for _kind, _url in _urls.items():
+                _image = await ctx.recorder.request(_client, f"GET /images ({_kind})", "GET", _url)
+                if _image is not None and _image.status_code == 200:
+                    _totals = _payload["images"].setdefault(_kind, {"files": 0, "bytes": 0})
+                    _totals["files"] += 1
+                    _totals["bytes"] += len(_image.content)
+    for _totals in _payload["images"].values():
+        _totals["mean_bytes"] = round(_totals["bytes"] / _totals["files"])
+
+    _endpoints = ctx.recorder.summary(_elapsed)
+    return {"concurrency": concurrency, "duration_s": round(_elapsed, 3),
+            "requests": sum(_endpoint["requests"] for _endpoint in _endpoints.values()),
+            "errors": sum(_endpoint["errors"] for _endpoint in _endpoints.values()),
+            "endpoints": _endpoints, "payload": _payload}
+
+
+def _print_level(level: dict):
+    print(f"\nconcurrency {level['concurrency']}: {level['requests']} requests, {level['errors']} errors, "
+          f"{level.get('throughput_rps', '-')} req/s")
+    print(f"{'endpoint':<58}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for _name, _endpoint in level["endpoints"].items():
+        print(f"{_name:<58}{_endpoint['throughput_rps']:>9}{_endpoint['p50_ms']:>10}"
+              f"{_endpoint['p95_ms']:>10}{_endpoint['p99_ms']:>10}{_endpoint['errors']:>8}")
+    if "payload" in level:
+        print(f"catalog JSON: {level['payload']['catalog_json_bytes']} bytes")
+        for _kind, _totals in level["payload"]["images"].items():
+            print(f"images {_kind:>8}: {_totals['files']} files, {_totals['mean_bytes']} bytes on average")
+
+def git_commit() -> str | None:
+    """
+    Return the short commit of the benchmarked tree, suffixed with -dirty if it has changes.
+    """
+    try:
+        _commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+        _dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        return f"{_commit}-dirty" if _dirty else _commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def _run(args, base_url: str) -> list:
+    _ctx = Context(args, base_url)
+    await _setup(_ctx)
+    _levels = []
+    for _concurrency in args.concurrency:
+        if args.scenario == "images":
+            _level = await _run_images(_ctx, _concurrency)
+        else:
+            _level = await _run_level(_ctx, globals()[args.scenario], _concurrency)
+        _print_level(_level)
+        _levels.append(_level)
+    return _levels
+
+
+def save_results(scenario: str, started_at: datetime, levels: list, output: str | None = None, **extra):
+    """
+    Save the levels of a run with the metadata needed to compare it, by default under benchmarks/results.
+    """
+    _commit = git_commit()
+    _results = {
+        "scenario": scenario,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "commit": _commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **extra,
+        "levels": levels,
+    }
+    _output = output or os.path.join(
+        REPO_ROOT, "benchmarks", "results",
+        f"{scenario}-{_commit or 'unknown'}-{started_at.strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(_output)), exist_ok=True)
+    with open(_output, "w") as _file:
+        json.dump(_results, _file, indent=2)
+    print(f"\nresults saved to {_output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load benchmarks of the cafeteria API.")
+    parser.add_argument("scenario", choices=SCENARIOS)
+    parser.add_argument("--concurrency", default="8",
+                        type=lambda _value: [int(_level) for _level in _value.split(",")],
+                        help="Comma separated numbers of virtual users, one run per level.")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds per level.")
+    parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before each level.")
+    parser.add_argument("--cierre-every", type=int, default=20,
+                        help="flow: iterations of a virtual user between cierres de caja, 0 for none.")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="mixed: fraction of checkouts.")
+    parser.add_argument("--images", type=int, default=20, help="images: number of images uploaded.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed of the data set and the load.")
+    parser.add_argument("--output", help="Path of the JSON results, by default under benchmarks/results.")
+
+    server = parser.add_argument_group("server")
+    server.add_argument("--url", help="Benchmark a running server instead of starting one.")
+    server.add_argument("--username", default="bench")
+    server.add_argument("--password", default="bench")
+    server.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    server.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Setting of the started server, may be repeated.")
+    server.add_argument("--productos", type=int, default=200, help="Seeded productos.")
+    server.add_argument("--facturas", type=int, default=20000, help="Seeded facturas.")
+    server.add_argument("--dias", type=int, default=365, help="Days covered by the seeded facturas.")
+    args = parser.parse_args(argv)
+
+    _env = dict(_pair.split("=", 1) for _pair in args.env)
+    _seed_args = ["--productos", str(args.productos), "--facturas", str(args.facturas),
+                  "--dias", str(args.dias), "--seed", str(args.seed)]
+    _started_at = datetime.now(timezone.utc)
+    with nullcontext(args.url) if args.url else run_server(_env, args.workers, _seed_args) as _base_url:
+        _levels = asyncio.run(_run(args, _base_url))
+
+    save_results(args.scenario, _started_at, _levels, args.output,
+                 server={"url": args.url, "workers": args.workers, "env": _env},
+                 args={_key: _value for _key, _value in vars(args).items() if _key != "password"})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Team: MSG - AXIANS
+
+Seed a database with a realistic data set for the benchmarks.
+
+The data set is a menu of productos and a year of facturas with their detalles,
+every past day closed by a cierre de caja, plus the benchmark user. The database
+is the one configured by the DB_AXION_* settings, which must be empty.
+
+Usage:
+    DB_AXION_DATABASE=/tmp/bench.db python -m benchmarks.seed [--productos 200] [--facturas 20000]
+"""
+import argparse
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select, text
+
+from databases.axion.handlers.primaries.VentaDiaria import VentaDiaria
+from databases.axion.init_db import db, initialize_database
+from databases.axion.models.primaries.CierreCaja import \
+    CierreCaja as CierreCajaModel
+from databases.axion.models.primaries.DetalleFactura import \
+    DetalleFactura as DetalleFacturaModel
+from databases.axion.models.primaries.Factura import Factura as FacturaModel
+from databases.axion.models.primaries.LocalUser import \
+    LocalUser as LocalUserModel
+from databases.axion.models.primaries.Producto import Producto as ItemModel
+from modules.login.utils import pwd_context
+
+BENCH_USERNAME = "bench"
+BENCH_PASSWORD = "bench"
+
+_BATCH_SIZE = 5000
+
+
+def _insert_batched(session, model, rows: list):
+    for _start in range(0, len(rows), _BATCH_SIZE):
+        session.execute(insert(model), rows[_start:_start + _BATCH_SIZE])
+
+def seed(session, productos: int, facturas: int, dias: int, rng: random.Random) -> dict:
+    """
+    Insert the benchmark data set.
+
+    Args:
+        session: The database session.
+        productos (int): The number of productos of the menu.
+        facturas (int): The number of facturas, spread over the last ``dias`` days.
+        dias (int): The number of days covered, today included and left open.
+        rng (random.Random): The random generator, seeded for reproducible data sets.
+
+    Returns:
+        dict: The number of rows inserted per table.
+    """
+    if session.scalar(select(func.count()).select_from(FacturaModel)):
+        raise SystemExit("The database already has facturas, seed an empty database.")
+
+    _precios = {_id: Decimal(rng.randrange(10, 160)) * Decimal("0.05") for _id in range(1, productos + 1)}
+    _insert_batched(session, ItemModel, [
+        {"id": _id, "nombre": f"Producto {_id:03d}", "descripcion": f"Descripcion del producto {_id:03d}",
+         "precio": _precio}
+        for _id, _precio in _precios.items()])
+
+    _today = date.today()
+    _fechas = sorted(
+        datetime.combine(_today - timedelta(days=rng.randrange(dias)), time(7)) +
+        timedelta(seconds=rng.randrange(13 * 3600))
+        for _ in range(facturas))
+
+    _facturas, _detalles, _totales_por_dia = [], [], {}
+    for _factura_id, _fecha in enumerate(_fechas, start=1):
+        _total = Decimal(0)
+        for _producto_id in rng.sample(range(1, productos + 1), rng.randint(1, min(4, productos))):
+            _cantidad = rng.randint(1, 3)
+            _precio_final = _precios[_producto_id] * _cantidad
+            _total += _precio_final
+            _detalles.append({"factura_id": _factura_id, "producto_id": _producto_id, "cantidad": _cantidad,
+                              "precio_unitario": _precios[_producto_id], "precio_final": _precio_final})
+        _facturas.append({"id": _factura_id, "fecha": _fecha, "total": _total, "cierre_caja_id": None})
+        _totales_por_dia[_fecha.date()] = _totales_por_dia.get(_fecha.date(), Decimal(0)) + _total
+
+    # Every past day is closed at the end of the day, today is still open
+    _cierres = {}
+    for _dia in sorted(_totales_por_dia):
+        if _dia < _today:
+            _cierres[_dia] = {"id": len(_cierres) + 1, "fecha": datetime.combine(_dia, time(21)),
+                              "total_ventas": _totales_por_dia[_dia]}
+    for _factura in _facturas:
+        _cierre = _cierres.get(_factura["fecha"].date())
+        _factura["cierre_caja_id"] = _cierre["id"] if _cierre else None
+
+    _insert_batched(session, CierreCajaModel, list(_cierres.values()))
+    _insert_batched(session, FacturaModel, _facturas)
+    _insert_batched(session, DetalleFacturaModel, _detalles)
+    if session.scalar(select(LocalUserModel.id).where(LocalUserModel.username == BENCH_USERNAME)) is None:
+        session.execute(insert(LocalUserModel), [{"username": BENCH_USERNAME,
+                                                  "password_hash": pwd_context.hash(BENCH_PASSWORD)}])
+    if session.get_bind().dialect.name == "postgresql":
+        # Explicit ids do not advance the sequences used by the application inserts
+        for _table in ("productos", "facturas", "cierres_caja"):
+            session.execute(text(f"SELECT setval(pg_get_serial_sequence('{_table}', 'id'), "
+                                 f"(SELECT COALESCE(MAX(id), 1) FROM {_table}))"))
+    session.commit()
+    VentaDiaria().rebuild(session)
+    return {"productos": productos, "facturas": len(_facturas), "detalles_facturas": len(_detalles),
+            "cierres_caja": len(_cierres)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the benchmark data set.")
+    parser.add_argument("--productos", type=int, default=200, help="Number of productos of the menu.")
+    parser.add_argument("--facturas", type=int, default=20000, help="Number of facturas.")
+    parser.add_argument("--dias", type=int, default=365, help="Number of days covered by the facturas.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible data sets.")
+    args = parser.parse_args(argv)
+
+    initialize_database()
+    session = db.get_session()
+    try:
+        _counts = seed(session, args.productos, args.facturas, args.dias, random.Random(args.seed))
+        print(", ".join(f"{_table}: {_count}" for _table, _count in _counts.items()))
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
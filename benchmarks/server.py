@@ -0,0 +1,95 @@
+"""
+Team: MSG - AXIANS
+
+Run the application under uvicorn in a throwaway directory for the benchmarks.
+"""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Settings of the benchmarked application, overridden by the environment given to run_server
+DEFAULT_ENV = {
+    "SECRET_KEY": "benchmark-secret-key-of-at-least-32-bytes",
+    "ALGORITHM": "HS256",
+    "FRONTEND_API_URL": "http://localhost",
+    # Every virtual user logs in as the same user from the same IP
+    "LOGIN_RATE_LIMIT_PER_IP": "0",
+    "LOGIN_RATE_LIMIT_PER_USERNAME": "0",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as _socket:
+        _socket.bind(("127.0.0.1", 0))
+        return _socket.getsockname()[1]
+
+def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float):
+    _deadline = time.monotonic() + timeout
+    while time.monotonic() < _deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/metrics", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"The server did not start within {timeout} seconds")
+
+def seed_database(env: dict, seed_args: list):
+    """
+    Seed the database configured in ``env`` with benchmarks.seed.
+    """
+    subprocess.run([sys.executable, "-m", "benchmarks.seed", *seed_args],
+                   cwd=env["BENCHMARK_DIR"], env={**os.environ, **env, "PYTHONPATH": REPO_ROOT}, check=True)
+
+@contextmanager
+def run_server(env: dict | None = None, workers: int = 1, seed_args: list | None = None,
+               startup_timeout: float = 60):
+    """
+    Start the application on a free port with a fresh SQLite database, stopping it on exit.
+
+    The server runs in a temporary directory holding its database, images and logs.
+    The database is seeded first unless ``seed_args`` is None.
+
+    Args:
+        env (dict | None): Settings overriding DEFAULT_ENV, e.g. {"LOG_QUEUE": "false"}.
+        workers (int): The number of uvicorn worker processes.
+        seed_args (list | None): The arguments of benchmarks.seed.
+        startup_timeout (float): Seconds to wait for the server to answer.
+
+    Yields:
+        str: The base URL of the server.
+    """
+    _directory = tempfile.mkdtemp(prefix="mjpv-benchmark-")
+    _env = {**DEFAULT_ENV, "DB_AXION_DATABASE": os.path.join(_directory, "benchmark.db"), **(env or {}),
+            "BENCHMARK_DIR": _directory}
+    _port = _free_port()
+    _base_url = f"http://127.0.0.1:{_port}"
+    _process = None
+    try:
+        if seed_args is not None:
+            seed_database(_env, seed_args)
+        _process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(_port),
+             "--workers", str(workers), "--log-level", "warning", "--no-access-log", "--app-dir", REPO_ROOT],
+            cwd=_directory, env={**os.environ, **_env, "PYTHONPATH": REPO_ROOT})
+        _wait_ready(_base_url, _process, startup_timeout)
+        yield _base_url
+    finally:
+        if _process is not None:
+            _process.terminate()
+            try:
+                _process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                _process.kill()
+        shutil.rmtree(_directory, ignore_errors=True)
@@ -19,3 +19,111 @@ DB_AXION_DRIVERNAME = os.getenv("DB_AXION_DRIVERNAME")
 FRONTEND_API_URL = os.getenv("FRONTEND_API_URL")
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
+
+"""
+Size of the thread pool that runs the synchronous endpoints and their database work
+"""
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "40"))
+
+"""
+Password hashing: bcrypt cost factor and the bounded worker pool that runs it.
+Requests beyond PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE are rejected with a 429
+"""
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+
+"""
+Authenticated user cache: seconds an entry is served and maximum number of cached tokens.
+The cache is per worker, so a password change made on another worker reaches access
+tokens once the entry expires. Refresh tokens are always checked against the database
+"""
+LOCAL_USER_CACHE_TTL = int(os.getenv("LOCAL_USER_CACHE_TTL", "60"))
+LOCAL_USER_CACHE_SIZE = int(os.getenv("LOCAL_USER_CACHE_SIZE", "1024"))
+
+"""
+Token lifetimes: minutes an access token is accepted, and minutes a refresh token can renew it
+without the password. Logging out revokes both until they expire
+"""
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", "720"))
+
+"""
+Login rate limiting: sliding window in seconds and failed login attempts allowed within it per
+client IP and per username (0 disables the limit). Every attempt is counted before verifying the
+password and refunded if the login succeeds, attempts over the limit are rejected with a 429.
+The "memory" backend keeps at most LOGIN_RATE_LIMIT_MAX_KEYS keys per worker, the "database"
+backend shares the windows between workers and nodes.
+Behind a reverse proxy, LOGIN_CLIENT_IP_HEADER names the header it sets to the client address,
+e.g. X-Forwarded-For, whose last entry is used. Only set it if every request goes through the proxy
+"""
+LOGIN_RATE_LIMIT_WINDOW = int(os.getenv("LOGIN_RATE_LIMIT_WINDOW", "60"))
+LOGIN_RATE_LIMIT_PER_IP = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "30"))
+LOGIN_RATE_LIMIT_PER_USERNAME = int(os.getenv("LOGIN_RATE_LIMIT_PER_USERNAME", "10"))
+LOGIN_RATE_LIMIT_BACKEND = os.getenv("LOGIN_RATE_LIMIT_BACKEND", "memory")
+LOGIN_RATE_LIMIT_MAX_KEYS = int(os.getenv("LOGIN_RATE_LIMIT_MAX_KEYS", "10000"))
+LOGIN_CLIENT_IP_HEADER = os.getenv("LOGIN_CLIENT_IP_HEADER", "")
+
+"""
+Product catalog snapshot: maximum seconds a snapshot is served, bounds staleness across workers
+"""
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", "300"))
+
+"""
+List endpoints: default and maximum number of rows per page
+"""
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "200"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+"""
+Database connection pool, sized for WORKER_THREADS, and SQLite tuning profile
+"""
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(WORKER_THREADS)))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_SQLITE_JOURNAL_MODE = os.getenv("DB_SQLITE_JOURNAL_MODE", "WAL")
+DB_SQLITE_SYNCHRONOUS = os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL")
+DB_SQLITE_MMAP_SIZE = int(os.getenv("DB_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_SQLITE_CACHE_SIZE = int(os.getenv("DB_SQLITE_CACHE_SIZE", str(-64 * 1024)))
+DB_SQLITE_BUSY_TIMEOUT = int(os.getenv("DB_SQLITE_BUSY_TIMEOUT", "5000"))
+
+"""
+Product images: upload directory and limits, widths and encoding of the resized variants,
+and the bounded worker pool that renders them
+"""
+IMAGES_DIR = os.getenv("IMAGES_DIR", "images")
+IMAGE_UPLOAD_CHUNK_SIZE = int(os.getenv("IMAGE_UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+IMAGE_MAX_UPLOAD_SIZE = int(os.getenv("IMAGE_MAX_UPLOAD_SIZE", str(20 * 1024 * 1024)))
+IMAGE_VARIANT_WIDTHS = [int(_width) for _width in os.getenv("IMAGE_VARIANT_WIDTHS", "160,320,640").split(",")]
+IMAGE_VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "WEBP").upper()
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(os.cpu_count() or 1)))
+IMAGE_QUEUE_SIZE = int(os.getenv("IMAGE_QUEUE_SIZE", "16"))
+# Pixels decoded per upload at most, larger images are rejected before they are decoded
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(50 * 1000 * 1000)))
+
+"""
+Image garbage collection: minutes between runs (0 disables the job) and seconds an
+unreferenced image is kept, so uploads are not collected before their product is saved
+"""
+IMAGE_GC_INTERVAL_MINUTES = int(os.getenv("IMAGE_GC_INTERVAL_MINUTES", "60"))
+IMAGE_GC_GRACE_PERIOD = int(os.getenv("IMAGE_GC_GRACE_PERIOD", "3600"))
+
+"""
+Logging: level of the application loggers and whether log files are written by a
+background thread (LOG_QUEUE) instead of the request threads
+"""
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() in ("1", "true", "yes")
+
+"""
+Structured request log (logs/requests.log): fraction of requests logged, 0 disables it
+"""
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1.0"))
+
+"""
+Request bodies: largest body accepted, checked before it is read so oversized uploads
+are never spooled to memory or disk. Defaults to the image limit plus multipart overhead
+"""
+REQUEST_MAX_BODY_SIZE = int(os.getenv("REQUEST_MAX_BODY_SIZE", str(IMAGE_MAX_UPLOAD_SIZE + 64 * 1024)))
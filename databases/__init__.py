@@ -8,4 +8,6 @@ from .axion.handlers import *
 from .axion.init_db import *
 from .axion.models import *
 from .axion.schemas import *
+from .shared.cache import *
 from .shared.database import *
+from .shared.types import *
@@ -1,46 +1,74 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from databases.axion.handlers.primaries.Factura import \
-    Factura as FacturaHandler
+from databases.axion.handlers.primaries.VentaDiaria import VentaDiaria
 from databases.axion.models.primaries.CierreCaja import \
     CierreCaja as CierreCajaModel
+from databases.axion.models.primaries.Factura import Factura as FacturaModel
 from databases.axion.schemas.primaries.CierreCaja import (CierreCajaSchema,
                                                           RequestCierreCaja)
-from databases.shared.database import DatabaseException
+from databases.shared.database import (ConflictException, DatabaseException,
+                                       InvalidRequestException)
+from databases.shared.pagination import paginate
 
 
 class CierreCaja:
     def create_cierre_caja(self, db: Session, cierre_caja: RequestCierreCaja):
+        """
+        Close the cash register over a set of open facturas in a single transaction.
+
+        The facturas are either the ones listed in ``factura_id`` or, when no ids
+        are given, every factura not yet closed with ``fecha`` up to ``hasta``.
+        They are linked with one bulk UPDATE and totalled with one SUM aggregate, and the
+        ventas_diarias rollup is updated in the same transaction.
+
+        Raises:
+            ConflictException: If some of the listed facturas do not exist or are already closed.
+        """
         try:
-            _factura_sum = 0
-            for factura_id in cierre_caja.factura_id:
-                _factura = FacturaHandler().get_factura_by_id(db, factura_id)
-                if _factura is None:
-                    raise DatabaseException(f"Factura with id {factura_id} not found")
-                _factura_sum += _factura.total
-            _factura_sum = round(_factura_sum, 2)
+            # RequestCierreCaja guarantees one of factura_id or hasta
+            if cierre_caja.factura_id:
+                _factura_ids = set(cierre_caja.factura_id)
+                _condition = FacturaModel.id.in_(_factura_ids)
+            else:
+                _factura_ids = None
+                _condition = FacturaModel.fecha <= cierre_caja.hasta
+
             _cierre_caja = CierreCajaModel(
                 fecha=cierre_caja.fecha,
-                total_ventas=_factura_sum,
+                total_ventas=0,
             )
             db.add(_cierre_caja)
+            db.flush()
+
+            _updated = db.query(FacturaModel).filter(
+                _condition,
+                FacturaModel.cierre_caja_id.is_(None),
+            ).update({FacturaModel.cierre_caja_id: _cierre_caja.id}, synchronize_session=False)
+            if _factura_ids is not None and _updated != len(_factura_ids):
+                raise ConflictException(
+                    f"{len(_factura_ids) - _updated} of the requested facturas were not found or are already closed")
+
+            _factura_sum = db.query(func.coalesce(func.sum(FacturaModel.total), 0)).filter(
+                FacturaModel.cierre_caja_id == _cierre_caja.id).scalar()
+            _cierre_caja.total_ventas = _factura_sum
+            VentaDiaria().add_cierre_caja(db, _cierre_caja.id)
             db.commit()
             db.refresh(_cierre_caja)
-
-            for factura_id in cierre_caja.factura_id:
-                _factura = FacturaHandler().get_factura_by_id(db, factura_id)
-                _factura.cierre_caja_id = _cierre_caja.id
-                db.commit()
-                db.refresh(_factura)
             return _cierre_caja
+        except InvalidRequestException:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise DatabaseException(
                 f"[create_cierre_caja] An error occurred while creating the cierre caja: {str(e)}") from e
         
-    def get_cierres_caja(self, db: Session):
+    def get_cierres_caja(self, db: Session, after: list | None = None, limit: int = 200):
         try:
-            return db.query(CierreCajaModel).all()
+            return paginate(db.query(CierreCajaModel), [CierreCajaModel.fecha, CierreCajaModel.id], after, limit)
+        except InvalidRequestException:
+            raise
         except Exception as e:
             raise DatabaseException(
                 f"[get_cierres_caja] An error occurred while getting the cierres caja: {str(e)}") from e
@@ -5,13 +5,17 @@ from databases.axion.models.primaries.DetalleFactura import \
     DetalleFactura as DetalleFacturaModel
 from databases.axion.schemas.primaries.Factura import (DetalleFacturaSchema,
                                                        RequestDetalleFactura)
-from databases.shared.database import DatabaseException
+from databases.shared.database import (DatabaseException,
+                                       InvalidRequestException)
+from databases.shared.pagination import paginate
 
 
 class DetalleFactura:
-    def get_detalles_facturas(self, db: Session, skip: int = 0, limit: int = 200):
+    def get_detalles_facturas(self, db: Session, after: list | None = None, limit: int = 200):
         try:
-            return db.query(DetalleFacturaModel).offset(skip).limit(limit).all()
+            return paginate(db.query(DetalleFacturaModel), [DetalleFacturaModel.id], after, limit)
+        except InvalidRequestException:
+            raise
         except Exception as e:
             raise DatabaseException(
                 f"[get_detalles_facturas] An error occurred while getting the detalles facturas: {str(e)}") from e
@@ -22,7 +26,6 @@ class DetalleFactura:
             if _producto is None:
                 raise DatabaseException(f"Producto with id {detalle_factura.producto_id} not found")
             _precio_final = _producto.precio * detalle_factura.cantidad
-            _precio_final = round(_precio_final, 2)
             _detalle_factura = DetalleFacturaModel(
                 producto_id=detalle_factura.producto_id,
                 cantidad=detalle_factura.cantidad,
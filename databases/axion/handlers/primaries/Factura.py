@@ -1,45 +1,109 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
 
-from databases.axion.handlers.primaries.DetalleFactura import DetalleFactura
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from databases.axion.handlers.primaries.VentaDiaria import VentaDiaria
+from databases.axion.models.primaries.DetalleFactura import \
+    DetalleFactura as DetalleFacturaModel
 from databases.axion.models.primaries.Factura import Factura as FacturaModel
+from databases.axion.models.primaries.Producto import \
+    Producto as ProductoModel
 from databases.axion.schemas.primaries.Factura import (FacturaSchema,
+                                                       RequestCheckout,
                                                        RequestFactura)
-from databases.shared.database import DatabaseException
+from databases.shared.database import (ConflictException, DatabaseException,
+                                       InvalidRequestException,
+                                       NotFoundException)
+from databases.shared.pagination import paginate
 
 
 class Factura:
 
     def create_factura(self, db: Session, factura: RequestFactura):
         try:
-            _details_sum = 0
-            for detalle_id in factura.detalle_ids:
-                _detalle = DetalleFactura().get_detalle_factura_by_id(db, detalle_id)
-                if _detalle is None:
-                    raise DatabaseException(f"DetalleFactura with id {detalle_id} not found")
-                _details_sum += _detalle.precio_final
+            _detalle_ids = set(factura.detalle_ids)
+            _detalles = db.query(DetalleFacturaModel).filter(DetalleFacturaModel.id.in_(_detalle_ids)).all()
+            _missing = _detalle_ids - {_detalle.id for _detalle in _detalles}
+            if _missing:
+                raise NotFoundException(f"DetalleFactura with ids {sorted(_missing)} not found")
+            # Moving a detalle to another factura would also count it twice in ventas_diarias
+            _linked = sorted(_detalle.id for _detalle in _detalles if _detalle.factura_id is not None)
+            if _linked:
+                raise ConflictException(f"DetalleFactura with ids {_linked} already belong to a factura")
             _factura = FacturaModel(
                 fecha=factura.fecha,
-                total=_details_sum,
+                total=sum(_detalle.precio_final for _detalle in _detalles),
+                detalles=_detalles,
             )
             db.add(_factura)
+            VentaDiaria().add_detalles(db, _factura.fecha, _detalles)
             db.commit()
             db.refresh(_factura)
-
-        # Actualizar la relación de detalles
-            for detalle_id in factura.detalle_ids:
-                _detalle = DetalleFactura().get_detalle_factura_by_id(db, detalle_id)
-                _detalle.factura_id = _factura.id
-                db.commit()
-                db.refresh(_detalle)
             return _factura
+        except InvalidRequestException:
+            db.rollback()
+            raise
         except Exception as e:
             db.rollback()
             raise DatabaseException(
                 f"[create_factura] An error occurred while creating the factura: {str(e)}") from e
+
+    def checkout(self, db: Session, checkout: RequestCheckout):
+        """
+        Create a factura together with all of its detalles in a single transaction.
+
+        Prices are resolved with one query over the requested productos and the
+        factura and its detalles are inserted with a single commit, then read back
+        with their detalles in two queries.
+
+        Raises:
+            NotFoundException: If some of the productos do not exist.
+        """
+        try:
+            _producto_ids = {item.producto_id for item in checkout.items}
+            _productos = {
+                _producto.id: _producto
+                for _producto in db.query(ProductoModel).filter(ProductoModel.id.in_(_producto_ids)).all()
+            }
+            _missing = _producto_ids - _productos.keys()
+            if _missing:
+                raise NotFoundException(f"Productos with ids {sorted(_missing)} not found")
+
+            _detalles = []
+            for item in checkout.items:
+                _precio_unitario = _productos[item.producto_id].precio
+                _detalles.append(DetalleFacturaModel(
+                    producto_id=item.producto_id,
+                    cantidad=item.cantidad,
+                    precio_unitario=_precio_unitario,
+                    precio_final=_precio_unitario * item.cantidad,
+                ))
+            _factura = FacturaModel(
+                fecha=checkout.fecha,
+                total=sum(_detalle.precio_final for _detalle in _detalles),
+                detalles=_detalles,
+            )
+            db.add(_factura)
+            VentaDiaria().add_detalles(db, _factura.fecha, _detalles)
+            db.commit()
+            return (db.query(FacturaModel)
+                    .options(selectinload(FacturaModel.detalles))
+                    .filter(FacturaModel.id == _factura.id)
+                    .one())
+        except InvalidRequestException:
+            db.rollback()
+            raise
+        except Exception as e:
+            db.rollback()
+            raise DatabaseException(
+                f"[checkout] An error occurred while creating the factura: {str(e)}") from e
         
-    def get_facturas(self, db: Session):
+    def get_facturas(self, db: Session, after: list | None = None, limit: int = 200):
         try:
-            return db.query(FacturaModel).all()
+            return paginate(db.query(FacturaModel), [FacturaModel.fecha, FacturaModel.id], after, limit)
+        except InvalidRequestException:
+            raise
         except Exception as e:
             db.rollback()
             raise DatabaseException(
@@ -52,9 +116,72 @@ class Factura:
             raise DatabaseException(
                 f"[get_factura_by_id] An error occurred while getting the factura by ID: {str(e)}") from e
         
+    def get_facturas_full(self, db: Session, ids: list):
+        """
+        Get facturas with their detalles and productos in a constant number of queries.
+
+        The detalles of every factura are loaded with one SELECT ... IN and their
+        productos are joined into that same query.
+
+        Raises:
+            NotFoundException: If some of the facturas do not exist.
+        """
+        try:
+            _facturas = (
+                db.query(FacturaModel)
+                .options(selectinload(FacturaModel.detalles).joinedload(DetalleFacturaModel.producto))
+                .filter(FacturaModel.id.in_(ids))
+                .order_by(FacturaModel.id)
+                .all()
+            )
+            _missing = set(ids) - {_factura.id for _factura in _facturas}
+            if _missing:
+                raise NotFoundException(f"Facturas with ids {sorted(_missing)} not found")
+            return _facturas
+        except InvalidRequestException:
+            raise
+        except Exception as e:
+            raise DatabaseException(
+                f"[get_facturas_full] An error occurred while getting the facturas with their detalles: {str(e)}") from e
+
     def get_factura_by_cierre_caja_id(self, db: Session, cierre_caja_id: int):
         try:
             return db.query(FacturaModel).filter_by(cierre_caja_id=cierre_caja_id).all()
         except Exception as e:
             raise DatabaseException(
-                f"[get_factura_by_cierre_caja_id] An error occurred while getting the factura by cierre caja ID: {str(e)}") from e
\ No newline at end of file
+                f"[get_factura_by_cierre_caja_id] An error occurred while getting the factura by cierre caja ID: {str(e)}") from e
+
+    def iter_export_rows(self, db: Session, desde: datetime, hasta: datetime, batch_size: int = 1000):
+        """
+        Yield every detalle of the facturas between ``desde`` and ``hasta`` joined with its
+        factura and producto, ordered by factura.
+
+        Rows are streamed from the database in batches of ``batch_size`` (server-side
+        cursor on Postgres), so memory stays flat regardless of the range. Facturas
+        without detalles yield a single row with empty detalle columns.
+        """
+        _query = (
+            select(
+                FacturaModel.id.label("factura_id"),
+                FacturaModel.fecha,
+                FacturaModel.total,
+                FacturaModel.cierre_caja_id,
+                DetalleFacturaModel.id.label("detalle_id"),
+                DetalleFacturaModel.producto_id,
+                ProductoModel.nombre.label("producto_nombre"),
+                DetalleFacturaModel.cantidad,
+                DetalleFacturaModel.precio_unitario,
+                DetalleFacturaModel.precio_final,
+            )
+            .outerjoin(DetalleFacturaModel, DetalleFacturaModel.factura_id == FacturaModel.id)
+            .outerjoin(ProductoModel, ProductoModel.id == DetalleFacturaModel.producto_id)
+            .where(FacturaModel.fecha >= desde, FacturaModel.fecha <= hasta)
+            .order_by(FacturaModel.fecha, FacturaModel.id, DetalleFacturaModel.id)
+            .execution_options(yield_per=batch_size)
+        )
+        try:
+            for _row in db.execute(_query):
+                yield _row._mapping
+        except Exception as e:
+            raise DatabaseException(
+                f"[iter_export_rows] An error occurred while exporting the facturas: {str(e)}") from e
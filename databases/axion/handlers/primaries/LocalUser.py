@@ -5,12 +5,19 @@ Module that contains handlers for local user management.
 """
 from sqlalchemy.orm import Session
 
+from config import LOCAL_USER_CACHE_SIZE, LOCAL_USER_CACHE_TTL
 from databases.axion.models.primaries.LocalUser import \
     LocalUser as LocalUserModel
 from databases.axion.schemas.primaries.LocalUser import \
     LocalUser as LocalUserSchema
 from databases.axion.schemas.primaries.LocalUser import RequestLocalUser
-from databases.shared.database import DatabaseException
+from databases.shared.cache import TTLCache
+from databases.shared.database import (DatabaseException,
+                                       InvalidRequestException)
+from databases.shared.pagination import paginate
+
+# (username, token version) of local users by id, filled by decode_token and invalidated here on changes
+local_user_cache = TTLCache(maxsize=LOCAL_USER_CACHE_SIZE, ttl=LOCAL_USER_CACHE_TTL)
 
 
 class LocalUser:
@@ -41,22 +48,24 @@ class LocalUser:
             raise DatabaseException(
                 f"[create_local_user] An error occurred while updating the local user: {str(e)}") from e
 
-    def get_all_local_users(self, db: Session, skip: int = 0, limit: int = 100):
+    def get_all_local_users(self, db: Session, after: list | None = None, limit: int = 100):
         """
-        Get all local users.
+        Get a page of local users ordered by id.
 
         Args:
 
             db (Session): The database session.
-            skip (int, optional): The number of local users to skip. Defaults to 0.
+            after (list, optional): The decoded cursor of the previous page. Defaults to None.
             limit (int, optional): The maximum number of local users to return. Defaults to 100.
 
         Returns:
 
-            list: A list of all local users.
+            tuple: The local users of the page and the cursor of the next page.
         """
         try:
-            return db.query(LocalUserModel).offset(skip).limit(limit).all()
+            return paginate(db.query(LocalUserModel), [LocalUserModel.id], after, limit)
+        except InvalidRequestException:
+            raise
         except Exception as e:
             raise DatabaseException(
                 f"[get_all_local_users] An error occurred while get all local users: {str(e)}") from e
@@ -119,6 +128,7 @@ class LocalUser:
             _local_user = db.query(LocalUserModel).filter_by(id=id).first()
             db.delete(_local_user)
             db.commit()
+            local_user_cache.invalidate(id)
             return _local_user
         except Exception as e:
             db.rollback()
@@ -132,7 +142,7 @@ class LocalUser:
                     username: str,
                     password_hash: str):
         """
-        Update a local user by ID.
+        Update a local user by ID, invalidating the tokens issued to the user.
 
         Args:
 
@@ -150,7 +160,9 @@ class LocalUser:
             _local_user = db.query(LocalUserModel).filter_by(id=id).first()
             _local_user.username = username
             _local_user.password_hash = password_hash
+            _local_user.token_version = LocalUserModel.token_version + 1
             db.commit()
+            local_user_cache.invalidate(id)
             db.refresh(_local_user)
             return _local_user
         except Exception as e:
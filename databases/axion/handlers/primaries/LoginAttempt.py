@@ -0,0 +1,108 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains handlers for the login rate limiter state.
+"""
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from databases.axion.models.primaries.LoginAttempt import \
+    LoginAttempt as LoginAttemptModel
+from databases.shared.database import DatabaseException
+
+
+class LoginAttempt:
+    """
+    Class that contains methods for the login rate limiter state.
+    """
+
+    def get_login_attempt(self, db: Session, key: str) -> tuple | None:
+        """
+        Return the stored ``(window_start, previous, current)`` of ``key``, None if it has no row.
+
+        Args:
+            db (Session): The database session.
+            key (str): The rate limited key.
+
+        Returns:
+            tuple | None: The sliding window of the key.
+        """
+        try:
+            _row = (db.query(LoginAttemptModel.window_start, LoginAttemptModel.previous, LoginAttemptModel.current)
+                    .filter(LoginAttemptModel.key == key)
+                    .first())
+            return None if _row is None else tuple(_row)
+        except Exception as e:
+            raise DatabaseException(
+                f"[get_login_attempt] An error occurred while getting the login attempts: {str(e)}") from e
+
+    def update_login_attempt(self, db: Session, key: str, update, retries: int = 10):
+        """
+        Atomically read and update the sliding window of ``key``.
+
+        The row is only written if it did not change since it was read, otherwise it is read
+        again, so workers and nodes sharing the database do not lose each other's attempts.
+
+        Args:
+            db (Session): The database session.
+            key (str): The rate limited key.
+            update (Callable): Called with the stored ``(window_start, previous, current)``,
+                or None if the key has no row, returns the new window and a result.
+            retries (int): Maximum number of concurrent changes to retry on.
+
+        Returns:
+            The result returned by ``update``.
+        """
+        try:
+            for _ in range(retries):
+                _row = (db.query(LoginAttemptModel.window_start, LoginAttemptModel.previous, LoginAttemptModel.current)
+                        .filter(LoginAttemptModel.key == key)
+                        .first())
+                _state = None if _row is None else tuple(_row)
+                (_window_start, _previous, _current), _result = update(_state)
+                if _state is None:
+                    db.add(LoginAttemptModel(key=key, window_start=_window_start, previous=_previous, current=_current))
+                    try:
+                        db.commit()
+                        return _result
+                    except IntegrityError:
+                        # Inserted concurrently, read it again
+                        db.rollback()
+                        continue
+                _updated = (db.query(LoginAttemptModel)
+                            .filter(LoginAttemptModel.key == key,
+                                    LoginAttemptModel.window_start == _state[0],
+                                    LoginAttemptModel.previous == _state[1],
+                                    LoginAttemptModel.current == _state[2])
+                            .update({"window_start": _window_start, "previous": _previous, "current": _current},
+                                    synchronize_session=False))
+                db.commit()
+                if _updated:
+                    return _result
+            raise DatabaseException(f"too many concurrent updates of {key}")
+        except Exception as e:
+            db.rollback()
+            raise DatabaseException(
+                f"[update_login_attempt] An error occurred while updating the login attempts: {str(e)}") from e
+
+    def delete_login_attempts_before(self, db: Session, window_start: float) -> int:
+        """
+        Delete the rows whose last window started before ``window_start``.
+
+        Args:
+            db (Session): The database session.
+            window_start (float): Epoch timestamp, older windows no longer count.
+
+        Returns:
+            int: The number of deleted rows.
+        """
+        try:
+            _deleted = (db.query(LoginAttemptModel)
+                        .filter(LoginAttemptModel.window_start < window_start)
+                        .delete(synchronize_session=False))
+            db.commit()
+            return _deleted
+        except Exception as e:
+            db.rollback()
+            raise DatabaseException(
+                f"[delete_login_attempts_before] An error occurred while deleting the login attempts: {str(e)}") from e
@@ -5,21 +5,29 @@ Module that contains handlers for items management.
 """
 from sqlalchemy.orm import Session
 
+from config import CATALOG_CACHE_TTL
 from databases.axion.models.primaries.Producto import Producto as ItemModel
 from databases.axion.schemas.primaries.Producto import Producto as ItemSchema
 from databases.axion.schemas.primaries.Producto import RequestProducto
-from databases.shared.database import DatabaseException
+from databases.shared.cache import VersionedCache
+from databases.shared.database import (DatabaseException,
+                                       InvalidRequestException)
+from databases.shared.pagination import paginate
+
+# Serialized catalog responses, invalidated by every write to productos
+catalog_cache = VersionedCache(ttl=CATALOG_CACHE_TTL)
 
 
 class Producto:
     
-    def create_item(self, db: Session, item: RequestProducto):
+    def create_item(self, db: Session, item: RequestProducto, imagen_variantes: dict | None = None):
         """
         Create a new item.
 
         Args:
             db (Session): The database session.
             item (Item): The item data.
+            imagen_variantes (dict, optional): The URLs of the resized image variants by width.
 
         Returns:
             Item: The created item.
@@ -28,9 +36,11 @@ class Producto:
             DatabaseException: If an error occurs while creating the item.
         """
         try:
-            _item = ItemModel(nombre=item.nombre, descripcion=item.descripcion, precio=item.precio, imagen_url=item.imagen_url)
+            _item = ItemModel(nombre=item.nombre, descripcion=item.descripcion, precio=item.precio, imagen_url=item.imagen_url,
+                               imagen_variantes=imagen_variantes)
             db.add(_item)
             db.commit()
+            catalog_cache.invalidate()
             db.refresh(_item)
             return _item
         except Exception as e:
@@ -60,6 +70,7 @@ class Producto:
             _item.descripcion = item.descripcion
             _item.precio = item.precio
             db.commit()
+            catalog_cache.invalidate()
             db.refresh(_item)
             return _item
         except Exception as e:
@@ -67,7 +78,8 @@ class Producto:
             raise DatabaseException(
                 f"[update_item] An error occurred while updating the item: {str(e)}") from e
 
-    def update_item_image(self, db: Session, item_id: int, image_url: str) -> ItemSchema:
+    def update_item_image(self, db: Session, item_id: int, image_url: str,
+                          imagen_variantes: dict | None = None) -> ItemSchema:
         """
         Update an item's image.
 
@@ -75,6 +87,7 @@ class Producto:
             db (Session): The database session.
             item_id (int): The ID of the item.
             image_url (str): The URL of the new image.
+            imagen_variantes (dict, optional): The URLs of the resized image variants by width.
 
         Returns:
             Item: The updated item with new image.
@@ -88,7 +101,9 @@ class Producto:
                 raise DatabaseException(f"Item with id {item_id} not found")
 
             _item.imagen_url = image_url
+            _item.imagen_variantes = imagen_variantes
             db.commit()
+            catalog_cache.invalidate()
             db.refresh(_item)
             return _item
         except Exception as e:
@@ -96,24 +111,26 @@ class Producto:
             raise DatabaseException(
                 f"[update_item_image] An error occurred while updating the item image: {str(e)}") from e
 
-    def get_all_items(self, db: Session, skip: int = 0, limit: int = 200):
+    def get_all_items(self, db: Session, after: list | None = None, limit: int = 200):
 
         """
-        Get all items.
+        Get a page of items ordered by id.
 
         Args:
             db (Session): The database session.
-            skip (int, optional): The number of items to skip. Defaults to 0.
+            after (list, optional): The decoded cursor of the previous page. Defaults to None.
             limit (int, optional): The maximum number of items to return. Defaults to 200.
 
         Returns:
-            list: A list of all items.
+            tuple: The items of the page and the cursor of the next page.
 
         Raises:
             DatabaseException: If an error occurs while retrieving items.
         """
         try:
-            return db.query(ItemModel).offset(skip).limit(limit).all()
+            return paginate(db.query(ItemModel), [ItemModel.id], after, limit)
+        except InvalidRequestException:
+            raise
         except Exception as e:
             raise DatabaseException(
                 f"[get_all_items] An error occurred while retrieving items: {str(e)}") from e
@@ -138,6 +155,62 @@ class Producto:
             raise DatabaseException(
                 f"[get_item_by_id] An error occurred while retrieving the item: {str(e)}") from e
     
+    def get_image_urls(self, db: Session) -> set:
+        """
+        Get every image URL referenced by an item, originals and variants.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            set: The referenced image URLs.
+
+        Raises:
+            DatabaseException: If an error occurs while retrieving the image URLs.
+        """
+        try:
+            _urls = set()
+            for _imagen_url, _imagen_variantes in db.query(ItemModel.imagen_url, ItemModel.imagen_variantes):
+                if _imagen_url:
+                    _urls.add(_imagen_url)
+                _urls.update((_imagen_variantes or {}).values())
+            return _urls
+        except Exception as e:
+            raise DatabaseException(
+                f"[get_image_urls] An error occurred while retrieving the image URLs: {str(e)}") from e
+
+    def replace_image_urls(self, db: Session, replacements: dict) -> int:
+        """
+        Point the items using an image URL to another one, with its resized variants.
+
+        Args:
+            db (Session): The database session.
+            replacements (dict): The new image URL and the URLs of its variants by width,
+                by old image URL. Items whose variants are None keep their own.
+
+        Returns:
+            int: The number of items updated.
+
+        Raises:
+            DatabaseException: If an error occurs while updating the image URLs.
+        """
+        try:
+            _updated = 0
+            for _old_url, (_new_url, _new_variantes) in replacements.items():
+                _values = {ItemModel.imagen_url: _new_url}
+                if _new_variantes is not None:
+                    _values[ItemModel.imagen_variantes] = _new_variantes
+                _updated += db.query(ItemModel).filter(ItemModel.imagen_url == _old_url).update(
+                    _values, synchronize_session=False)
+            db.commit()
+            if _updated:
+                catalog_cache.invalidate()
+            return _updated
+        except Exception as e:
+            db.rollback()
+            raise DatabaseException(
+                f"[replace_image_urls] An error occurred while updating the image URLs: {str(e)}") from e
+
     def delete_item (self, db: Session, id: int):
         """
         Delete an item.
@@ -153,6 +226,7 @@ class Producto:
             _delete_item = db.query(ItemModel).filter_by(id=id).first()
             db.delete(_delete_item)
             db.commit()
+            catalog_cache.invalidate()
             return _delete_item
         except Exception as e:
             db.rollback()
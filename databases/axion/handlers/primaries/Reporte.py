@@ -0,0 +1,126 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains handlers for sales reports.
+
+Every report is a single GROUP BY query computed by the database.
+"""
+from datetime import datetime
+
+from sqlalchemy import extract, func, select
+from sqlalchemy.orm import Session
+
+from databases.axion.models.primaries.Factura import Factura as FacturaModel
+from databases.axion.models.primaries.Producto import \
+    Producto as ProductoModel
+from databases.axion.models.primaries.VentaDiaria import \
+    VentaDiaria as VentaDiariaModel
+from databases.shared.database import DatabaseException
+
+
+class Reporte:
+    """
+    Class that contains methods for sales reports.
+    """
+
+    def get_top_productos(self, db: Session, desde: datetime, hasta: datetime, limit: int = 10):
+        """
+        Get the best selling productos by revenue.
+
+        Read from the ventas_diarias rollup, so the range is applied by whole days.
+
+        Args:
+            db (Session): The database session.
+            desde (datetime): Start of the range, the whole day is included.
+            hasta (datetime): End of the range, the whole day is included.
+            limit (int, optional): The number of productos to return. Defaults to 10.
+
+        Returns:
+            list: Rows with producto_id, nombre, unidades and ingresos.
+
+        Raises:
+            DatabaseException: If an error occurs while computing the report.
+        """
+        try:
+            _ingresos = func.sum(VentaDiariaModel.ingresos).label("ingresos")
+            _query = (
+                select(
+                    VentaDiariaModel.producto_id,
+                    ProductoModel.nombre,
+                    func.sum(VentaDiariaModel.unidades).label("unidades"),
+                    _ingresos,
+                )
+                .outerjoin(ProductoModel, ProductoModel.id == VentaDiariaModel.producto_id)
+                .where(VentaDiariaModel.fecha >= desde.date(), VentaDiariaModel.fecha <= hasta.date())
+                .group_by(VentaDiariaModel.producto_id, ProductoModel.nombre)
+                .order_by(_ingresos.desc())
+                .limit(limit)
+            )
+            return db.execute(_query).all()
+        except Exception as e:
+            raise DatabaseException(
+                f"[get_top_productos] An error occurred while computing the top productos: {str(e)}") from e
+
+    def get_ventas_por_hora(self, db: Session, desde: datetime, hasta: datetime):
+        """
+        Get the number of facturas and revenue per hour of the day.
+
+        Args:
+            db (Session): The database session.
+            desde (datetime): Start of the range, inclusive.
+            hasta (datetime): End of the range, inclusive.
+
+        Returns:
+            list: Rows with hora, facturas and ingresos, ordered by hora.
+
+        Raises:
+            DatabaseException: If an error occurs while computing the report.
+        """
+        try:
+            _hora = extract("hour", FacturaModel.fecha).label("hora")
+            _query = (
+                select(
+                    _hora,
+                    func.count(FacturaModel.id).label("facturas"),
+                    func.sum(FacturaModel.total).label("ingresos"),
+                )
+                .where(FacturaModel.fecha >= desde, FacturaModel.fecha <= hasta)
+                .group_by(_hora)
+                .order_by(_hora)
+            )
+            return db.execute(_query).all()
+        except Exception as e:
+            raise DatabaseException(
+                f"[get_ventas_por_hora] An error occurred while computing the sales per hour: {str(e)}") from e
+
+    def get_ventas_diarias(self, db: Session, desde: datetime, hasta: datetime):
+        """
+        Get the number of facturas and revenue per day.
+
+        Args:
+            db (Session): The database session.
+            desde (datetime): Start of the range, inclusive.
+            hasta (datetime): End of the range, inclusive.
+
+        Returns:
+            list: Rows with fecha, facturas and ingresos, ordered by fecha.
+
+        Raises:
+            DatabaseException: If an error occurs while computing the report.
+        """
+        try:
+            _fecha = func.date(FacturaModel.fecha).label("fecha")
+            _query = (
+                select(
+                    _fecha,
+                    func.count(FacturaModel.id).label("facturas"),
+                    func.sum(FacturaModel.total).label("ingresos"),
+                )
+                .where(FacturaModel.fecha >= desde, FacturaModel.fecha <= hasta)
+                .group_by(_fecha)
+                .order_by(_fecha)
+            )
+            return db.execute(_query).all()
+        except Exception as e:
+            raise DatabaseException(
+                f"[get_ventas_diarias] An error occurred while computing the daily sales: {str(e)}") from e
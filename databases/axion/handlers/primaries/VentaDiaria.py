@@ -0,0 +1,145 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains handlers for the daily sales rollup.
+
+The rollup is written in the same transaction as the facturas and cierres caja
+that change it, the callers are responsible for committing. Facturas are bucketed
+by their UTC day, the same as DATE(fecha) on the stored UTC timestamps.
+"""
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from databases.axion.models.primaries.DetalleFactura import \
+    DetalleFactura as DetalleFacturaModel
+from databases.axion.models.primaries.Factura import Factura as FacturaModel
+from databases.axion.models.primaries.VentaDiaria import \
+    VentaDiaria as VentaDiariaModel
+from databases.shared.database import DatabaseException
+from databases.shared.types import as_utc
+
+
+class VentaDiaria:
+    """
+    Class that contains methods for the daily sales rollup.
+    """
+
+    def _upsert(self, db: Session, rows: list, columns: list):
+        """
+        Add the values of ``columns`` in ``rows`` to the existing rollup rows, creating missing ones.
+        """
+        if not rows:
+            return
+        _dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        _stmt = _dialect.insert(VentaDiariaModel)
+        _stmt = _stmt.on_conflict_do_update(
+            index_elements=[VentaDiariaModel.fecha, VentaDiariaModel.producto_id],
+            set_={_column: getattr(VentaDiariaModel, _column) + getattr(_stmt.excluded, _column)
+                  for _column in columns},
+        )
+        _defaults = {"unidades": 0, "ingresos": 0, "unidades_cerradas": 0, "ingresos_cerrados": 0}
+        db.execute(_stmt, [{**_defaults, **_row} for _row in rows])
+
+    def add_detalles(self, db: Session, fecha: datetime, detalles: list):
+        """
+        Add the detalles of a new factura to the rollup.
+
+        Args:
+            db (Session): The database session.
+            fecha (datetime): The fecha of the factura.
+            detalles (list): The detalles of the factura.
+        """
+        _totales = {}
+        for _detalle in detalles:
+            _unidades, _ingresos = _totales.get(_detalle.producto_id, (0, 0))
+            _totales[_detalle.producto_id] = (_unidades + _detalle.cantidad, _ingresos + _detalle.precio_final)
+        self._upsert(db, [
+            {"fecha": as_utc(fecha).date(), "producto_id": _producto_id, "unidades": _unidades, "ingresos": _ingresos}
+            for _producto_id, (_unidades, _ingresos) in _totales.items()
+        ], ["unidades", "ingresos"])
+
+    def add_cierre_caja(self, db: Session, cierre_caja_id: int):
+        """
+        Move the detalles of the facturas of a new cierre caja into the closed columns of the rollup.
+
+        Args:
+            db (Session): The database session.
+            cierre_caja_id (int): The ID of the cierre caja, its facturas must already be linked.
+        """
+        _fecha = func.date(FacturaModel.fecha)
+        _query = (
+            select(
+                _fecha,
+                DetalleFacturaModel.producto_id,
+                func.sum(DetalleFacturaModel.cantidad),
+                func.sum(DetalleFacturaModel.precio_final),
+            )
+            .join(FacturaModel, FacturaModel.id == DetalleFacturaModel.factura_id)
+            .where(FacturaModel.cierre_caja_id == cierre_caja_id)
+            .group_by(_fecha, DetalleFacturaModel.producto_id)
+        )
+        self._upsert(db, [
+            {
+                "fecha": date.fromisoformat(_dia) if isinstance(_dia, str) else _dia,
+                "producto_id": _producto_id,
+                "unidades_cerradas": _unidades,
+                "ingresos_cerrados": _ingresos,
+            }
+            for _dia, _producto_id, _unidades, _ingresos in db.execute(_query)
+        ], ["unidades_cerradas", "ingresos_cerrados"])
+
+    def rebuild(self, db: Session, desde: date | None = None, hasta: date | None = None):
+        """
+        Recompute the rollup from facturas and detalles, for backfills and repairs.
+
+        Args:
+            db (Session): The database session.
+            desde (date, optional): First day to rebuild. Defaults to the first factura.
+            hasta (date, optional): Last day to rebuild. Defaults to the last factura.
+
+        Returns:
+            int: The number of rollup rows written.
+
+        Raises:
+            DatabaseException: If an error occurs while rebuilding the rollup.
+        """
+        try:
+            _delete = db.query(VentaDiariaModel)
+            _facturas = []
+            if desde is not None:
+                _delete = _delete.filter(VentaDiariaModel.fecha >= desde)
+                _facturas.append(FacturaModel.fecha >= datetime.combine(desde, time.min))
+            if hasta is not None:
+                _delete = _delete.filter(VentaDiariaModel.fecha <= hasta)
+                _facturas.append(FacturaModel.fecha < datetime.combine(hasta + timedelta(days=1), time.min))
+            _delete.delete(synchronize_session=False)
+
+            _fecha = func.date(FacturaModel.fecha)
+            _cerrada = FacturaModel.cierre_caja_id.is_not(None)
+            _query = (
+                select(
+                    _fecha,
+                    DetalleFacturaModel.producto_id,
+                    func.sum(DetalleFacturaModel.cantidad),
+                    func.sum(DetalleFacturaModel.precio_final),
+                    func.sum(case((_cerrada, DetalleFacturaModel.cantidad), else_=0)),
+                    func.sum(case((_cerrada, DetalleFacturaModel.precio_final), else_=0)),
+                )
+                .join(FacturaModel, FacturaModel.id == DetalleFacturaModel.factura_id)
+                .where(*_facturas)
+                .group_by(_fecha, DetalleFacturaModel.producto_id)
+            )
+            _result = db.execute(insert(VentaDiariaModel).from_select(
+                ["fecha", "producto_id", "unidades", "ingresos", "unidades_cerradas", "ingresos_cerrados"],
+                _query,
+            ))
+            db.commit()
+            return _result.rowcount
+        except Exception as e:
+            db.rollback()
+            raise DatabaseException(
+                f"[rebuild] An error occurred while rebuilding the ventas diarias: {str(e)}") from e
+
@@ -1,8 +1,30 @@
-from ..shared.database import Database
+from config import (DB_AXION_DATABASE, DB_AXION_DRIVERNAME, DB_AXION_HOSTNAME,
+                    DB_AXION_PORT, DB_AXION_PWD, DB_AXION_USER,
+                    DB_MAX_OVERFLOW, DB_POOL_PRE_PING, DB_POOL_RECYCLE,
+                    DB_POOL_SIZE, DB_SQLITE_BUSY_TIMEOUT, DB_SQLITE_CACHE_SIZE,
+                    DB_SQLITE_JOURNAL_MODE, DB_SQLITE_MMAP_SIZE,
+                    DB_SQLITE_SYNCHRONOUS)
 
-DATABASE_URL = "sqlite:///./mjpvcdb.db"
+from ..shared.database import Database, SQLiteTuning
 
-db = Database(database_url=DATABASE_URL)
+# Postgres when DB_AXION_DRIVERNAME is set (e.g. postgresql+psycopg2), the local SQLite file otherwise
+DATABASE_URL = Database.build_url(drivername=DB_AXION_DRIVERNAME,
+                                  username=DB_AXION_USER,
+                                  password=DB_AXION_PWD,
+                                  host=DB_AXION_HOSTNAME,
+                                  port=DB_AXION_PORT,
+                                  database=DB_AXION_DATABASE)
+
+db = Database(database_url=DATABASE_URL,
+              tuning=SQLiteTuning(journal_mode=DB_SQLITE_JOURNAL_MODE,
+                                  synchronous=DB_SQLITE_SYNCHRONOUS,
+                                  mmap_size=DB_SQLITE_MMAP_SIZE,
+                                  cache_size=DB_SQLITE_CACHE_SIZE,
+                                  busy_timeout=DB_SQLITE_BUSY_TIMEOUT),
+              pool_size=DB_POOL_SIZE,
+              max_overflow=DB_MAX_OVERFLOW,
+              pool_pre_ping=DB_POOL_PRE_PING,
+              pool_recycle=DB_POOL_RECYCLE)
 
 Base = db.get_base()
 
@@ -10,12 +32,18 @@ def initialize_database():
     """
     Initialize the database.
  
-    This function is responsible for initializing the database by creating all the necessary tables if they do not already exist.
+    This function is responsible for initializing the database by creating all the necessary tables if they do not already exist
+    and applying the pending schema migrations.
     """
-    import databases.axion.models.primaries
+    from databases.axion.migrations import upgrade
+    from databases.axion.models.primaries import (CierreCaja, DetalleFactura,
+                                                  Factura, LocalUser,
+                                                  LoginAttempt, Producto,
+                                                  VentaDiaria)
 
     #Base.metadata.drop_all(bind=db.get_engine()) # Delete all tables if they exist
     Base.metadata.create_all(bind=db.get_engine()) # Create tables if they do not exist
+    upgrade(db.get_engine()) # Apply pending schema migrations to existing tables
 
 def get_session():
     """
@@ -0,0 +1,186 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the versioned schema migrations of the axion database.
+
+Base.metadata.create_all only creates missing tables, changes to existing tables
+are made here. Every migration runs once, in order, inside its own transaction,
+and its version is recorded in the schema_version table. Migrations must also be
+safe on databases freshly created by create_all, which already have the latest schema.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import (JSON, Column, DateTime, Float, Integer, MetaData,
+                        String, Table, column, inspect, select, table, text)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _0001_hot_path_indexes(connection: Connection):
+    """
+    Index the foreign keys and date columns used by lookups, date ranges and pagination.
+    """
+    for _statement in (
+        "CREATE INDEX IF NOT EXISTS ix_detalles_facturas_factura_id ON detalles_facturas (factura_id)",
+        "CREATE INDEX IF NOT EXISTS ix_detalles_facturas_producto_id ON detalles_facturas (producto_id)",
+        "CREATE INDEX IF NOT EXISTS ix_facturas_fecha_id ON facturas (fecha, id)",
+        "CREATE INDEX IF NOT EXISTS ix_facturas_cierre_caja_id_fecha ON facturas (cierre_caja_id, fecha)",
+        "CREATE INDEX IF NOT EXISTS ix_cierres_caja_fecha_id ON cierres_caja (fecha, id)",
+    ):
+        connection.execute(text(_statement))
+
+
+def _0002_money_in_cents(connection: Connection):
+    """
+    Store money as integer cents (the Money column type) instead of floats.
+
+    Postgres columns are converted to BIGINT. SQLite cannot change a column type in
+    place, so the values are rewritten as whole cents and keep the REAL affinity.
+    """
+    _inspector = inspect(connection)
+    _tables = set(_inspector.get_table_names())
+    for _table, _column in (
+        ("productos", "precio"),
+        ("detalles_facturas", "precio_unitario"),
+        ("detalles_facturas", "precio_final"),
+        ("facturas", "total"),
+        ("cierres_caja", "total_ventas"),
+        ("ventas_diarias", "ingresos"),
+        ("ventas_diarias", "ingresos_cerrados"),
+    ):
+        if _table not in _tables:
+            continue
+        _types = {_info["name"]: _info["type"] for _info in _inspector.get_columns(_table)}
+        if not isinstance(_types[_column], Float):
+            continue
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(
+                f"ALTER TABLE {_table} ALTER COLUMN {_column} TYPE BIGINT USING ROUND({_column} * 100)"))
+        else:
+            connection.execute(text(
+                f"UPDATE {_table} SET {_column} = CAST(ROUND({_column} * 100) AS INTEGER)"
+                f" WHERE {_column} IS NOT NULL"))
+
+
+def _0003_product_image_variants(connection: Connection):
+    """
+    Add the column holding the URLs of the resized variants of product images.
+    """
+    _columns = {_info["name"] for _info in inspect(connection).get_columns("productos")}
+    if "imagen_variantes" not in _columns:
+        connection.execute(text("ALTER TABLE productos ADD COLUMN imagen_variantes JSON"))
+
+
+def _0004_absolute_image_urls(connection: Connection):
+    """
+    Make product image URLs absolute paths under /images, where main.py serves them.
+    """
+    _productos = table("productos", column("id"), column("imagen_url"), column("imagen_variantes", JSON))
+
+    def _absolute(url):
+        return f"/{url}" if url and url.startswith("images/") else url
+
+    for _id, _imagen_url, _imagen_variantes in connection.execute(select(
+            _productos.c.id, _productos.c.imagen_url, _productos.c.imagen_variantes)).all():
+        _variantes = {_width: _absolute(_url) for _width, _url in (_imagen_variantes or {}).items()}
+        if _absolute(_imagen_url) == _imagen_url and _variantes == (_imagen_variantes or {}):
+            continue
+        connection.execute(_productos.update().where(_productos.c.id == _id).values(
+            imagen_url=_absolute(_imagen_url), imagen_variantes=_imagen_variantes and _variantes))
+
+
+def _0005_local_user_token_version(connection: Connection):
+    """
+    Add the per-user counter carried by access tokens and bumped to invalidate them.
+    """
+    _columns = {_info["name"] for _info in inspect(connection).get_columns("local_users")}
+    if "token_version" not in _columns:
+        connection.execute(text("ALTER TABLE local_users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0"))
+
+
+def _0006_local_user_autoincrement(connection: Connection):
+    """
+    Stop SQLite from reusing the ids of deleted local users.
+
+    Without AUTOINCREMENT SQLite hands out the largest id plus one, so a user created after
+    the last one was deleted gets its id. SQLite cannot change the primary key in place,
+    so the table is rebuilt. Postgres sequences never reuse ids.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    _sql = connection.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'local_users'")).scalar()
+    if _sql is None or "AUTOINCREMENT" in _sql.upper():
+        return
+    for _statement in (
+        "ALTER TABLE local_users RENAME TO local_users_old",
+        "CREATE TABLE local_users ("
+        " id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,"
+        " username VARCHAR(255) NOT NULL,"
+        " password_hash VARCHAR(255) NOT NULL,"
+        " token_version INTEGER DEFAULT '0' NOT NULL,"
+        " UNIQUE (username))",
+        "INSERT INTO local_users (id, username, password_hash, token_version)"
+        " SELECT id, username, password_hash, token_version FROM local_users_old",
+        "DROP TABLE local_users_old",
+    ):
+        connection.execute(text(_statement))
+
+
+MIGRATIONS = [
+    (1, "Index hot foreign keys and date columns", _0001_hot_path_indexes),
+    (2, "Store money as integer cents", _0002_money_in_cents),
+    (3, "Add resized variants of product images", _0003_product_image_variants),
+    (4, "Make product image URLs absolute", _0004_absolute_image_urls),
+    (5, "Add the token version of local users", _0005_local_user_token_version),
+    (6, "Never reuse the ids of local users", _0006_local_user_autoincrement),
+]
+
+
+def get_current_version(engine: Engine) -> int:
+    """
+    Return the latest migration version applied to the database, 0 if none.
+    """
+    _metadata.create_all(bind=engine)
+    with engine.connect() as _connection:
+        return max(_connection.execute(select(schema_version.c.version)).scalars(), default=0)
+
+
+def upgrade(engine: Engine) -> list:
+    """
+    Apply every pending migration in order.
+
+    Args:
+        engine (Engine): The engine of the database to migrate.
+
+    Returns:
+        list: The versions applied by this call.
+    """
+    _current = get_current_version(engine)
+    _applied = []
+    for _version, _description, _migration in MIGRATIONS:
+        if _version <= _current:
+            continue
+        try:
+            with engine.begin() as _connection:
+                _migration(_connection)
+                _connection.execute(schema_version.insert().values(
+                    version=_version,
+                    description=_description,
+                    applied_at=datetime.now(timezone.utc),
+                ))
+        except IntegrityError:
+            # Another worker starting at the same time applied this version first
+            continue
+        _applied.append(_version)
+    return _applied
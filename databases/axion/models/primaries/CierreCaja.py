@@ -3,16 +3,20 @@ Team: MSG - AXIANS
 
 Module that contains models for client management.
 """
-from sqlalchemy import (Column, DateTime, Enum, Float, ForeignKey, Integer,
+from sqlalchemy import (Column, Enum, Float, ForeignKey, Index, Integer,
                         String, UniqueConstraint)
 from sqlalchemy.orm import relationship
 
 from databases.axion.init_db import Base
+from databases.shared.types import Money, UTCDateTime
 
 
 class CierreCaja(Base):
     __tablename__ = 'cierres_caja'
+    __table_args__ = (
+        Index('ix_cierres_caja_fecha_id', 'fecha', 'id'),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    fecha = Column(DateTime)
-    total_ventas = Column(Float)
+    fecha = Column(UTCDateTime)
+    total_ventas = Column(Money)
     factura = relationship("Factura", back_populates="cierre_caja")
@@ -8,15 +8,16 @@ from sqlalchemy import (Column, DateTime, Enum, Float, ForeignKey, Integer,
 from sqlalchemy.orm import relationship
 
 from databases.axion.init_db import Base
+from databases.shared.types import Money
 
 
 class DetalleFactura(Base):
     __tablename__ = 'detalles_facturas'
     id = Column(Integer, primary_key=True, index=True)
-    producto_id = Column(Integer, ForeignKey('productos.id'))
+    producto_id = Column(Integer, ForeignKey('productos.id'), index=True)
     cantidad = Column(Integer)
-    precio_unitario = Column(Float)
-    precio_final = Column(Float)
-    factura_id = Column(Integer, ForeignKey('facturas.id'))
+    precio_unitario = Column(Money)
+    precio_final = Column(Money)
+    factura_id = Column(Integer, ForeignKey('facturas.id'), index=True)
     factura = relationship("Factura", back_populates="detalles")
     producto = relationship("Producto", back_populates="detalles")
\ No newline at end of file
@@ -3,18 +3,23 @@ Team: MSG - AXIANS
 
 Module that contains models for client management.
 """
-from sqlalchemy import (Column, DateTime, Enum, Float, ForeignKey, Integer,
+from sqlalchemy import (Column, Enum, Float, ForeignKey, Index, Integer,
                         String, UniqueConstraint)
 from sqlalchemy.orm import relationship
 
 from databases.axion.init_db import Base
+from databases.shared.types import Money, UTCDateTime
 
 
 class Factura(Base):
     __tablename__ = 'facturas'
+    __table_args__ = (
+        Index('ix_facturas_fecha_id', 'fecha', 'id'),
+        Index('ix_facturas_cierre_caja_id_fecha', 'cierre_caja_id', 'fecha'),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    fecha = Column(DateTime)
-    total = Column(Float)
+    fecha = Column(UTCDateTime)
+    total = Column(Money)
     cierre_caja_id = Column(Integer, ForeignKey('cierres_caja.id'))
     detalles = relationship("DetalleFactura", back_populates="factura")
     cierre_caja = relationship("CierreCaja", back_populates="factura")
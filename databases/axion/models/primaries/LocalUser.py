@@ -14,7 +14,11 @@ class LocalUser(Base):
     Class that represents a local user in the database.
     """
     __tablename__ = "local_users"
+    # Never reuse the id of a deleted user, its unexpired tokens carry that id
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True)
     username = Column(String(255), nullable=False, unique=True)
     password_hash = Column(String(255), nullable=False)
+    # Bumped on every change invalidating the tokens issued to the user
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
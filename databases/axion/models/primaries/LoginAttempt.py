@@ -0,0 +1,24 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains models for the login rate limiter state.
+"""
+from sqlalchemy import Column, Float, Integer, String
+
+from databases.axion.init_db import Base
+
+
+class LoginAttempt(Base):
+    """
+    Class that represents the login attempts counted for a client IP or username.
+
+    Used by the database backend of the login rate limiter to share its sliding windows
+    between nodes: ``current`` counts the attempts of the window starting at
+    ``window_start`` and ``previous`` those of the window before.
+    """
+    __tablename__ = "login_attempts"
+
+    key = Column(String(255), primary_key=True)
+    window_start = Column(Float, nullable=False)
+    previous = Column(Integer, nullable=False, default=0)
+    current = Column(Integer, nullable=False, default=0)
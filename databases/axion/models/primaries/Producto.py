@@ -3,11 +3,12 @@ Team: MSG - AXIANS
 
 Module that contains models for client management.
 """
-from sqlalchemy import (Column, Enum, Float, ForeignKey, Integer, String,
+from sqlalchemy import (JSON, Column, Enum, Float, ForeignKey, Integer, String,
                         UniqueConstraint)
 from sqlalchemy.orm import relationship
 
 from databases.axion.init_db import Base
+from databases.shared.types import Money
 
 
 class Producto(Base):
@@ -18,7 +19,8 @@ class Producto(Base):
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(String, nullable=False, index=True)
     descripcion = Column(String)
-    precio = Column(Float, nullable=False)
+    precio = Column(Money, nullable=False)
     imagen_url = Column(String)
+    imagen_variantes = Column(JSON)
 
     detalles = relationship("DetalleFactura", back_populates="producto")
\ No newline at end of file
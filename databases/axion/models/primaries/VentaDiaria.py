@@ -0,0 +1,25 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains models for the daily sales rollup.
+"""
+from sqlalchemy import Column, Date, Integer
+
+from databases.axion.init_db import Base
+from databases.shared.types import Money
+
+
+class VentaDiaria(Base):
+    """
+    Class that represents the units and revenue of a producto on a day.
+
+    Rows are maintained incrementally by the factura and cierre caja handlers,
+    the *_cerrados columns only count facturas already assigned to a cierre caja.
+    """
+    __tablename__ = 'ventas_diarias'
+    fecha = Column(Date, primary_key=True)
+    producto_id = Column(Integer, primary_key=True)
+    unidades = Column(Integer, nullable=False, default=0)
+    ingresos = Column(Money, nullable=False, default=0)
+    unidades_cerradas = Column(Integer, nullable=False, default=0)
+    ingresos_cerrados = Column(Money, nullable=False, default=0)
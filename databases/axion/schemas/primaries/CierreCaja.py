@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, model_validator
 
 
 class CierreCajaSchema(BaseModel):
@@ -9,9 +9,17 @@ class CierreCajaSchema(BaseModel):
     fecha: datetime
     total_ventas: float
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(
+        from_attributes=True
+    )
 
 class RequestCierreCaja(BaseModel):
     fecha: datetime
     factura_id: List[int] = []
+    hasta: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_facturas_selected(self):
+        if not self.factura_id and self.hasta is None:
+            raise ValueError("Either factura_id or hasta must be provided")
+        return self
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class DetalleFacturaSchema(BaseModel):
@@ -11,16 +11,48 @@ class DetalleFacturaSchema(BaseModel):
     precio_unitario: float
     precio_final: float
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(
+        from_attributes=True
+    )
 
 class FacturaSchema(BaseModel):
     id: int
     fecha: datetime
     total: float
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
+class FacturaDetalleSchema(FacturaSchema):
+    detalles: List[DetalleFacturaSchema] = []
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
+class ProductoDetalleSchema(BaseModel):
+    id: int
+    nombre: str
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
+class DetalleFacturaFullSchema(DetalleFacturaSchema):
+    producto: Optional[ProductoDetalleSchema] = None
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
+class FacturaFullSchema(FacturaSchema):
+    cierre_caja_id: Optional[int] = None
+    detalles: List[DetalleFacturaFullSchema] = []
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
 
 class RequestDetalleFactura(BaseModel):
     producto_id: int
@@ -28,4 +60,12 @@ class RequestDetalleFactura(BaseModel):
 
 class RequestFactura(BaseModel):
     fecha: datetime
-    detalle_ids: List[int] = []
\ No newline at end of file
+    detalle_ids: List[int] = []
+
+class RequestCheckoutItem(BaseModel):
+    producto_id: int
+    cantidad: int = Field(gt=0)
+
+class RequestCheckout(BaseModel):
+    fecha: datetime
+    items: List[RequestCheckoutItem] = Field(min_length=1)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Literal, Optional
+from typing import Dict, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -12,6 +12,7 @@ class Producto(BaseModel):
     descripcion: Optional[str] = None
     precio: float
     imagen_url: Optional[str] = None
+    imagen_variantes: Optional[Dict[str, str]] = None
 
     model_config = ConfigDict(
         from_attributes=True
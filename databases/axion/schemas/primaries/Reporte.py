@@ -0,0 +1,33 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class TopProductoSchema(BaseModel):
+    producto_id: int
+    nombre: Optional[str] = None
+    unidades: int
+    ingresos: float
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
+class VentasPorHoraSchema(BaseModel):
+    hora: int
+    facturas: int
+    ingresos: float
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
+class VentasDiariasSchema(BaseModel):
+    fecha: date
+    facturas: int
+    ingresos: float
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
@@ -0,0 +1,135 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the in-process caches used by the handlers.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    Entries are evicted in least recently used order once ``maxsize`` is reached.
+    The ``hits`` and ``misses`` counters are kept for monitoring. ``generation`` is bumped
+    by ``invalidate`` and ``clear``, so a value read before a change is not stored after it.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for ``key`` or ``default`` if missing or expired.
+        """
+        with self._lock:
+            _entry = self._entries.get(key)
+            if _entry is None:
+                self.misses += 1
+                return default
+            _value, _expires_at = _entry
+            if _expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _value
+
+    def set(self, key, value, expires_at: float | None = None, generation: int | None = None) -> bool:
+        """
+        Store ``value`` under ``key``.
+
+        Args:
+            key: The cache key.
+            value: The value to cache.
+            expires_at (float | None): Epoch timestamp after which the entry must not be
+                served, the entry lives for at most ``ttl`` seconds regardless.
+            generation (int | None): The ``generation`` read before ``value`` was loaded,
+                the value is not stored if the cache was invalidated since.
+
+        Returns:
+            bool: Whether the value was stored.
+        """
+        _expires_at = time.time() + self.ttl
+        if expires_at is not None:
+            _expires_at = min(_expires_at, expires_at)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (value, _expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, key):
+        """
+        Remove ``key`` from the cache if present.
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Return the size and hit/miss counters of the cache.
+        """
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class VersionedCache:
+    """
+    Cache of values derived from a data set that changes rarely.
+
+    Every write to the data set must call ``invalidate``, which bumps ``version`` and
+    drops the cached values. A value built while a write happened is not stored.
+    """
+    def __init__(self, maxsize: int = 64, ttl: float = 300):
+        self.version = 0
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, builder):
+        """
+        Return the cached value for ``key``, building and storing it with ``builder`` if missing.
+        """
+        _value = self._cache.get(key)
+        if _value is not None:
+            return _value
+        _version = self.version
+        _value = builder()
+        with self._lock:
+            if _version == self.version:
+                self._cache.set(key, _value)
+        return _value
+
+    def invalidate(self):
+        """
+        Mark the data set as changed and drop every cached value.
+        """
+        with self._lock:
+            self.version += 1
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        """
+        Return the version, size and hit/miss counters of the cache.
+        """
+        return {"version": self.version, **self._cache.stats()}
@@ -1,26 +1,171 @@
-from sqlalchemy import create_engine, inspect, text
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.exc import ArgumentError, ProgrammingError
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 
+class SQLiteTuning:
+    """
+    Tuning profile applied through PRAGMAs to every new SQLite connection.
+
+    The defaults target a file database shared by concurrent readers and writers:
+    WAL lets readers proceed while an invoice is being committed, synchronous=NORMAL
+    is durable across application crashes in WAL mode, and busy_timeout makes writers
+    wait for the lock instead of failing immediately.
+    """
+    def __init__(self,
+                 journal_mode: str = "WAL",
+                 synchronous: str = "NORMAL",
+                 mmap_size: int = 256 * 1024 * 1024,
+                 cache_size: int = -64 * 1024,
+                 busy_timeout: int = 5000):
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.busy_timeout = busy_timeout
+
+    def apply(self, dbapi_connection, connection_record=None):
+        """
+        Apply the profile to a raw DBAPI connection, used as the engine connect event.
+        """
+        _cursor = dbapi_connection.cursor()
+        try:
+            _cursor.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+            _cursor.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            _cursor.execute(f"PRAGMA synchronous = {self.synchronous}")
+            _cursor.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            _cursor.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        finally:
+            _cursor.close()
+
+
+class QueryStats:
+    """
+    Number of SQL statements executed and seconds spent running them.
+
+    Statements are counted into the instance set as ``query_stats`` in the current
+    context, which threads started with a copy of the context share.
+    """
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+# Statistics of the unit of work, usually a request, running in this context
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
 class Database:
-    def __init__(self, database_url):
+    # Connection arguments per dialect, merged under the connect_args given to the constructor
+    DIALECT_CONNECT_ARGS = {
+        "sqlite": {"check_same_thread": False},
+        "postgresql": {"connect_timeout": 10, "application_name": "mjpv-cafeteria-backend"},
+    }
+
+    def __init__(self,
+                 database_url,
+                 tuning: SQLiteTuning | None = None,
+                 pool_size: int = 5,
+                 max_overflow: int = 10,
+                 pool_pre_ping: bool = False,
+                 pool_recycle: int = -1,
+                 connect_args: dict | None = None):
         self.database_url = database_url
+        self.tuning = tuning
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_recycle = pool_recycle
+        self.connect_args = connect_args or {}
         self._engine = None
         self._sessionmaker = None
         self._Base = None
         self._inspector = None
+        self._query_observers = []
        
         self._create_engine()
         self._create_sessionmaker()
         self._create_base()
-        self._create_inspector()
    
+    @staticmethod
+    def build_url(drivername: str | None,
+                  username: str | None = None,
+                  password: str | None = None,
+                  host: str | None = None,
+                  port: str | int | None = None,
+                  database: str | None = None) -> URL:
+        """
+        Build a database URL from its parts, defaulting to the local SQLite file.
+
+        Args:
+            drivername (str | None): The SQLAlchemy driver, e.g. "postgresql+psycopg2" or "sqlite".
+            username (str | None): The database user.
+            password (str | None): The database password.
+            host (str | None): The database host.
+            port (str | int | None): The database port.
+            database (str | None): The database name, or the file path for SQLite.
+
+        Returns:
+            URL: The database URL.
+        """
+        if not drivername or drivername.startswith("sqlite"):
+            return URL.create(drivername or "sqlite", database=database or "./mjpvcdb.db")
+        return URL.create(drivername,
+                          username=username,
+                          password=password,
+                          host=host,
+                          port=int(port) if port else None,
+                          database=database)
+
     def _create_engine(self):
         try:
-            self._engine = create_engine(self.database_url, connect_args={"check_same_thread": False})
+            _url = make_url(self.database_url)
+            _options = {
+                "connect_args": {**self.DIALECT_CONNECT_ARGS.get(_url.get_backend_name(), {}), **self.connect_args},
+                "pool_pre_ping": self.pool_pre_ping,
+                "pool_recycle": self.pool_recycle,
+            }
+            # In-memory SQLite databases live in a single connection and use their own pool class
+            if _url.get_backend_name() != "sqlite" or _url.database not in (None, "", ":memory:"):
+                _options.update(pool_size=self.pool_size, max_overflow=self.max_overflow)
+            self._engine = create_engine(_url, **_options)
         except ArgumentError as e:
             raise ValueError(f"Error creating engine: {e}")
+        if self.tuning is not None and self._engine.dialect.name == "sqlite":
+            event.listen(self._engine, "connect", self.tuning.apply)
+        event.listen(self._engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(self._engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def add_query_observer(self, observer):
+        """
+        Call ``observer(statement, duration)`` after every SQL statement executed by the engine.
+        """
+        self._query_observers.append(observer)
+
+    def remove_query_observer(self, observer):
+        """
+        Stop calling an observer added with add_query_observer.
+        """
+        self._query_observers.remove(observer)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started_at = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        _duration = time.perf_counter() - context._query_started_at
+        _stats = query_stats.get()
+        if _stats is not None:
+            _stats.count += 1
+            _stats.duration += _duration
+        for _observer in self._query_observers:
+            _observer(statement, _duration)
    
     def _create_sessionmaker(self):
         if self._engine is not None:
@@ -33,6 +178,7 @@ class Database:
    
     def _create_inspector(self):
         self._inspect = inspect(self._engine)
+        self._inspector = self._inspect
    
     def get_base(self):
         return self._Base
@@ -51,15 +197,52 @@ class Database:
    
     def get_inspector(self):
         if self._engine is not None:
+            # Created on first use, inspecting connects and the database may not exist yet
+            if self._inspector is None:
+                self._create_inspector()
             return self._inspect
         else:
             raise ValueError("Engine is not initialized")
             
     def create_database(self, db_name):
-        # SQLite does not support creating databases dynamically
-        raise NotImplementedError("SQLite does not support creating databases dynamically")
+        """
+        Create the database ``db_name`` on the server if it does not exist yet.
+
+        Raises:
+            NotImplementedError: For SQLite, whose databases are created with the file.
+        """
+        if self._engine.dialect.name != "postgresql":
+            # SQLite does not support creating databases dynamically
+            raise NotImplementedError("SQLite does not support creating databases dynamically")
+        _admin_engine = create_engine(self._engine.url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+        try:
+            with _admin_engine.connect() as _connection:
+                _exists = _connection.execute(
+                    text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": db_name}).scalar()
+                if not _exists:
+                    _quoted = _admin_engine.dialect.identifier_preparer.quote(db_name)
+                    _connection.execute(text(f"CREATE DATABASE {_quoted}"))
+        except ProgrammingError as e:
+            raise DatabaseException(f"[create_database] An error occurred while creating the database: {str(e)}") from e
+        finally:
+            _admin_engine.dispose()
 
 class DatabaseException(Exception):
     def __init__(self, message: str):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class InvalidRequestException(DatabaseException):
+    """
+    Raised when a request cannot be applied to the data, the client has to change it.
+    """
+
+class NotFoundException(InvalidRequestException):
+    """
+    Raised when a request references rows that do not exist.
+    """
+
+class ConflictException(InvalidRequestException):
+    """
+    Raised when a request conflicts with the current state of the data.
+    """
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains helpers for keyset (cursor) pagination.
+
+Pages are ordered by indexed columns ending with the primary key and the cursor
+is an opaque token holding the sort key of the last row returned.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import tuple_
+
+from .database import InvalidRequestException
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """
+    Schema that represents a page of a list endpoint.
+    """
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Encode the sort key of a row into an opaque cursor.
+    """
+    _payload = json.dumps([_value.isoformat() if isinstance(_value, datetime) else _value
+                           for _value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(_payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        _values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(_values, list) or not _values:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return _values
+
+
+def _cursor_value(column, value):
+    """
+    Convert a decoded cursor value to the Python type of ``column``.
+
+    Raises:
+        ValueError: If ``value`` is not of the type of ``column``.
+    """
+    _type = column.type.python_type
+    if _type is datetime:
+        if isinstance(value, str):
+            return datetime.fromisoformat(value)
+    elif isinstance(value, _type) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"{value!r} is not a valid {column.key}")
+
+
+def paginate(query, columns: list, after: list | None, limit: int):
+    """
+    Return one page of ``query`` ordered by ``columns``.
+
+    Args:
+        query: The SQLAlchemy query to paginate.
+        columns (list): The indexed columns that define the order, ending with the primary key.
+        after (list | None): The decoded cursor of the previous page, None for the first page.
+        limit (int): The maximum number of rows in the page.
+
+    Returns:
+        tuple: The rows of the page and the cursor of the next page, or None if it is the last one.
+
+    Raises:
+        InvalidRequestException: If ``after`` does not match the number and types of ``columns``.
+    """
+    if after is not None:
+        try:
+            if len(after) != len(columns):
+                raise ValueError(f"expected {len(columns)} values, got {len(after)}")
+            _values = [_cursor_value(_column, _value) for _column, _value in zip(columns, after)]
+        except ValueError as e:
+            raise InvalidRequestException(f"Cursor does not match the ordering of this list: {str(e)}") from e
+        query = query.filter(tuple_(*columns) > tuple_(*_values))
+    _rows = query.order_by(*columns).limit(limit + 1).all()
+    if len(_rows) <= limit:
+        return _rows, None
+    _rows = _rows[:limit]
+    _last = _rows[-1]
+    return _rows, encode_cursor([getattr(_last, _column.key) for _column in columns])
@@ -0,0 +1,65 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains custom column types shared by the models.
+"""
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy import BigInteger, DateTime
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+
+class Money(TypeDecorator):
+    """
+    Monetary amount stored as an integer number of cents.
+
+    Python values are Decimal with two decimal places, floats and strings are
+    rounded half up to the cent when bound. SQL aggregates such as SUM over a
+    Money column are exact and come back as Decimal too.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int((Decimal(str(value)) / CENT).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # SQLite columns migrated in place keep REAL affinity and return whole floats
+        return (Decimal(int(round(value))) * CENT).quantize(CENT)
+
+
+def as_utc(value: datetime) -> datetime:
+    """
+    Return ``value`` as a naive UTC datetime, naive values are taken as UTC already.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timestamp stored as a naive UTC datetime.
+
+    Timezone-aware values are converted to UTC when bound, so the day of a row is the
+    same whether it is taken in Python with ``as_utc(value).date()`` or in SQL with
+    DATE(column), on every backend and session time zone.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return datetime
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return as_utc(value)
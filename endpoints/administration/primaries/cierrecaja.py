@@ -14,29 +14,33 @@ logger = CustomLogger("administration/cierrecaja")
 router = APIRouter()
 
 @router.post("/cierre-caja", response_model=ItemSchema)
-async def create_cierre_caja(cierre_caja: RequestCierreCaja, db: Session = Depends(get_session)):
+def create_cierre_caja(cierre_caja: RequestCierreCaja, db: Session = Depends(get_session)):
     try:
         _cierre_caja = ItemHandler().create_cierre_caja(db, cierre_caja)
         return _cierre_caja
     except DatabaseException as de:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=de)
+        raise http_exception(de)
+    except HTTPException as httpe:
+        raise httpe
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-@router.get("/cierres-caja", response_model=List[ItemSchema])
-async def get_all_cierres_cajas(db: Session = Depends(get_session)):
+@router.get("/cierres-caja", response_model=Page[ItemSchema])
+def get_all_cierres_cajas(page: PageRequest = Depends(), db: Session = Depends(get_session)):
     try:
-        _items = ItemHandler().get_cierres_caja(db)
+        _items, _next_cursor = ItemHandler().get_cierres_caja(db, page.after, page.limit)
         if not _items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No items found")
-        return _items
+        return {"items": _items, "next_cursor": _next_cursor}
     except DatabaseException as de:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=de)
+        raise http_exception(de)
+    except HTTPException as httpe:
+        raise httpe
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/cierre-caja/{id}")
-async def get_cierre_caja_by_id(id: int, db: Session = Depends(get_session)):
+def get_cierre_caja_by_id(id: int, db: Session = Depends(get_session)):
     try:
         _item = ItemHandler().get_cierre_caja_by_id(db, id)
         if not _item:
@@ -46,6 +50,8 @@ async def get_cierre_caja_by_id(id: int, db: Session = Depends(get_session)):
         _item.facturas = _facturas
         return _item
     except DatabaseException as de:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=de)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
+    except HTTPException as httpe:
+        raise httpe
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e)
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
@@ -13,25 +13,27 @@ logger = CustomLogger("administration/detallefactura")
 router = APIRouter()
 
 
-@router.get("/detallefacturas", response_model=List[ItemSchema])
-async def get_all_items(db: Session = Depends(get_session)):
+@router.get("/detallefacturas", response_model=Page[ItemSchema])
+def get_all_items(page: PageRequest = Depends(), db: Session = Depends(get_session)):
     try:
-        _items = ItemHandler().get_detalles_facturas(db)
+        _items, _next_cursor = ItemHandler().get_detalles_facturas(db, page.after, page.limit)
         if not _items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No items found")
-        return _items
+        return {"items": _items, "next_cursor": _next_cursor}
     except DatabaseException as de:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=de)
+        raise http_exception(de)
+    except HTTPException as httpe:
+        raise httpe
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 @router.post("/detallefactura", response_model=ItemSchema)
-async def create_detalle_factura(detalle_factura: RequestDetalleFactura, db: Session = Depends(get_session)):
+def create_detalle_factura(detalle_factura: RequestDetalleFactura, db: Session = Depends(get_session)):
     try:
         _detalle_factura = ItemHandler().create_detalle_factura(db, detalle_factura)
         return _detalle_factura
     except DatabaseException as de:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=de)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
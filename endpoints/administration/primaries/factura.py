@@ -1,10 +1,26 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Literal
+
+from fastapi.responses import StreamingResponse
+
+from config import MAX_PAGE_SIZE
+
 from databases.axion.handlers.primaries.DetalleFactura import \
     DetalleFactura as DetalleFacturaHandler
 from databases.axion.handlers.primaries.Factura import Factura as ItemHandler
+from databases.axion.init_db import db as database
 from databases.axion.init_db import get_session
 from databases.axion.schemas.primaries.Factura import \
     FacturaSchema as ItemSchema
-from databases.axion.schemas.primaries.Factura import RequestFactura
+from databases.axion.schemas.primaries.Factura import (FacturaDetalleSchema,
+                                                       FacturaFullSchema,
+                                                       RequestCheckout,
+                                                       RequestFactura)
+from databases.axion.schemas.primaries.LocalUser import \
+    LocalUser as LocalUserSchema
 from databases.shared.database import DatabaseException
 
 from ...shared.imports import *
@@ -13,18 +29,86 @@ logger = CustomLogger("administration/factura")
 
 router = APIRouter()
 
-@router.get("/facturas", response_model=List[ItemSchema])
-async def get_all_items(db: Session = Depends(get_session)):
+_EXPORT_FACTURA_FIELDS = ["factura_id", "fecha", "total", "cierre_caja_id"]
+_EXPORT_DETALLE_FIELDS = ["detalle_id", "producto_id", "producto_nombre", "cantidad",
+                          "precio_unitario", "precio_final"]
+_EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _export_ndjson(rows):
+    """
+    Group the export rows by factura and render one JSON object per line.
+    """
+    _factura = None
+    for _row in rows:
+        if _factura is None or _factura["id"] != _row["factura_id"]:
+            if _factura is not None:
+                yield json.dumps(_factura, default=float) + "\n"
+            _factura = {
+                "id": _row["factura_id"],
+                "fecha": _row["fecha"].isoformat(),
+                "total": _row["total"],
+                "cierre_caja_id": _row["cierre_caja_id"],
+                "detalles": [],
+            }
+        if _row["detalle_id"] is not None:
+            _factura["detalles"].append({_field: _row[_field] for _field in _EXPORT_DETALLE_FIELDS})
+    if _factura is not None:
+        yield json.dumps(_factura, default=float) + "\n"
+
+
+def _export_csv(rows):
+    """
+    Render the export rows as CSV, one line per detalle.
+    """
+    _buffer = io.StringIO()
+    _writer = csv.writer(_buffer)
+    _writer.writerow(_EXPORT_FACTURA_FIELDS + _EXPORT_DETALLE_FIELDS)
+    for _row in rows:
+        _writer.writerow([_row[_field] for _field in _EXPORT_FACTURA_FIELDS + _EXPORT_DETALLE_FIELDS])
+        yield _buffer.getvalue()
+        _buffer.seek(0)
+        _buffer.truncate()
+
+
+def _stream_export(render, desde: datetime, hasta: datetime):
+    """
+    Stream the rendered export in chunks of about _EXPORT_CHUNK_SIZE bytes.
+
+    The export owns its session because it outlives the request handler.
+    """
+    _db = database.get_session()
     try:
-        _items = ItemHandler().get_facturas(db)
+        _chunk = []
+        _chunk_size = 0
+        for _line in render(ItemHandler().iter_export_rows(_db, desde, hasta)):
+            _chunk.append(_line)
+            _chunk_size += len(_line)
+            if _chunk_size >= _EXPORT_CHUNK_SIZE:
+                yield "".join(_chunk).encode()
+                _chunk = []
+                _chunk_size = 0
+        if _chunk:
+            yield "".join(_chunk).encode()
+    except DatabaseException as de:
+        logger.error("[export_facturas] %s", de)
+        raise
+    finally:
+        _db.close()
+
+
+@router.get("/facturas", response_model=Page[ItemSchema])
+def get_all_items(page: PageRequest = Depends(), db: Session = Depends(get_session)):
+    try:
+        _items, _next_cursor = ItemHandler().get_facturas(db, page.after, page.limit)
         if not _items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No items found")
-        return _items
+        return {"items": _items, "next_cursor": _next_cursor}
     except DatabaseException as de:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=de)
+        raise http_exception(de)
 
 @router.get("/factura-by-id/{id}")
-async def get_item_by_id(id: int, db: Session = Depends(get_session)):
+def get_item_by_id(id: int, db: Session = Depends(get_session)):
     try:
         _factura = ItemHandler().get_factura_by_id(db, id)
         if not _factura:
@@ -34,13 +118,51 @@ async def get_item_by_id(id: int, db: Session = Depends(get_session)):
         _factura.detalles = _detalles
         return _factura
     except DatabaseException as de:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=de)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
+
+@router.get("/factura/{id}/full", response_model=FacturaFullSchema)
+def get_item_full(id: int, db: Session = Depends(get_session)):
+    try:
+        return ItemHandler().get_facturas_full(db, [id])[0]
+    except DatabaseException as de:
+        raise http_exception(de)
+
+@router.get("/facturas/full", response_model=List[FacturaFullSchema])
+def get_items_full(ids: List[int] = Query(..., max_length=MAX_PAGE_SIZE), db: Session = Depends(get_session)):
+    try:
+        return ItemHandler().get_facturas_full(db, set(ids))
+    except DatabaseException as de:
+        raise http_exception(de)
 
 @router.post("/factura", response_model=ItemSchema)
-async def create_item(item: RequestFactura, db: Session = Depends(get_session)):
+def create_item(item: RequestFactura, db: Session = Depends(get_session)):
     try:
         _item = ItemHandler().create_factura(db, item)
         return _item
     except DatabaseException as de:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=de)
-    
\ No newline at end of file
+        raise http_exception(de)
+    
+
+@router.post("/checkout", response_model=FacturaDetalleSchema, status_code=status.HTTP_201_CREATED)
+def checkout(item: RequestCheckout, db: Session = Depends(get_session)):
+    try:
+        _item = ItemHandler().checkout(db, item)
+        return _item
+    except DatabaseException as de:
+        raise http_exception(de)
+
+@router.get("/export/facturas")
+def export_facturas(desde: datetime,
+                    hasta: datetime,
+                    formato: Literal["ndjson", "csv"] = "ndjson",
+                    current_user: LocalUserSchema = Depends(get_current_user)):
+    if desde > hasta:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="desde must not be after hasta")
+    logger.info("%s [export_facturas] exporting facturas from %s to %s", current_user.username, desde, hasta)
+    if formato == "csv":
+        _render, _media_type = _export_csv, "text/csv"
+    else:
+        _render, _media_type = _export_ndjson, "application/x-ndjson"
+    return StreamingResponse(_stream_export(_render, desde, hasta),
+                             media_type=_media_type,
+                             headers={"Content-Disposition": f'attachment; filename="facturas.{formato}"'})
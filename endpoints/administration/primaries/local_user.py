@@ -13,6 +13,7 @@ from databases.axion.init_db import get_session
 from databases.axion.schemas.primaries.LocalUser import \
     LocalUser as LocalUserSchema
 from databases.axion.schemas.primaries.LocalUser import RequestLocalUser
+from databases.shared.database import InvalidRequestException
 from modules.login.utils import hash_password
 
 from ...shared.imports import *
@@ -23,42 +24,46 @@ router = APIRouter()
 
 
 @router.get("/local-users", 
-            response_model=List[LocalUserSchema],
+            response_model=Page[LocalUserSchema],
             status_code=status.HTTP_200_OK,
             summary="Get all local users of Axion.",
             response_description="All local users of Axion.")
-async def get_all_local_users(
+def get_all_local_users(
     current_user: Annotated[LocalUserSchema, Depends(get_current_user)],
-    db: Session = Depends(get_session)) -> List[LocalUserSchema]:
+    page: PageRequest = Depends(),
+    db: Session = Depends(get_session)) -> Page[LocalUserSchema]:
     """
     Get all local users.
     
-    This function retrieves all local user data from the database.
+    This function retrieves a page of local user data from the database.
     
     Args:
+        page (PageRequest): The cursor and size of the page.
         db (Session): The database session.
 
     Returns:
-        List[LocalUserSchema]: A list of all local user data.
+        Page[LocalUserSchema]: A page of local user data and the cursor of the next page.
     
     Raises:
         HTTPException: If no local users are found or if there is an internal server error.
     """
     try:
-        logger.info(f"{current_user.username} - [get_all_local_users] Getting all local users.")
-        _local_users = LocalUserHandler().get_all_local_users(db)
+        logger.info("%s - [get_all_local_users] Getting all local users.", current_user.username)
+        _local_users, _next_cursor = LocalUserHandler().get_all_local_users(db, page.after, page.limit)
         
         if not _local_users:
-            logger.info(f"{current_user.username} - [get_all_local_users] No local users found.")
+            logger.info("%s - [get_all_local_users] No local users found.", current_user.username)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No local users found.")
         
-        logger.info(f"{current_user.username} - [get_all_local_users] localUsers found.")
-        return _local_users
+        logger.info("%s - [get_all_local_users] localUsers found.", current_user.username)
+        return {"items": _local_users, "next_cursor": _next_cursor}
+    except InvalidRequestException as ire:
+        raise http_exception(ire)
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} - [get_all_local_users] Exception occurred: {repr(e)} traceback: {repr(tb)}")
+        logger.error("%s - [get_all_local_users] Exception occurred: %r traceback: %r", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch all local users.") from e
 
 @router.post("/local-user", 
@@ -76,7 +81,7 @@ async def get_all_local_users(
             status_code=status.HTTP_201_CREATED,
             summary="Add a new local user of Axion.",
             response_description="The newly created local user data.")
-async def add_new_local_user(
+def add_new_local_user(
     request: RequestLocalUser,
     db: Session = Depends(get_session))-> LocalUserSchema:
     """
@@ -96,11 +101,11 @@ async def add_new_local_user(
         HTTPException: If the local user is not authenticated, or if the local user already exists, or if there is an internal server error.
     """
     try:
-        logger.info(f"[add_new_local_user] Adding new local user {request.username}.")
+        logger.info("[add_new_local_user] Adding new local user %s.", request.username)
         existing_user = LocalUserHandler().get_local_user_by_username(db, request.username)
 
         if existing_user is not None:
-            logger.info(f"[add_new_local_user] Local User {request.username} already exists.")
+            logger.info("[add_new_local_user] Local User %s already exists.", request.username)
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Local User already exists.") 
        
         request.password = hash_password(request.password)
@@ -109,17 +114,17 @@ async def add_new_local_user(
         
         if _new_local_user is None:
             tb = traceback.format_exc()
-            logger.error(f"[add_new_local_user] New local user is None: {repr(e)} traceback {repr(tb)}")
+            logger.error("[add_new_local_user] New local user is None: %r traceback %r", e, tb)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Could not create local user due to an internal error.")
-        logger.info(f"[add_new_local_user] Local User {request.username} added.")
+        logger.info("[add_new_local_user] Local User %s added.", request.username)
         return _new_local_user
         
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"[add_new_local_user] Exception general occurred: {repr(e)} traceback {repr(tb)}")
+        logger.error("[add_new_local_user] Exception general occurred: %r traceback %r", e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to add new local user") from e
 
 @router.put("/local-user", 
@@ -137,7 +142,7 @@ async def add_new_local_user(
             status_code=status.HTTP_200_OK,
             summary="Update a local user of Axion.",
             response_description="The updated local user data.")
-async def update_local_user(
+def update_local_user(
     current_user: Annotated[LocalUserSchema, Depends(get_current_user)],
     request: LocalUserSchema,
     db: Session = Depends(get_session)):
@@ -158,29 +163,29 @@ async def update_local_user(
         HTTPException: If the local user is not found or if there is a database error.
     """
     try:
-        logger.info(f"{current_user.username} - [update_local_user] Updating local user {request.username}.")
+        logger.info("%s - [update_local_user] Updating local user %s.", current_user.username, request.username)
         user = LocalUserHandler().get_local_user_by_id(db, request.id)
         if user is None:
-            logger.error(f"{current_user.username} - [update_local_user] Local User {request.id} not found")
+            logger.error("%s - [update_local_user] Local User %s not found", current_user.username, request.id)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Local User {request.id} not found")
         existing_user = LocalUserHandler().get_local_user_by_username(db, request.username)
         if existing_user is not None and existing_user.id != request.id:
-            logger.info(f"{current_user.username} - [update_local_user] Local User {request.username} already exists.")
+            logger.info("%s - [update_local_user] Local User %s already exists.", current_user.username, request.username)
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Local User {request.username} already exists.")        
         _update_local_user = LocalUserHandler().update_local_user(db,
                                         request.id,
                                         request.username,
                                         hash_password(request.password_hash))
-        logger.info(f"{current_user.username} - [update_local_user] Local User {request.username} updated.")
+        logger.info("%s - [update_local_user] Local User %s updated.", current_user.username, request.username)
         return  LocalUserSchema.from_orm(_update_local_user)
     except DatabaseException as de:
-        logger.error(f"{current_user.username} - [update_local_user] Database error: {de.message}")
+        logger.error("%s - [update_local_user] Database error: %s", current_user.username, de.message)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error. Failed to update local user")
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} - [update_local_user] General exception occurred: {repr(e)} traceback {repr(tb)}")
+        logger.error("%s - [update_local_user] General exception occurred: %r traceback %r", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update local user") from e
 
 @router.delete("/local-user", 
@@ -198,7 +203,7 @@ async def update_local_user(
             status_code=status.HTTP_200_OK,
             summary="Delete a local user of Axion.",
             response_description="The deleted local user data.")
-async def delete_local_user(
+def delete_local_user(
     current_user: Annotated[LocalUserSchema, Depends(get_current_user)],
     db: Session = Depends(get_session),
     id: int = Query(ge=1,description="The ID of the local user must be an \
@@ -218,22 +223,22 @@ async def delete_local_user(
         HTTPException: If the local user is not found or if there is a database error.
     """
     try:
-        logger.info(f"{current_user.username} - [delete_local_user] Deleting local user {id}.")
+        logger.info("%s - [delete_local_user] Deleting local user %s.", current_user.username, id)
         user = LocalUserHandler().get_local_user_by_id(db, id)
         if user is None:
-            logger.info(f"{current_user.username} - [delete_local_user] Local User {id} not found")
+            logger.info("%s - [delete_local_user] Local User %s not found", current_user.username, id)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Local User {id} not found")
         _delete_local_user = LocalUserHandler().remove_local_user(db, id)
-        logger.info(f"{current_user.username} - [delete_local_user] Local User {id} deleted.")
+        logger.info("%s - [delete_local_user] Local User %s deleted.", current_user.username, id)
         return LocalUserSchema.from_orm(_delete_local_user)
     except DatabaseException as de:
-        logger.error(f"{current_user.username} - [delete_local_user] Database error: {de.message}")
+        logger.error("%s - [delete_local_user] Database error: %s", current_user.username, de.message)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error. Failed to delete local user")
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} - [delete_local_user] General exception occurred: {repr(e)} traceback {repr(tb)}")
+        logger.error("%s - [delete_local_user] General exception occurred: %r traceback %r", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete local user") from e
 
 @router.get("/local-user-by-name/{username}",
@@ -251,7 +256,7 @@ async def delete_local_user(
             status_code=status.HTTP_200_OK,
             summary = "Get an local user by username.",
             response_description = "Get an local user by username.")
-async def get_local_user_by_username(
+def get_local_user_by_username(
     current_user: Annotated[LocalUserSchema, Depends(get_current_user)],
     db: Session = Depends(get_session),
     username:str = Path(...,
@@ -270,19 +275,19 @@ async def get_local_user_by_username(
         HTTPException: If the local user is not found or an unexpected error occurs.
     """
     try:
-        logger.info(f"{current_user.username} - [get_local_user_by_username] Getting local user {username}.")
+        logger.info("%s - [get_local_user_by_username] Getting local user %s.", current_user.username, username)
         _local_user = LocalUserHandler().get_local_user_by_username(db, username)   
         if _local_user is None:
-            logger.info(f"{current_user.username} - [get_local_user_by_username] Local User {username} not found.")
+            logger.info("%s - [get_local_user_by_username] Local User %s not found.", current_user.username, username)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Local User {username} not found")
         
-        logger.info(f"{current_user.username} - [get_local_user_by_username] Local User {username} found.")
+        logger.info("%s - [get_local_user_by_username] Local User %s found.", current_user.username, username)
         return LocalUserSchema.from_orm(_local_user)
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} - [get_local_user_by_username] Exception occurred: {repr(e)} traceback {repr(tb)}")
+        logger.error("%s - [get_local_user_by_username] Exception occurred: %r traceback %r", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred.")
 
 @router.get("/local-user-by-id/{id}",
@@ -300,7 +305,7 @@ async def get_local_user_by_username(
             status_code=status.HTTP_200_OK,
             summary = "Get an local user by id.",
             response_description = "Get an local user by id.")
-async def get_local_user_by_id(
+def get_local_user_by_id(
     current_user: Annotated[LocalUserSchema, Depends(get_current_user)],
     db: Session = Depends(get_session),
     id:int = Path(ge=1, description="The ID of the local user must be an integer greater \
@@ -322,19 +327,19 @@ async def get_local_user_by_id(
         HTTPException: If the local user with the specified ID is not found or if an unexpected error occurs.
     """
     try:
-        logger.info(f"{current_user.username} - [get_local_user_by_id] Getting local user {id}.")
+        logger.info("%s - [get_local_user_by_id] Getting local user %s.", current_user.username, id)
         _local_user = LocalUserHandler().get_local_user_by_id(db, id)
         
         if _local_user is None:
-            logger.info(f"{current_user.username} - [get_local_user_by_id] Local User id {id} not found")
+            logger.info("%s - [get_local_user_by_id] Local User id %s not found", current_user.username, id)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Local User id {id} not found")
 
-        logger.info(f"{current_user.username} - [get_local_user_by_id] Local User {id} found.")
+        logger.info("%s - [get_local_user_by_id] Local User %s found.", current_user.username, id)
         return LocalUserSchema.from_orm(_local_user)
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} - [get_local_user_by_id] Exception occurred: {repr(e)} traceback {repr(tb)}")
+        logger.error("%s - [get_local_user_by_id] Exception occurred: %r traceback %r", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="An unexpected error occurred.")
@@ -6,8 +6,13 @@ Module that contains endpoints for equipment management.
 This module includes the setup for endpoints for equipment management. It includes
 routers for getting, creating, updating, and deleting items.
 """
+import hashlib
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
 
 from databases.axion.handlers.primaries.Producto import Producto as ItemHandler
+from databases.axion.handlers.primaries.Producto import catalog_cache
 from databases.axion.init_db import get_session
 from databases.axion.schemas.primaries.LocalUser import \
     LocalUser as LocalUserSchema
@@ -15,6 +20,7 @@ from databases.axion.schemas.primaries.Producto import Producto as ItemSchema
 from databases.axion.schemas.primaries.Producto import \
     RequestProducto as RequestItemSchema
 from databases.shared.database import DatabaseException
+from modules.images.utils import store_image
 
 from ...shared.imports import *
 
@@ -22,44 +28,77 @@ logger = CustomLogger("administration/producto")
 
 router = APIRouter()
 
+_catalog_adapter = TypeAdapter(Page[ItemSchema])
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+    """
+    if not if_none_match:
+        return False
+    _candidates = [_candidate.strip() for _candidate in if_none_match.split(",")]
+    return "*" in _candidates or etag in _candidates
+
 
 @router.get("/productos",
-            response_model=List[ItemSchema],
+            response_model=Page[ItemSchema],
             status_code=status.HTTP_200_OK,
             summary="Get all items",
-            response_description="A list of all items")
-async def get_all_items(
+            response_description="A page of items")
+def get_all_items(
+    request: Request,
+    page: PageRequest = Depends(),
     current_user: LocalUserSchema = Depends(get_current_user),
-    db: Session = Depends(get_session))-> List[ItemSchema]:
+    db: Session = Depends(get_session))-> Page[ItemSchema]:
     """
     Get all items.
 
+    The serialized catalog is cached until a product changes and is served with a
+    strong ETag, so clients polling with If-None-Match get a 304 Not Modified.
+
     Args:
+        request (Request): The incoming request.
+        page (PageRequest): The cursor and size of the page.
         current_user (LocalUserSchema): The current user.
         db (Session): The database session.
 
     Returns:
-        list: A list of all items.
+        Page[ItemSchema]: A page of items and the cursor of the next page.
 
     Raises:
         DatabaseException: If an error occurs while retrieving items.
     """
+    def _build_catalog():
+        _items, _next_cursor = ItemHandler().get_all_items(db, page.after, page.limit)
+        if not _items:
+            return None
+        _body = _catalog_adapter.dump_json(Page[ItemSchema](
+            items=[ItemSchema.model_validate(_item) for _item in _items],
+            next_cursor=_next_cursor))
+        return _body, f'"{hashlib.sha256(_body).hexdigest()}"'
+
     try:
-        logger.info(f"{current_user.username} [get_all_items] is getting all items")
-        _items = ItemHandler().get_all_items(db)
-        if not _items:      
-            logger.info(f"{current_user.username} [get_all_items] no items found")
+        logger.info("%s [get_all_items] is getting all items", current_user.username)
+        _catalog = catalog_cache.get_or_build((page.cursor, page.limit), _build_catalog)
+        if _catalog is None:
+            logger.info("%s [get_all_items] no items found", current_user.username)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No items found")
-        logger.info(f"{current_user.username} [get_all_items] items found")
-        return _items
+        _body, _etag = _catalog
+        _headers = {"ETag": _etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), _etag):
+            logger.info("%s [get_all_items] items not modified", current_user.username)
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_headers)
+        logger.info("%s [get_all_items] items found", current_user.username)
+        return Response(content=_body, media_type="application/json", headers=_headers)
     except DatabaseException as de:
-        logger.error(f"{current_user.username} [get_all_items] {de}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
+        logger.error("%s [get_all_items] %s", current_user.username, de)
+        raise http_exception(de)
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} [get_all_items] {str(e)}\n{tb}")
+        logger.error("%s [get_all_items] %s\n%s", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.post("/producto",
@@ -75,10 +114,13 @@ async def create_item(
     """
     Create an item.
 
+    The image is streamed to disk and stored with its resized variants under its content hash.
+
     Args:
         item (RequestItemSchema): The item data.
         current_user (LocalUserSchema): The current user.
         db (Session): The database session.
+        file (UploadFile): The image file.
 
     Returns:
         Item: The created item.
@@ -87,24 +129,20 @@ async def create_item(
         DatabaseException: If an error occurs while creating the item.
     """
     try:
-        logger.info(f"{current_user.username} [create_item] is creating an item")
-        # Guardar la imagen
-        file_location = f"images/{file.filename}"
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        item.imagen_url = file_location  # Actualizar la URL de la imagen en el objeto item
-        _item = ItemHandler().create_item(db, item)
-        logger.info(f"{current_user.username} [create_item] item created")
+        logger.info("%s [create_item] is creating an item", current_user.username)
+        # Guardar la imagen y sus variantes
+        item.imagen_url, _imagen_variantes = await store_image(file)
+        _item = await run_in_threadpool(ItemHandler().create_item, db, item, _imagen_variantes)
+        logger.info("%s [create_item] item created", current_user.username)
         return _item
     except DatabaseException as de:
-        logger.error(f"{current_user.username} [create_item] {de}")
+        logger.error("%s [create_item] %s", current_user.username, de)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} [create_item] {str(e)}\n{tb}")
+        logger.error("%s [create_item] %s\n%s", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.put("/producto",
@@ -112,7 +150,7 @@ async def create_item(
             status_code=status.HTTP_200_OK,
             summary="Update an item",
             response_description="The updated item")
-async def update_item(
+def update_item(
     item: ItemSchema,
     current_user: LocalUserSchema = Depends(get_current_user),
     db: Session = Depends(get_session)) -> ItemSchema:
@@ -131,18 +169,18 @@ async def update_item(
         DatabaseException: If an error occurs while updating the item.
     """
     try:
-        logger.info(f"{current_user.username} [update_item] is updating an item")
+        logger.info("%s [update_item] is updating an item", current_user.username)
         _item = ItemHandler().update_item(db, item)
-        logger.info(f"{current_user.username} [update_item] item updated")
+        logger.info("%s [update_item] item updated", current_user.username)
         return _item
     except DatabaseException as de:
-        logger.error(f"{current_user.username} [update_item] {de}")
+        logger.error("%s [update_item] %s", current_user.username, de)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} [update_item] {str(e)}\n{tb}")
+        logger.error("%s [update_item] %s\n%s", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
 @router.put("/producto/imagen",
@@ -171,25 +209,23 @@ async def update_item_image(
         DatabaseException: If an error occurs while updating the item image.
     """
     try:
-        logger.info(f"{current_user.username} [update_item_image] is updating an item image")
+        logger.info("%s [update_item_image] is updating an item image", current_user.username)
         
-        # Guardar la imagen
-        file_location = f"images/{file.filename}"
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Guardar la imagen y sus variantes
+        _imagen_url, _imagen_variantes = await store_image(file)
 
         # Actualizar la URL de la imagen en la base de datos
-        _item = ItemHandler().update_item_image(db, item_id, file_location)
-        logger.info(f"{current_user.username} [update_item_image] item image updated")
+        _item = await run_in_threadpool(ItemHandler().update_item_image, db, item_id, _imagen_url, _imagen_variantes)
+        logger.info("%s [update_item_image] item image updated", current_user.username)
         return _item
     except DatabaseException as de:
-        logger.error(f"{current_user.username} [update_item_image] {de}")
+        logger.error("%s [update_item_image] %s", current_user.username, de)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} [update_item_image] {str(e)}\n{tb}")
+        logger.error("%s [update_item_image] %s\n%s", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.delete("/producto",
@@ -197,7 +233,7 @@ async def update_item_image(
             status_code=status.HTTP_200_OK,
             summary="Delete an item",
             response_description="The deleted item")
-async def delete_item(
+def delete_item(
     id: int,
     current_user: LocalUserSchema = Depends(get_current_user),
     db: Session = Depends(get_session)) -> ItemSchema:
@@ -216,19 +252,19 @@ async def delete_item(
         DatabaseException: If an error occurs while deleting the item.
     """
     try:
-        logger.info(f"{current_user.username} [delete_item] is deleting an item")
+        logger.info("%s [delete_item] is deleting an item", current_user.username)
         _item = ItemHandler().delete_item(db, id)
-        logger.info(f"{current_user.username} [delete_item] item deleted")
+        logger.info("%s [delete_item] item deleted", current_user.username)
         return _item
     except DatabaseException as de:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} [delete_item] {de}\n{tb}")
+        logger.error("%s [delete_item] %s\n%s", current_user.username, de, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} [delete_item] {str(e)}\n{tb}")
+        logger.error("%s [delete_item] %s\n%s", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.get("/producto-by-id/{id}",
@@ -236,7 +272,7 @@ async def delete_item(
             status_code=status.HTTP_200_OK,
             summary="Get an item by id",
             response_description="The item found")
-async def get_item_by_id(
+def get_item_by_id(
     id: int,
     current_user: LocalUserSchema = Depends(get_current_user),
     db: Session = Depends(get_session)) -> ItemSchema:
@@ -255,19 +291,19 @@ async def get_item_by_id(
         DatabaseException: If an error occurs while retrieving the item.
     """
     try:
-        logger.info(f"{current_user.username} [get_item_by_id] is getting an item by id")
+        logger.info("%s [get_item_by_id] is getting an item by id", current_user.username)
         _item = ItemHandler().get_item_by_id(db, id)
         if not _item:
-            logger.info(f"{current_user.username} [get_item_by_id] no item found")
+            logger.info("%s [get_item_by_id] no item found", current_user.username)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No item found")
-        logger.info(f"{current_user.username} [get_item_by_id] item found")
+        logger.info("%s [get_item_by_id] item found", current_user.username)
         return _item
     except DatabaseException as de:
-        logger.error(f"{current_user.username} [get_item_by_id] {de}")
+        logger.error("%s [get_item_by_id] %s", current_user.username, de)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{current_user.username} [get_item_by_id] {str(e)}\n{tb}")
+        logger.error("%s [get_item_by_id] %s\n%s", current_user.username, e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -0,0 +1,149 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains endpoints for sales reports.
+
+This module includes the setup for endpoints for sales reports. It includes
+routers for the top productos, the sales per hour of the day and the daily sales.
+"""
+from datetime import datetime
+
+from databases.axion.handlers.primaries.Reporte import Reporte as ReporteHandler
+from databases.axion.init_db import get_session
+from databases.axion.schemas.primaries.LocalUser import \
+    LocalUser as LocalUserSchema
+from databases.axion.schemas.primaries.Reporte import (TopProductoSchema,
+                                                       VentasDiariasSchema,
+                                                       VentasPorHoraSchema)
+from databases.shared.database import DatabaseException
+
+from ...shared.imports import *
+
+logger = CustomLogger("administration/reportes")
+
+router = APIRouter()
+
+
+def _check_range(desde: datetime, hasta: datetime):
+    if desde > hasta:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="desde must not be after hasta")
+
+
+@router.get("/reportes/top-productos",
+            response_model=List[TopProductoSchema],
+            status_code=status.HTTP_200_OK,
+            summary="Get the best selling productos",
+            response_description="The best selling productos by revenue")
+def get_top_productos(
+    desde: datetime,
+    hasta: datetime,
+    limit: int = Query(10, ge=1, le=200),
+    current_user: LocalUserSchema = Depends(get_current_user),
+    db: Session = Depends(get_session)) -> List[TopProductoSchema]:
+    """
+    Get the best selling productos by revenue.
+
+    Args:
+        desde (datetime): Start of the range, inclusive.
+        hasta (datetime): End of the range, inclusive.
+        limit (int): The number of productos to return.
+        current_user (LocalUserSchema): The current user.
+        db (Session): The database session.
+
+    Returns:
+        list: The best selling productos with units sold and revenue.
+
+    Raises:
+        DatabaseException: If an error occurs while computing the report.
+    """
+    try:
+        _check_range(desde, hasta)
+        logger.info("%s [get_top_productos] is getting the top productos", current_user.username)
+        return ReporteHandler().get_top_productos(db, desde, hasta, limit)
+    except DatabaseException as de:
+        logger.error("%s [get_top_productos] %s", current_user.username, de)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
+    except HTTPException as httpe:
+        raise httpe
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error("%s [get_top_productos] %s\n%s", current_user.username, e, tb)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/reportes/ventas-por-hora",
+            response_model=List[VentasPorHoraSchema],
+            status_code=status.HTTP_200_OK,
+            summary="Get the sales per hour of the day",
+            response_description="The number of facturas and revenue per hour of the day")
+def get_ventas_por_hora(
+    desde: datetime,
+    hasta: datetime,
+    current_user: LocalUserSchema = Depends(get_current_user),
+    db: Session = Depends(get_session)) -> List[VentasPorHoraSchema]:
+    """
+    Get the number of facturas and revenue per hour of the day.
+
+    Args:
+        desde (datetime): Start of the range, inclusive.
+        hasta (datetime): End of the range, inclusive.
+        current_user (LocalUserSchema): The current user.
+        db (Session): The database session.
+
+    Returns:
+        list: The sales per hour of the day.
+
+    Raises:
+        DatabaseException: If an error occurs while computing the report.
+    """
+    try:
+        _check_range(desde, hasta)
+        logger.info("%s [get_ventas_por_hora] is getting the sales per hour", current_user.username)
+        return ReporteHandler().get_ventas_por_hora(db, desde, hasta)
+    except DatabaseException as de:
+        logger.error("%s [get_ventas_por_hora] %s", current_user.username, de)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
+    except HTTPException as httpe:
+        raise httpe
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error("%s [get_ventas_por_hora] %s\n%s", current_user.username, e, tb)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/reportes/ventas-diarias",
+            response_model=List[VentasDiariasSchema],
+            status_code=status.HTTP_200_OK,
+            summary="Get the daily sales",
+            response_description="The number of facturas and revenue per day")
+def get_ventas_diarias(
+    desde: datetime,
+    hasta: datetime,
+    current_user: LocalUserSchema = Depends(get_current_user),
+    db: Session = Depends(get_session)) -> List[VentasDiariasSchema]:
+    """
+    Get the number of facturas and revenue per day.
+
+    Args:
+        desde (datetime): Start of the range, inclusive.
+        hasta (datetime): End of the range, inclusive.
+        current_user (LocalUserSchema): The current user.
+        db (Session): The database session.
+
+    Returns:
+        list: The daily sales.
+
+    Raises:
+        DatabaseException: If an error occurs while computing the report.
+    """
+    try:
+        _check_range(desde, hasta)
+        logger.info("%s [get_ventas_diarias] is getting the daily sales", current_user.username)
+        return ReporteHandler().get_ventas_diarias(db, desde, hasta)
+    except DatabaseException as de:
+        logger.error("%s [get_ventas_diarias] %s", current_user.username, de)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
+    except HTTPException as httpe:
+        raise httpe
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error("%s [get_ventas_diarias] %s\n%s", current_user.username, e, tb)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
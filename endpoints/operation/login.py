@@ -13,6 +13,7 @@ from typing import Annotated, List
 
 from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
                      status)
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
@@ -23,8 +24,10 @@ from databases.axion.init_db import get_session
 from databases.axion.schemas.primaries.LocalUser import \
     LocalUser as LocalUserSchema
 from databases.axion.schemas.primaries.LocalUser import RequestLocalUser
-from modules.login.schemas import Token, TokenData
-from modules.login.utils import create_access_token, verify_password
+from modules.login.schemas import RefreshRequest, Token, TokenData
+from modules.login.throttle import get_client_ip, login_throttle
+from modules.login.utils import (decode_token, issue_tokens, oauth2_scheme,
+                                 revoke_token, verify_password_async)
 
 from ..shared.CustomLogger import CustomLogger
 
@@ -32,8 +35,6 @@ logger = CustomLogger('operation/login')
 
 router = APIRouter()
 
-ACCESS_TOKEN_EXPIRE_MINUTES = 200
-
 @router.post("", response_model=Token)
 async def login(
     request: Request,
@@ -41,7 +42,7 @@ async def login(
     db: Session = Depends(get_session)
 ) -> Token:
     """
-    Authenticate a user and return an access token.
+    Authenticate a user and return an access token and the refresh token that renews it.
 
     Args:
         request (Request): The incoming request object.
@@ -49,35 +50,100 @@ async def login(
         db (Session): Database session dependency.
 
     Returns:
-        Token: Token object containing access token and token type.
+        Token: Token object containing access token, refresh token and token type.
     """
     try:
-        client_ip = request.client.host
+        client_ip = get_client_ip(request)
         username = form_data.username
         password = form_data.password
         check_ldap = True
 
-        logger.info(f"[login] Attempting to log in user with username: {username} from IP: {client_ip}")
+        logger.info("[login] Attempting to log in user with username: %s from IP: %s", username, client_ip)
+
+        # Counts the attempt, or rejects clients over their limit, before the lookup and the password verification
+        attempted_at = await run_in_threadpool(login_throttle.hit, client_ip, username)
 
-        user = LocalUserHandler().get_local_user_by_username(db, username)
+        user = await run_in_threadpool(LocalUserHandler().get_local_user_by_username, db, username)
         if user is None:
-            logger.info(f"[login] User {username} not found")
+            logger.info("[login] User %s not found", username)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-        if not verify_password(password, user.password_hash):
-            logger.info(f"[login] Incorrect password for user: {username}")
+        if not await verify_password_async(password, user.password_hash):
+            logger.info("[login] Incorrect password for user: %s", username)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(data={"sub": user.username}, expires_delta=access_token_expires)
-        
-        logger.info(f"[login] User {username} successfully logged in from IP: {client_ip}")
+        # Only failed attempts count towards the limits
+        await run_in_threadpool(login_throttle.refund, client_ip, username, attempted_at)
+        token = issue_tokens(user.id, user.username, user.token_version)
+
+        logger.info("[login] User %s successfully logged in from IP: %s", username, client_ip)
+
+        return token
+
+    except HTTPException as httpe:
+        raise httpe
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error("%s - [login] An unexpected error occurred: %r traceback: %r", username, e, tb)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred.")
+
+@router.post("/refresh", response_model=Token)
+def refresh(body: RefreshRequest, db: Session = Depends(get_session)) -> Token:
+    """
+    Exchange a refresh token for a new access and refresh token pair, without the password.
+
+    The refresh token is single use: it is revoked once exchanged, and of concurrent
+    requests exchanging the same token only one succeeds.
+
+    Args:
+        body (RefreshRequest): The refresh token.
+        db (Session): Database session dependency.
+
+    Returns:
+        Token: Token object containing the new access token, refresh token and token type.
+    """
+    try:
+        _payload = decode_token(body.refresh_token, db, token_type="refresh")
+        if not revoke_token(_payload):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                                detail="Invalid Credentials",
+                                headers={"WWW-Authenticate": "Bearer"})
+        logger.debug("[refresh] Renewing tokens of user: %s", _payload["sub"])
+        return issue_tokens(_payload["uid"], _payload["sub"], _payload["ver"])
+
+    except HTTPException as httpe:
+        raise httpe
+    except Exception as e:
+        tb = traceback.format_exc()
+        logger.error("[refresh] An unexpected error occurred: %r traceback: %r", e, tb)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred.")
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(token: Annotated[str, Depends(oauth2_scheme)],
+           body: RefreshRequest | None = None,
+           db: Session = Depends(get_session)):
+    """
+    Revoke the access token of the request and, if given, the refresh token of the same user.
 
-        return Token(access_token=access_token, token_type="bearer")
+    Args:
+        token (str): The access token to revoke.
+        body (RefreshRequest | None): The refresh token to revoke.
+        db (Session): Database session dependency.
+    """
+    try:
+        _payload = decode_token(token, db)
+        if body is not None:
+            _refresh_payload = decode_token(body.refresh_token, db, token_type="refresh")
+            if _refresh_payload["uid"] != _payload["uid"]:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                                    detail="The refresh token belongs to another user.")
+            revoke_token(_refresh_payload)
+        revoke_token(_payload)
+        logger.info("[logout] User %s logged out", _payload["sub"])
 
     except HTTPException as httpe:
         raise httpe
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"{username} - [login] An unexpected error occurred: {repr(e)} traceback: {repr(tb)}")
+        logger.error("[logout] An unexpected error occurred: %r traceback: %r", e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred.")
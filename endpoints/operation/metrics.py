@@ -0,0 +1,55 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the metrics endpoint.
+
+This module exposes the in-process metrics registry in the Prometheus text format
+and registers the collectors read at scrape time: database pool and caches. SQL
+statement durations are recorded by observe_query, added to the database by the
+application lifespan.
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from databases.axion.handlers.primaries.LocalUser import local_user_cache
+from databases.axion.handlers.primaries.Producto import catalog_cache
+from databases.axion.init_db import db
+from modules.metrics.registry import registry
+
+router = APIRouter()
+
+_CACHES = {"local_user": local_user_cache, "catalog": catalog_cache}
+
+
+def _pool_status():
+    _pool = db.get_engine().pool
+    return {
+        "size": _pool.size() if hasattr(_pool, "size") else 0,
+        "checked_out": _pool.checkedout() if hasattr(_pool, "checkedout") else 0,
+        "overflow": max(_pool.overflow(), 0) if hasattr(_pool, "overflow") else 0,
+    }
+
+def _cache_stat(key: str):
+    return lambda: [((_name,), _cache.stats()[key]) for _name, _cache in _CACHES.items()]
+
+
+registry.gauge("db_pool_size", "Connections kept by the database pool.", (),
+               lambda: [((), _pool_status()["size"])])
+registry.gauge("db_pool_checked_out", "Database connections currently in use.", (),
+               lambda: [((), _pool_status()["checked_out"])])
+registry.gauge("db_pool_overflow", "Database connections open beyond the pool size.", (),
+               lambda: [((), _pool_status()["overflow"])])
+registry.gauge("cache_hits_total", "Cache lookups served from the cache.", ("cache",),
+               _cache_stat("hits"), type="counter")
+registry.gauge("cache_misses_total", "Cache lookups not served from the cache.", ("cache",),
+               _cache_stat("misses"), type="counter")
+registry.gauge("cache_entries", "Entries currently held by the cache.", ("cache",),
+               _cache_stat("size"))
+
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """
+    Return every metric in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
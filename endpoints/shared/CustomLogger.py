@@ -7,9 +7,40 @@ This module includes the setup for logging functions for the project. It
 includes functions for setting up logging to a file, setting up logging to
 the console, and setting up logging to both the console and a file.
 """
+import atexit
+import json
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import threading
+from logging.handlers import (QueueHandler, QueueListener,
+                              TimedRotatingFileHandler)
+
+from config import LOG_LEVEL, LOG_QUEUE
+
+# One queue and listener thread per log file, shared by every logger writing to it
+_queue_handlers = {}
+_queue_handlers_lock = threading.Lock()
+
+
+def _get_queue_handler(file_log: str, file_handler: logging.Handler) -> QueueHandler:
+    """
+    Return the handler queueing records for ``file_log``, starting its listener thread once.
+
+    Args:
+        file_log (str): The path of the log file.
+        file_handler (logging.Handler): The handler writing the file, used by the first caller only.
+    """
+    with _queue_handlers_lock:
+        if file_log not in _queue_handlers:
+            _queue = queue.SimpleQueue()
+            _listener = QueueListener(_queue, file_handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_listener.stop)
+            _queue_handlers[file_log] = QueueHandler(_queue)
+        else:
+            file_handler.close()
+        return _queue_handlers[file_log]
 
 
 class CustomLogger:
@@ -19,17 +50,22 @@ class CustomLogger:
     This class includes the setup for logging functions for the entire project. It
     includes functions for setting up logging to a file, setting up logging to
     the console, and setting up logging to both the console and a file.
+
+    Messages use lazy %-style formatting: ``logger.info("%s [route] done", username)``
+    only builds the string if the level is enabled. In queued mode (LOG_QUEUE) the
+    calling thread only enqueues the record and a background thread writes the file.
     """
-    def __init__(self, module, log_file='app.log', backup_count=0):
+    def __init__(self, module, log_file='app.log', backup_count=0, queued=LOG_QUEUE, log_format=None):
         self.logger = logging.getLogger(module)
-        self.logger.setLevel(logging.INFO)
+        self.logger.setLevel(LOG_LEVEL)
         # Ensure that handlers are not added multiple times
         if not self.logger.hasHandlers():
             dir_logs = "logs"
-            self._set_log_environment(dir_logs, log_file, backup_count)
+            self._set_log_environment(dir_logs, log_file, backup_count, queued, log_format)
             
 
-    def _set_log_environment(self, log_name_dir: str, log_name_file: str, backup_count: int):
+    def _set_log_environment(self, log_name_dir: str, log_name_file: str, backup_count: int,
+                             queued: bool = False, log_format: str | None = None):
         """
         Creates a directory and file for logging purposes.
 
@@ -37,6 +73,8 @@ class CustomLogger:
             log_name_dir (str): The directory path where the log file will be stored.
             log_name_file (str): The name of the log file.
             backup_count (int): Number of backup files to retain.
+            queued (bool): Write the file from a background thread fed by a queue.
+            log_format (str | None): The format of the lines, the default one if None.
 
         Returns:
             None
@@ -63,39 +101,49 @@ class CustomLogger:
                                            backupCount=backup_count
                                            )
         formatter = logging.Formatter(
+            log_format or
             '%(asctime)s - %(name)s - %(levelname)s - PID' +
             ': %(process)d(%(threadName)s): %(message)s'
         )
         handler.setFormatter(formatter)
+        if queued:
+            handler = _get_queue_handler(os.path.abspath(file_log), handler)
         self.logger.addHandler(handler)
 
 
-    def debug(self, message):
+    def debug(self, message, *args, **kwargs):
+        """
+        Logs a message at the debug level, formatted with ``args`` only if it is emitted.
+        """
+        self.logger.debug(message, *args, **kwargs)
+
+    def info(self, message, *args, **kwargs):
         """
-        Logs a message at the debug level.
+        Logs a message at the info level, formatted with ``args`` only if it is emitted.
         """
-        self.logger.debug(message)
+        self.logger.info(message, *args, **kwargs)
 
-    def info(self, message):
+    def warning(self, message, *args, **kwargs):
         """
-        Logs a message at the info level.
+        Logs a message at the warning level, formatted with ``args`` only if it is emitted.
         """
-        self.logger.info(message)
+        self.logger.warning(message, *args, **kwargs)
 
-    def warning(self, message):
+    def error(self, message, *args, **kwargs):
         """
-        Logs a message at the warning level.
+        Logs a message at the error level, formatted with ``args`` only if it is emitted.
         """
-        self.logger.warning(message)
+        self.logger.error(message, *args, **kwargs)
 
-    def error(self, message):
+    def critical(self, message, *args, **kwargs):
         """
-        Logs a message at the error level.
+        Logs a message at the critical level, formatted with ``args`` only if it is emitted.
         """
-        self.logger.error(message)
+        self.logger.critical(message, *args, **kwargs)
 
-    def critical(self, message):
+    def json(self, fields: dict, level: int = logging.INFO):
         """
-        Logs a message at the critical level.
+        Logs ``fields`` as a single JSON object, serialized only if the level is enabled.
         """
-        self.logger.critical(message)
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, "%s", json.dumps(fields, default=str, separators=(",", ":")))
@@ -0,0 +1,33 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the translation of handler errors into HTTP errors.
+"""
+from fastapi import HTTPException, status
+
+from databases.shared.database import (ConflictException, DatabaseException,
+                                       InvalidRequestException,
+                                       NotFoundException)
+
+# Most specific first, errors of the request are client errors and anything else a server error
+_STATUS_CODES = (
+    (NotFoundException, status.HTTP_404_NOT_FOUND),
+    (ConflictException, status.HTTP_409_CONFLICT),
+    (InvalidRequestException, status.HTTP_400_BAD_REQUEST),
+)
+
+
+def http_exception(de: DatabaseException) -> HTTPException:
+    """
+    Build the HTTPException answering a DatabaseException raised by a handler.
+
+    Args:
+        de (DatabaseException): The error raised by the handler.
+
+    Returns:
+        HTTPException: The error to raise, with the message of ``de`` as detail.
+    """
+    for _type, _status_code in _STATUS_CODES:
+        if isinstance(de, _type):
+            return HTTPException(status_code=_status_code, detail=str(de))
+    return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(de))
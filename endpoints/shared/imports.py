@@ -4,13 +4,16 @@ import traceback
 from typing import Annotated, List
 
 from fastapi import (APIRouter, Body, Depends, File, HTTPException, Path,
-                     Query, UploadFile, status)
+                     Query, Request, Response, UploadFile, status)
 from PIL import Image
 from psycopg2.errors import UniqueViolation
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from databases.shared.database import DatabaseException
+from databases.shared.pagination import Page
 from modules.login.utils import get_current_user
 
 from .CustomLogger import CustomLogger
+from .errors import http_exception
+from .pagination import PageRequest
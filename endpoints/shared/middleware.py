@@ -0,0 +1,152 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the ASGI middlewares of the application.
+"""
+import random
+import time
+from datetime import datetime, timezone
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+
+from config import REQUEST_LOG_SAMPLE_RATE, REQUEST_MAX_BODY_SIZE
+from databases.shared.database import QueryStats, query_stats
+from modules.metrics.registry import http_request_duration, http_requests
+
+from .CustomLogger import CustomLogger
+
+request_logger = CustomLogger("requests", log_file="requests.log", log_format="%(message)s")
+
+
+def _route_template(scope) -> str | None:
+    """
+    Return the path of the matched route with its parameters as placeholders, None if unmatched.
+    """
+    if scope.get("route") is None:
+        if scope.get("endpoint") is None:
+            return None
+        # Mounted application, e.g. the product images
+        return f"{scope.get('root_path', '')}/{{path}}"
+    _values = {str(_value): _name for _name, _value in scope.get("path_params", {}).items()}
+    return "/".join(f"{{{_values[_segment]}}}" if _segment in _values else _segment
+                    for _segment in scope["path"].split("/"))
+
+
+class RequestLogMiddleware:
+    """
+    Middleware logging one JSON line per sampled HTTP request.
+
+    Each line has the route template, status code, total latency and the number of
+    SQL statements and time spent in them while serving the request, streamed bodies
+    included. Unsampled requests are passed through untouched.
+    """
+    def __init__(self, app, sample_rate: float = REQUEST_LOG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        _stats = QueryStats()
+        _token = query_stats.set(_stats)
+        _status = 500
+        _started_at = time.perf_counter()
+
+        async def _send(message):
+            nonlocal _status
+            if message["type"] == "http.response.start":
+                _status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _duration = time.perf_counter() - _started_at
+            query_stats.reset(_token)
+            request_logger.json({
+                "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "method": scope["method"],
+                "route": _route_template(scope),
+                "path": scope["path"],
+                "status": _status,
+                "duration_ms": round(_duration * 1000, 3),
+                "sql_count": _stats.count,
+                "sql_ms": round(_stats.duration * 1000, 3),
+            })
+
+
+class MetricsMiddleware:
+    """
+    Middleware counting every HTTP request and recording its latency by route.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        _status = 500
+        _started_at = time.perf_counter()
+
+        async def _send(message):
+            nonlocal _status
+            if message["type"] == "http.response.start":
+                _status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            # Unmatched paths share one label to keep the number of series bounded
+            _route = _route_template(scope) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - _started_at, scope["method"], _route)
+            http_requests.inc(scope["method"], _route, str(_status))
+
+
+class BodySizeLimitMiddleware:
+    """
+    Middleware rejecting request bodies larger than ``max_size`` with a 413.
+
+    A declared Content-Length is checked before the body is read. Bodies without one are
+    counted while they are received and the request fails as soon as they go over the
+    limit, so multipart uploads are never spooled past it.
+    """
+    def __init__(self, app, max_size: int = REQUEST_MAX_BODY_SIZE):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        _headers = dict(scope["headers"])
+        try:
+            _declared = int(_headers.get(b"content-length", b"0"))
+        except ValueError:
+            _declared = 0
+        if _declared > self.max_size:
+            _response = JSONResponse({"detail": "Request body too large"},
+                                     status_code=status.HTTP_413_CONTENT_TOO_LARGE)
+            await _response(scope, receive, send)
+            return
+
+        _received = 0
+
+        async def _receive():
+            nonlocal _received
+            message = await receive()
+            if message["type"] == "http.request":
+                _received += len(message.get("body", b""))
+                if _received > self.max_size:
+                    # Raised while FastAPI reads the body, it is answered as any HTTPException
+                    raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                                        detail="Request body too large")
+            return message
+
+        await self.app(scope, _receive, send)
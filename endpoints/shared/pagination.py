@@ -0,0 +1,27 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the pagination parameters shared by the list endpoints.
+"""
+from fastapi import HTTPException, Query, status
+
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from databases.shared.pagination import decode_cursor
+
+
+class PageRequest:
+    """
+    Pagination parameters of a list request.
+
+    The page size is capped at MAX_PAGE_SIZE and the cursor is decoded up front so
+    malformed cursors are rejected with a 400.
+    """
+    def __init__(self,
+                 cursor: str | None = Query(None, description="The next_cursor returned by the previous page."),
+                 limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, description=f"Rows per page, at most {MAX_PAGE_SIZE}.")):
+        self.cursor = cursor
+        self.limit = min(limit, MAX_PAGE_SIZE)
+        try:
+            self.after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
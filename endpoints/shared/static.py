@@ -0,0 +1,31 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the static file application serving product images.
+"""
+from starlette.staticfiles import StaticFiles
+
+from modules.images.utils import CONTENT_HASHED
+
+
+class ImageFiles(StaticFiles):
+    """
+    Static files served with caching headers suited to product images.
+
+    Content-hashed files never change under the same name, so clients may keep them
+    forever. Any other file must be revalidated with its ETag or Last-Modified date.
+    Conditional requests, byte ranges and zero-copy sending are handled by Starlette.
+    Dot files, such as uploads and variants still being written, are not served.
+    """
+    def lookup_path(self, path: str):
+        if any(_part.startswith(".") for _part in path.replace("\\", "/").split("/")):
+            return "", None
+        return super().lookup_path(path)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        _response = super().file_response(full_path, stat_result, scope, status_code)
+        if CONTENT_HASHED.match(str(full_path).rsplit("/", 1)[-1]):
+            _response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            _response.headers["Cache-Control"] = "no-cache"
+        return _response
@@ -6,18 +6,31 @@ start the scheduler, load the scheduled tasks, and create the jobs for the sched
 The module also imports the redirect_to_endpoints function from the routers.directory module and calls 
 it to add the routers to the FastAPI application.
 """
+import os
 from contextlib import asynccontextmanager
 
 import uvicorn
+from anyio import to_thread
+from apscheduler.schedulers.background import BackgroundScheduler
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import FRONTEND_API_URL
-from databases.axion.init_db import initialize_database
+from config import (FRONTEND_API_URL, IMAGE_GC_INTERVAL_MINUTES, IMAGES_DIR,
+                    REQUEST_LOG_SAMPLE_RATE, WORKER_THREADS)
+from databases.axion.init_db import db, initialize_database
+from endpoints.shared.middleware import (BodySizeLimitMiddleware,
+                                        MetricsMiddleware,
+                                        RequestLogMiddleware)
+from endpoints.shared.static import ImageFiles
+from modules.images.gc import run_image_gc
+from modules.images.utils import IMAGES_URL
+from modules.metrics.registry import observe_query
 from routers.directory import redirect_to_endpoints
 
 app = FastAPI()
 
+# Innermost, so its 413 still gets the CORS headers and is logged and measured
+app.add_middleware(BodySizeLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[FRONTEND_API_URL],
@@ -26,12 +39,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(RequestLogMiddleware, sample_rate=REQUEST_LOG_SAMPLE_RATE)
+app.add_middleware(MetricsMiddleware)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Endpoints are synchronous and run on this pool, off the event loop
+    to_thread.current_default_thread_limiter().total_tokens = WORKER_THREADS
     initialize_database()
+    db.add_query_observer(observe_query)
+    scheduler = BackgroundScheduler()
+    if IMAGE_GC_INTERVAL_MINUTES > 0:
+        scheduler.add_job(run_image_gc, "interval", minutes=IMAGE_GC_INTERVAL_MINUTES,
+                          id="image_gc", max_instances=1, coalesce=True)
+    scheduler.start()
     yield
+    scheduler.shutdown(wait=False)
+    db.remove_query_observer(observe_query)
 
 app.router.lifespan_context = lifespan
+
+os.makedirs(IMAGES_DIR, exist_ok=True)
+app.mount(IMAGES_URL, ImageFiles(directory=IMAGES_DIR), name="images")
     
 redirect_to_endpoints(app=app)
@@ -0,0 +1,82 @@
+"""
+Team: MSG - AXIANS
+
+Command line tasks for maintaining the database.
+
+Usage:
+    python manage.py migrate
+    python manage.py rebuild-ventas-diarias [--desde YYYY-MM-DD] [--hasta YYYY-MM-DD]
+    python manage.py gc-images [--grace-period SECONDS]
+"""
+import argparse
+from datetime import date
+
+from config import IMAGE_GC_GRACE_PERIOD
+from databases.axion.handlers.primaries.VentaDiaria import VentaDiaria
+from databases.axion.init_db import db, initialize_database
+from databases.axion.migrations import get_current_version
+from modules.images.gc import collect_images
+
+
+def migrate(args):
+    """
+    Create missing tables and apply pending migrations, done by initialize_database.
+    """
+    print(f"schema version: {get_current_version(db.get_engine())}")
+
+
+def rebuild_ventas_diarias(args):
+    """
+    Recompute the ventas_diarias rollup from facturas and detalles.
+    """
+    session = db.get_session()
+    try:
+        _rows = VentaDiaria().rebuild(session, args.desde, args.hasta)
+        print(f"ventas_diarias rebuilt: {_rows} rows written")
+    finally:
+        session.close()
+
+
+def gc_images(args):
+    """
+    Deduplicate product images and delete the ones no product references.
+    """
+    session = db.get_session()
+    try:
+        _report = collect_images(session, args.grace_period)
+        if _report is None:
+            print("images: already being collected by another process")
+            return
+        print(f"images: {_report['deleted']} of {_report['files']} deleted, "
+              f"{_report['deduplicated']} references deduplicated, "
+              f"{_report['reclaimed_bytes']} bytes reclaimed")
+    finally:
+        session.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Database maintenance tasks.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("migrate",
+                          help="Create missing tables and apply pending migrations.").set_defaults(func=migrate)
+
+    rebuild = subparsers.add_parser("rebuild-ventas-diarias",
+                                    help="Recompute the daily sales rollup, for backfills and repairs.")
+    rebuild.add_argument("--desde", type=date.fromisoformat, help="First day to rebuild.")
+    rebuild.add_argument("--hasta", type=date.fromisoformat, help="Last day to rebuild.")
+    rebuild.set_defaults(func=rebuild_ventas_diarias)
+
+    gc = subparsers.add_parser("gc-images",
+                               help="Deduplicate product images and delete unreferenced ones.")
+    gc.add_argument("--grace-period", type=float, default=IMAGE_GC_GRACE_PERIOD,
+                    help="Seconds an unreferenced image is kept after its last change.")
+    gc.set_defaults(func=gc_images)
+
+    args = parser.parse_args(argv)
+    initialize_database()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
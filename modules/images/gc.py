@@ -0,0 +1,154 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the garbage collection of product images.
+
+Replaced and deleted product images are left on disk by the endpoints. This job points
+products using identical images to a single file and deletes the files no product uses.
+It is scheduled in every worker, a lock file in the images directory lets only one of
+them collect at a time.
+"""
+import fcntl
+import hashlib
+import os
+import time
+
+from sqlalchemy.orm import Session
+
+from config import IMAGE_GC_GRACE_PERIOD, IMAGES_DIR
+from databases.axion.handlers.primaries.Producto import Producto as ItemHandler
+from databases.axion.init_db import db as database
+from endpoints.shared.CustomLogger import CustomLogger
+
+from .utils import CONTENT_HASHED, IMAGES_URL, image_url
+
+logger = CustomLogger('modules/images/gc')
+
+# Held with flock while collecting, by scheduled and manual runs of every process alike
+_LOCK_NAME = ".gc.lock"
+
+# Digest of the files not named after their content, by (name, size, mtime)
+_digests = {}
+
+
+def _file_digest(path: str, stat_result: os.stat_result) -> str:
+    """
+    Return the sha256 of a file, remembered while its size and mtime do not change.
+    """
+    _key = (path, stat_result.st_size, stat_result.st_mtime_ns)
+    if _key not in _digests:
+        _hash = hashlib.sha256()
+        with open(path, "rb") as _file:
+            while _chunk := _file.read(1024 * 1024):
+                _hash.update(_chunk)
+        _digests[_key] = _hash.hexdigest()
+    return _digests[_key]
+
+def _variants_of(files: dict, digest: str) -> dict | None:
+    """
+    Return the URLs by width of the variants on disk of the image hashed ``digest``, None if none.
+    """
+    _variants = {}
+    for _name in files:
+        _match = CONTENT_HASHED.match(_name)
+        if _match and _match.group(2) and _match.group("digest") == digest:
+            _variants[_match.group(2)[1:]] = image_url(_name)
+    return _variants or None
+
+def collect_images(db: Session, grace_period: float = IMAGE_GC_GRACE_PERIOD) -> dict | None:
+    """
+    Deduplicate product images by content and delete the ones no product references.
+
+    Identical images get their references rewritten to one of them, preferring the file
+    named after its content hash, together with its variants when they are on disk.
+    Unreferenced files, including leftovers of failed uploads, are deleted once they are
+    older than ``grace_period``.
+
+    Args:
+        db (Session): The database session.
+        grace_period (float): Seconds an unreferenced file is kept after its last change.
+
+    Returns:
+        dict | None: The number of files scanned, references rewritten, files deleted and
+            bytes reclaimed, None if another process is already collecting.
+
+    Raises:
+        DatabaseException: If an error occurs while reading or updating the products.
+    """
+    if not os.path.isdir(IMAGES_DIR):
+        return {"files": 0, "deduplicated": 0, "deleted": 0, "reclaimed_bytes": 0}
+    with open(os.path.join(IMAGES_DIR, _LOCK_NAME), "a") as _lock:
+        try:
+            fcntl.flock(_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+        return _collect_images(db, grace_period)
+
+def _collect_images(db: Session, grace_period: float) -> dict:
+    """
+    Collect the product images, see collect_images. Must be called with the lock file held.
+    """
+    _files = {_entry.name: _entry.stat() for _entry in os.scandir(IMAGES_DIR)
+              if _entry.is_file() and _entry.name != _LOCK_NAME}
+
+    # Group the originals by content, hashed names carry their digest
+    _canonical = {}
+    _replacements = {}
+    for _name in sorted(_files, key=lambda _name: CONTENT_HASHED.match(_name) is None):
+        if _name.startswith("."):
+            continue
+        _match = CONTENT_HASHED.match(_name)
+        if _match and _match.group(2):
+            continue
+        _digest = _match.group("digest") if _match else _file_digest(
+            os.path.join(IMAGES_DIR, _name), _files[_name])
+        if _digest in _canonical:
+            _replacements[image_url(_name)] = (image_url(_canonical[_digest]),
+                                               _variants_of(_files, _digest))
+        else:
+            _canonical[_digest] = _name
+
+    _handler = ItemHandler()
+    _referenced = _handler.get_image_urls(db)
+    _replacements = {_old: _new for _old, _new in _replacements.items() if _old in _referenced}
+    _deduplicated = _handler.replace_image_urls(db, _replacements) if _replacements else 0
+    _referenced = {_url.rsplit("/", 1)[-1] for _url in _handler.get_image_urls(db)
+                   if _url.startswith(f"{IMAGES_URL}/")}
+
+    _referenced_paths = {os.path.join(IMAGES_DIR, _name) for _name in _referenced}
+    _deleted = 0
+    _reclaimed_bytes = 0
+    _cutoff = time.time() - grace_period
+    for _name, _stat in _files.items():
+        if _name in _referenced or _stat.st_mtime > _cutoff:
+            continue
+        try:
+            os.remove(os.path.join(IMAGES_DIR, _name))
+        except FileNotFoundError:
+            continue
+        _deleted += 1
+        _reclaimed_bytes += _stat.st_size
+
+    for _key in [_key for _key in _digests if _key[0] not in _referenced_paths]:
+        del _digests[_key]
+
+    return {"files": len(_files), "deduplicated": _deduplicated,
+            "deleted": _deleted, "reclaimed_bytes": _reclaimed_bytes}
+
+def run_image_gc():
+    """
+    Scheduled job collecting the product images with its own database session.
+    """
+    _db = database.get_session()
+    try:
+        _report = collect_images(_db)
+        if _report is None:
+            logger.info("[run_image_gc] Images already being collected by another process")
+            return None
+        logger.info("[run_image_gc] %s of %s images deleted, %s references deduplicated, %s bytes reclaimed",
+                    _report['deleted'], _report['files'], _report['deduplicated'], _report['reclaimed_bytes'])
+        return _report
+    except Exception as e:
+        logger.error("[run_image_gc] %s", e)
+    finally:
+        _db.close()
@@ -0,0 +1,179 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the product image pipeline.
+
+Uploads are streamed to disk without blocking the event loop and stored under the
+sha256 of their content. Resized variants are rendered on a bounded worker pool.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from config import (IMAGE_MAX_PIXELS, IMAGE_MAX_UPLOAD_SIZE,
+                    IMAGE_QUEUE_SIZE, IMAGE_UPLOAD_CHUNK_SIZE,
+                    IMAGE_VARIANT_FORMAT, IMAGE_VARIANT_QUALITY,
+                    IMAGE_VARIANT_WIDTHS, IMAGE_WORKERS, IMAGES_DIR)
+from endpoints.shared.CustomLogger import CustomLogger
+
+logger = CustomLogger('modules/images/utils')
+
+# Pillow releases the GIL while decoding, resizing and encoding, so a thread pool is enough.
+# The semaphore bounds running + queued uploads to give backpressure under load.
+_image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image-variants")
+_image_slots = threading.BoundedSemaphore(IMAGE_WORKERS + IMAGE_QUEUE_SIZE)
+
+# Path under which main.py serves the images directory
+IMAGES_URL = "/images"
+
+# Files named after the sha256 of their content, optionally suffixed with the variant width
+CONTENT_HASHED = re.compile(r"^(?P<digest>[0-9a-f]{64})(_\d+)?\.\w+$")
+
+_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif"}
+
+
+def image_url(filename: str) -> str:
+    """
+    Return the URL stored on the product for a file of the images directory.
+    """
+    return f"{IMAGES_URL}/{filename}"
+
+def _save_atomically(image: Image.Image, path: str, **params):
+    """
+    Encode ``image`` next to ``path`` and move it into place, so readers never see a partial file.
+    """
+    _fd, _tmp_path = tempfile.mkstemp(dir=IMAGES_DIR, prefix=".variant-")
+    try:
+        with os.fdopen(_fd, "wb") as _out:
+            image.save(_out, **params)
+        os.replace(_tmp_path, path)
+    except BaseException:
+        os.remove(_tmp_path)
+        raise
+
+def _render_variants(upload_path: str, digest: str) -> tuple[str, dict]:
+    """
+    Store an uploaded image under its content hash and render its resized variants.
+
+    Variants are rendered for every configured width narrower than the image, or once
+    at the image width if it is narrower than all of them. Files that already exist
+    are the same content and are not rendered again.
+
+    Args:
+        upload_path (str): The path of the streamed upload, moved or removed by this call.
+        digest (str): The sha256 of the upload.
+
+    Returns:
+        tuple: The URL of the original image and the URLs of the variants by width.
+    """
+    try:
+        with Image.open(upload_path) as _upload:
+            # Checked on the header, before a small file decodes into a huge bitmap
+            if _upload.width * _upload.height > IMAGE_MAX_PIXELS:
+                raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                                    detail="Image dimensions too large")
+            _upload.load()
+            _extension = _EXTENSIONS.get(_upload.format)
+            if _extension is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail=f"Unsupported image format: {_upload.format}")
+            _image = ImageOps.exif_transpose(_upload)
+    except UnidentifiedImageError:
+        os.remove(upload_path)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image file")
+    except Image.DecompressionBombError:
+        os.remove(upload_path)
+        raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                            detail="Image dimensions too large")
+    except BaseException:
+        os.remove(upload_path)
+        raise
+    _original = f"{digest}{_extension}"
+    os.replace(upload_path, os.path.join(IMAGES_DIR, _original))
+
+    if IMAGE_VARIANT_FORMAT == "JPEG":
+        _variant_extension, _params = ".jpg", {"format": "JPEG", "quality": IMAGE_VARIANT_QUALITY,
+                                               "optimize": True, "progressive": True}
+        _mode = "RGB"
+    else:
+        _variant_extension, _params = ".webp", {"format": "WEBP", "quality": IMAGE_VARIANT_QUALITY,
+                                                "method": 4}
+        _mode = "RGBA" if _image.has_transparency_data else "RGB"
+    _image = _image.convert(_mode)
+
+    _widths = [_width for _width in sorted(IMAGE_VARIANT_WIDTHS) if _width < _image.width] or [_image.width]
+    _variants = {}
+    for _width in _widths:
+        _filename = f"{digest}_{_width}{_variant_extension}"
+        _path = os.path.join(IMAGES_DIR, _filename)
+        if os.path.exists(_path):
+            # Reused by this upload, keep it out of the garbage collection grace period
+            os.utime(_path)
+        else:
+            _height = max(1, round(_image.height * _width / _image.width))
+            _save_atomically(_image.resize((_width, _height), Image.Resampling.LANCZOS), _path, **_params)
+        _variants[str(_width)] = image_url(_filename)
+    return image_url(_original), _variants
+
+async def _stream_upload(file: UploadFile) -> tuple[str, str]:
+    """
+    Stream an upload into a temporary file of the images directory, hashing it on the way.
+
+    Returns:
+        tuple: The path of the temporary file and the sha256 of its content.
+
+    Raises:
+        HTTPException: 413 if the upload is larger than IMAGE_MAX_UPLOAD_SIZE.
+    """
+    os.makedirs(IMAGES_DIR, exist_ok=True)
+    _fd, _tmp_path = tempfile.mkstemp(dir=IMAGES_DIR, prefix=".upload-")
+    _hash = hashlib.sha256()
+    _size = 0
+    try:
+        with os.fdopen(_fd, "wb") as _out:
+            while _chunk := await file.read(IMAGE_UPLOAD_CHUNK_SIZE):
+                _size += len(_chunk)
+                if _size > IMAGE_MAX_UPLOAD_SIZE:
+                    raise HTTPException(status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                                        detail="Image file too large")
+                _hash.update(_chunk)
+                await run_in_threadpool(_out.write, _chunk)
+        return _tmp_path, _hash.hexdigest()
+    except BaseException:
+        os.remove(_tmp_path)
+        raise
+
+async def store_image(file: UploadFile) -> tuple[str, dict]:
+    """
+    Store an uploaded product image and its resized variants.
+
+    Args:
+        file (UploadFile): The uploaded image.
+
+    Returns:
+        tuple: The URL of the original image and the URLs of the variants by width.
+
+    Raises:
+        HTTPException: 400 if the file is not a supported image, 413 if it or its
+            dimensions are too large and 429 if the image pool and its queue are already full.
+    """
+    _upload_path, _digest = await _stream_upload(file)
+    # Taken once the upload is on disk, so slow clients do not hold a render slot
+    if not _image_slots.acquire(blocking=False):
+        os.remove(_upload_path)
+        logger.info("[store_image] Image pool saturated, rejecting request")
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail="Server busy, please retry",
+                            headers={"Retry-After": "1"})
+    try:
+        return await asyncio.wrap_future(_image_executor.submit(_render_variants, _upload_path, _digest))
+    finally:
+        _image_slots.release()
@@ -0,0 +1,68 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the set of revoked tokens.
+
+Revoked token ids are only kept until the token expires, since an expired token is
+rejected by its signature check anyway, so the set stays as small as the number of
+tokens revoked within the token lifetime.
+"""
+import heapq
+import threading
+import time
+
+
+class RevocationSet:
+    """
+    Thread-safe set of revoked token ids (jti) that forgets each id once its token expires.
+
+    Lookups are O(1); expired ids are purged in expiry order from a heap on every revocation.
+    """
+    def __init__(self):
+        self._revoked = {}
+        self._expiry = []
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float) -> bool:
+        """
+        Revoke the token ``jti`` until ``expires_at``.
+
+        The check and the revocation are atomic, so of several concurrent calls for the
+        same token exactly one returns True.
+
+        Args:
+            jti (str): The id of the token.
+            expires_at (float): Epoch timestamp at which the token expires.
+
+        Returns:
+            bool: False if the token was already revoked.
+        """
+        with self._lock:
+            self._purge(time.time())
+            if jti in self._revoked:
+                return False
+            self._revoked[jti] = expires_at
+            heapq.heappush(self._expiry, (expires_at, jti))
+            return True
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Return whether the token ``jti`` is revoked and not yet expired.
+        """
+        _expires_at = self._revoked.get(jti)
+        return _expires_at is not None and _expires_at > time.time()
+
+    def _purge(self, now: float):
+        """
+        Forget the ids whose token expired before ``now``. Must be called with the lock held.
+        """
+        while self._expiry and self._expiry[0][0] <= now:
+            _expires_at, _jti = heapq.heappop(self._expiry)
+            if self._revoked.get(_jti) == _expires_at:
+                del self._revoked[_jti]
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revoked_tokens = RevocationSet()
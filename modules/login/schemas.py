@@ -6,10 +6,20 @@ class Token(BaseModel):
     Schema that represents a Token in the system
     """
     access_token: str
+    refresh_token: str | None = None
     token_type: str
+    expires_in: int | None = None
+
+class RefreshRequest(BaseModel):
+    """
+    Schema that represents a request to renew or revoke a refresh token
+    """
+    refresh_token: str
 
 class TokenData(BaseModel):
     """
     Schema that represents data of Token
     """
-    username: str | None = None
\ No newline at end of file
+    username: str | None = None
+    user_id: int | None = None
+    token_version: int | None = None
\ No newline at end of file
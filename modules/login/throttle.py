@@ -0,0 +1,234 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the login rate limiter.
+
+Login attempts are counted per client IP and per username over a sliding window,
+approximated from the counts of the current and previous fixed windows so every key
+only holds three numbers. Every attempt is counted atomically before the password is
+verified, so concurrent attempts cannot all pass the limit, and attempts over the limit
+do not cost a bcrypt verification. Successful logins are refunded afterwards, so many
+users signing in from behind one address do not lock each other out.
+
+Backends implement ``hit(key, limit, window, now)``, counting the attempt and
+returning 0, or returning the seconds to wait if ``key`` is over ``limit``, and
+``refund(key, window, now)``, removing an attempt counted by ``hit`` at ``now``.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request, status
+
+from config import (LOGIN_CLIENT_IP_HEADER, LOGIN_RATE_LIMIT_BACKEND,
+                    LOGIN_RATE_LIMIT_MAX_KEYS, LOGIN_RATE_LIMIT_PER_IP,
+                    LOGIN_RATE_LIMIT_PER_USERNAME, LOGIN_RATE_LIMIT_WINDOW)
+from databases.axion.handlers.primaries.LoginAttempt import \
+    LoginAttempt as LoginAttemptHandler
+from databases.axion.init_db import db
+from endpoints.shared.CustomLogger import CustomLogger
+from modules.metrics.registry import login_throttled
+
+logger = CustomLogger('modules/login/throttle')
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Return the address of the client, read from LOGIN_CLIENT_IP_HEADER if set and present.
+
+    The last entry of the header is used: it is the one added by the trusted proxy,
+    earlier entries are sent by the client and can be forged.
+    """
+    _forwarded = request.headers.get(LOGIN_CLIENT_IP_HEADER) if LOGIN_CLIENT_IP_HEADER else None
+    if _forwarded:
+        return _forwarded.split(",")[-1].strip()
+    return request.client.host
+
+def _slide(state: tuple | None, limit: int, window: int, now: float) -> tuple:
+    """
+    Count an attempt in the sliding window ``state`` unless it is over ``limit``.
+
+    Args:
+        state (tuple | None): The ``(window_start, previous, current)`` of the key, if any.
+        limit (int): Attempts allowed within a window.
+        window (int): Length of the window in seconds.
+        now (float): Epoch timestamp of the attempt.
+
+    Returns:
+        tuple: The new state, and 0 or the seconds to wait if the attempt is rejected.
+    """
+    _start = (now // window) * window
+    _previous, _current = 0, 0
+    if state is not None:
+        _state_start, _state_previous, _state_current = state
+        if _state_start == _start:
+            _previous, _current = _state_previous, _state_current
+        elif _state_start == _start - window:
+            _previous = _state_current
+    _elapsed = now - _start
+    if _previous * (1 - _elapsed / window) + _current < limit:
+        return (_start, _previous, _current + 1), 0
+    if _current >= limit:
+        _retry_after = window - _elapsed
+    else:
+        # The weight of the previous window decays until the estimate drops below the limit
+        _retry_after = window * (1 - (limit - _current) / _previous) - _elapsed
+    return (_start, _previous, _current), max(_retry_after, 1)
+
+def _refund(state: tuple | None, window: int, now: float) -> tuple | None:
+    """
+    Remove an attempt counted at ``now`` from the sliding window ``state``.
+
+    The attempt is in the current count of its window, or in the previous count once the
+    next window started, it is already forgotten after that.
+
+    Args:
+        state (tuple | None): The ``(window_start, previous, current)`` of the key, if any.
+        window (int): Length of the window in seconds.
+        now (float): Epoch timestamp of the attempt.
+
+    Returns:
+        tuple | None: The new state.
+    """
+    if state is None:
+        return None
+    _start = (now // window) * window
+    _state_start, _previous, _current = state
+    if _state_start == _start:
+        return (_state_start, _previous, max(_current - 1, 0))
+    if _state_start == _start + window:
+        return (_state_start, max(_previous - 1, 0), _current)
+    return state
+
+
+class MemoryBackend:
+    """
+    Sliding windows held in the memory of the worker.
+
+    At most ``max_keys`` keys are kept, the least recently used are evicted first.
+    """
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: int, now: float) -> float:
+        with self._lock:
+            _state, _retry_after = _slide(self._windows.get(key), limit, window, now)
+            self._windows[key] = _state
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+            return _retry_after
+
+    def refund(self, key: str, window: int, now: float):
+        with self._lock:
+            if key in self._windows:
+                self._windows[key] = _refund(self._windows[key], window, now)
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+
+class DatabaseBackend:
+    """
+    Sliding windows stored in the login_attempts table, shared by every worker and node
+    using the same database.
+
+    Rows of windows no longer counted are deleted at most once per window by each worker.
+    """
+    def __init__(self):
+        self._purged_at = 0
+
+    def hit(self, key: str, limit: int, window: int, now: float) -> float:
+        _session = db.get_session()
+        try:
+            _retry_after = LoginAttemptHandler().update_login_attempt(
+                _session, key, lambda _state: _slide(_state, limit, window, now))
+            if now - self._purged_at >= window:
+                self._purged_at = now
+                LoginAttemptHandler().delete_login_attempts_before(_session, now - 2 * window)
+            return _retry_after
+        finally:
+            _session.close()
+
+    def refund(self, key: str, window: int, now: float):
+        _session = db.get_session()
+        try:
+            # A purged row is written back empty, it is purged again with the others
+            LoginAttemptHandler().update_login_attempt(
+                _session, key, lambda _state: (_refund(_state, window, now) or ((now // window) * window, 0, 0), None))
+        finally:
+            _session.close()
+
+
+class LoginThrottle:
+    """
+    Rate limiter of the failed login attempts per client IP and per username.
+
+    ``hit`` counts every attempt before the password is verified and ``refund`` removes
+    it again once the login succeeded, so only failed attempts stay counted.
+    """
+    def __init__(self, backend, window: int, per_ip: int, per_username: int):
+        self.backend = backend
+        self.window = window
+        self.per_ip = per_ip
+        self.per_username = per_username
+
+    def _limits(self, client_ip: str, username: str) -> list:
+        """
+        Return the ``(scope, key, limit)`` of the enabled limits of an attempt.
+        """
+        return [(_scope, _key, _limit)
+                for _scope, _key, _limit in (("ip", f"ip:{client_ip}", self.per_ip),
+                                             ("username", f"user:{username.lower()[:200]}", self.per_username))
+                if _limit]
+
+    def hit(self, client_ip: str, username: str) -> float:
+        """
+        Count a login attempt of ``username`` from ``client_ip``.
+
+        Returns:
+            float: Epoch timestamp of the attempt, to ``refund`` it if the login succeeds.
+
+        Raises:
+            HTTPException: 429 if the client IP or the username is over its limit, the
+                attempt is then not counted.
+        """
+        _now = time.time()
+        _counted = []
+        for _scope, _key, _limit in self._limits(client_ip, username):
+            _retry_after = self.backend.hit(_key, _limit, self.window, _now)
+            if _retry_after:
+                for _counted_key in _counted:
+                    self.backend.refund(_counted_key, self.window, _now)
+                login_throttled.inc(_scope)
+                logger.warning("[hit] Too many login attempts for %s: %s", _scope, _key)
+                raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                                    detail="Too many login attempts, try again later.",
+                                    headers={"Retry-After": str(math.ceil(_retry_after))})
+            _counted.append(_key)
+        return _now
+
+    def refund(self, client_ip: str, username: str, attempted_at: float):
+        """
+        Remove the attempt counted by ``hit`` at ``attempted_at``, once the login succeeded.
+        """
+        for _scope, _key, _limit in self._limits(client_ip, username):
+            self.backend.refund(_key, self.window, attempted_at)
+
+
+_BACKENDS = {
+    "memory": lambda: MemoryBackend(LOGIN_RATE_LIMIT_MAX_KEYS),
+    "database": DatabaseBackend,
+}
+
+if LOGIN_RATE_LIMIT_BACKEND not in _BACKENDS:
+    raise ValueError(f"Unknown LOGIN_RATE_LIMIT_BACKEND {LOGIN_RATE_LIMIT_BACKEND!r}, "
+                     f"expected one of: {', '.join(_BACKENDS)}")
+
+login_throttle = LoginThrottle(_BACKENDS[LOGIN_RATE_LIMIT_BACKEND](),
+                               window=LOGIN_RATE_LIMIT_WINDOW,
+                               per_ip=LOGIN_RATE_LIMIT_PER_IP,
+                               per_username=LOGIN_RATE_LIMIT_PER_USERNAME)
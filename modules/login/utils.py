@@ -6,9 +6,15 @@ Module that contains endpoints for authentication.
 This module includes the setup for endpoints for authentication. It includes
 routers for getting, creating, updating, and deleting users.
 """
+import asyncio
+import functools
 import ssl
 import subprocess
+import threading
+import time
 import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
@@ -19,14 +25,19 @@ from ldap3 import Connection, Server, Tls
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
-from config import ALGORITHM, SECRET_KEY
+from config import (ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, BCRYPT_ROUNDS,
+                    PASSWORD_HASH_QUEUE_SIZE, PASSWORD_HASH_WORKERS,
+                    REFRESH_TOKEN_EXPIRE_MINUTES, SECRET_KEY)
 from databases.axion.handlers.primaries.LocalUser import \
     LocalUser as LocalUserHandler
+from databases.axion.handlers.primaries.LocalUser import local_user_cache
 from databases.axion.init_db import get_session
 from databases.axion.schemas.primaries.LocalUser import \
     LocalUser as LocalUserSchema
 from endpoints.shared.CustomLogger import CustomLogger
+from modules.metrics.registry import password_verify_duration
 
+from .revocation import revoked_tokens
 from .schemas import Token, TokenData
 
 logger = CustomLogger('modules/authentication/utils')
@@ -34,7 +45,37 @@ logger = CustomLogger('modules/authentication/utils')
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a thread pool is enough to keep hashing off the event loop.
+# The semaphore bounds running + queued operations to give backpressure under load.
+_password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS,
+                                        thread_name_prefix="password-hash")
+_password_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE)
+
+# Tokens must carry the claims get_current_user authorizes from, without a database lookup
+_jwt = jwt.PyJWT(options={"require": ["exp", "sub", "uid", "ver", "jti", "typ"]})
+
+@functools.cache
+def _jwt_keys() -> tuple:
+    """
+    Return the signing and verifying keys, prepared once instead of on every token.
+
+    Asymmetric algorithms sign with the private key in SECRET_KEY and verify with its public key.
+    """
+    _signing_key = jwt.get_algorithm_by_name(ALGORITHM).prepare_key(SECRET_KEY)
+    _verifying_key = _signing_key.public_key() if hasattr(_signing_key, "public_key") else _signing_key
+    return _signing_key, _verifying_key
+
+def _create_token(data: dict, token_type: str, expires_delta: timedelta) -> str:
+    """
+    Encode a token of ``token_type`` with a unique id (jti) so it can be revoked.
+    """
+    _to_encode = data.copy()
+    _to_encode.update({"exp": datetime.now(timezone.utc) + expires_delta,
+                       "jti": uuid.uuid4().hex,
+                       "typ": token_type})
+    return jwt.encode(_to_encode, _jwt_keys()[0], algorithm=ALGORITHM)
 
 def create_access_token(data: dict,
                         expires_delta: timedelta | None = None):
@@ -43,48 +84,79 @@ def create_access_token(data: dict,
 
     Args:
 
-        data (dict): Data to be encoded in the token.
+        data (dict): Data to be encoded in the token: the username (sub), user id (uid)
+            and token version (ver) of the user.
 
-        expires_delta (timedelta | None): Expiration time for the token.
+        expires_delta (timedelta | None): Expiration time for the token,
+            ACCESS_TOKEN_EXPIRE_MINUTES by default.
 
     Returns:
 
         str: Encoded access token.
     """
-    _to_encode = data.copy()
-    if expires_delta:
-        _expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        _expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-    _to_encode.update({"exp": _expire})
-    _encoded_jwt = jwt.encode(_to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return _encoded_jwt
-        
-def hash_password(password: str) -> str:
+    return _create_token(data, "access", expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
+def create_refresh_token(data: dict,
+                         expires_delta: timedelta | None = None):
     """
-    Hash a password using the bcrypt algorithm.
+    Function to create a refresh token, only accepted to obtain new access tokens.
 
-    :param password: The password to hash.
-    :return: The hashed password.
+    Args:
+
+        data (dict): Data to be encoded in the token, the same as for the access token.
+
+        expires_delta (timedelta | None): Expiration time for the token,
+            REFRESH_TOKEN_EXPIRE_MINUTES by default.
+
+    Returns:
+
+        str: Encoded refresh token.
     """
-    return pwd_context.hash(password)
+    return _create_token(data, "refresh", expires_delta or timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES))
 
+def issue_tokens(user_id: int, username: str, token_version: int) -> Token:
+    """
+    Issue a new access and refresh token pair for an authenticated user.
 
-async def get_current_user(
-        token: Annotated[str, Depends(oauth2_scheme)],
-        db: Session = Depends(get_session)) -> LocalUserSchema:
+    The user is not cached here: its username and token version were read before the
+    password verification, and a password change since must not be cached over. The
+    first request with the access token caches them in decode_token.
+
+    Args:
+        user_id (int): The ID of the user.
+        username (str): The username of the user.
+        token_version (int): The current token version of the user.
+
+    Returns:
+        Token: The access and refresh tokens.
     """
-    Retrieve the current user based on the provided JWT token.
+    _claims = {"sub": username, "uid": user_id, "ver": token_version}
+    return Token(access_token=create_access_token(_claims),
+                 refresh_token=create_refresh_token(_claims),
+                 token_type="bearer",
+                 expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def decode_token(token: str, db: Session, token_type: str = "access") -> dict:
+    """
+    Verify a token of ``token_type`` and return its claims.
+
+    The token must be correctly signed, not expired, not revoked, and carry the current
+    username and token version of its user, so a token of a deleted user is not accepted
+    for another user given the same id. For access tokens the database is only consulted
+    when the user is not cached or the token is newer than its cached version. Refresh
+    tokens always read it, since the cache is per worker and may miss a password change
+    made on another one.
 
     Args:
-        token (str): The JWT token for authentication.
+        token (str): The encoded token.
         db (Session): The database session.
+        token_type (str): The expected token type, "access" or "refresh".
 
     Returns:
-        LocalUserSchema: The user object corresponding to the authenticated token.
+        dict: The claims of the token.
 
     Raises:
-        HTTPException: If the token is invalid or the user is not found.
+        HTTPException: 401 if the token is not valid.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -93,30 +165,107 @@ async def get_current_user(
     )
 
     try:
-        
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-
-        if username is None or not username:
+        payload = _jwt.decode(token, _jwt_keys()[1], algorithms=[ALGORITHM])
+        if not payload["sub"] or payload["typ"] != token_type or revoked_tokens.is_revoked(payload["jti"]):
             raise credentials_exception
 
-        token_data = TokenData(username=username)
+        token_data = TokenData(username=payload["sub"], user_id=payload["uid"], token_version=payload["ver"])
 
-        _user = LocalUserHandler().get_local_user_by_username(db, username=token_data.username)
-        if _user is None:
+        _cached = local_user_cache.get(token_data.user_id) if token_type == "access" else None
+        if _cached is None or _cached[1] < token_data.token_version:
+            # Read before the user, so a change committed meanwhile keeps the result out of the cache
+            _generation = local_user_cache.generation
+            _user = LocalUserHandler().get_local_user_by_id(db, token_data.user_id)
+            if _user is None:
+                raise credentials_exception
+            _cached = (_user.username, _user.token_version)
+            local_user_cache.set(token_data.user_id, _cached, generation=_generation)
+        if (token_data.username, token_data.token_version) != _cached:
             raise credentials_exception
-        
-        return _user
 
-    except jwt.exceptions.InvalidTokenError:
+        return payload
+
+    except (jwt.exceptions.InvalidTokenError, ValueError):
+        # ValueError covers claims of the wrong type, rejected by TokenData
         raise credentials_exception
 
+def revoke_token(payload: dict) -> bool:
+    """
+    Revoke the token with the given verified claims until it expires.
+
+    Returns:
+        bool: False if the token was already revoked, e.g. by a concurrent request.
+    """
+    return revoked_tokens.revoke(payload["jti"], payload["exp"])
+        
+def _submit_password_task(fn, *args) -> Future:
+    """
+    Run a password hashing operation on the bounded password worker pool.
+
+    Raises:
+        HTTPException: 429 if the pool and its queue are already full.
+    """
+    if not _password_slots.acquire(blocking=False):
+        logger.warning("[_submit_password_task] Password worker pool is full, rejecting request")
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail="Too many concurrent authentication requests, try again later.",
+                            headers={"Retry-After": "1"})
+    try:
+        _future = _password_executor.submit(fn, *args)
+    except Exception:
+        _password_slots.release()
+        raise
+    _future.add_done_callback(lambda _: _password_slots.release())
+    return _future
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the calling thread, recording the bcrypt verification time.
+    """
+    _started_at = time.perf_counter()
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        password_verify_duration.observe(time.perf_counter() - _started_at)
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password using the bcrypt algorithm.
+
+    :param password: The password to hash.
+    :return: The hashed password.
+    """
+    return _submit_password_task(pwd_context.hash, password).result()
+
+
+def get_current_user(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        db: Session = Depends(get_session)) -> LocalUserSchema:
+    """
+    Retrieve the current user based on the provided JWT token.
+
+    The user is built from the verified access token claims, see decode_token.
+
+    Args:
+        token (str): The JWT token for authentication.
+        db (Session): The database session.
+
+    Returns:
+        LocalUserSchema: The user object corresponding to the authenticated token.
+
+    Raises:
+        HTTPException: If the token is invalid or the user is not found.
+    """
+    try:
+        payload = decode_token(token, db)
+        return LocalUserSchema(id=payload["uid"], username=payload["sub"])
+
     except HTTPException as httpe:
         raise httpe
 
     except Exception as e:
         tb = traceback.format_exc()
-        logger.error(f"[get_current_user] Exception occurred: {repr(e)} traceback: {repr(tb)}")
+        logger.error("[get_current_user] Exception occurred: %r traceback: %r", e, tb)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error.")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -127,4 +276,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     :param hashed_password: The hashed password to compare.
     :return: True if the passwords match, False otherwise.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return _submit_password_task(_verify_password, plain_password, hashed_password).result()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the password worker pool without blocking the event loop.
+
+    :param plain_password: The plain-text password to verify.
+    :param hashed_password: The hashed password to compare.
+    :return: True if the passwords match, False otherwise.
+    """
+    return await asyncio.wrap_future(
+        _submit_password_task(_verify_password, plain_password, hashed_password))
@@ -0,0 +1,200 @@
+"""
+Team: MSG - AXIANS
+
+Module that contains the in-process metrics registry exposed at /metrics.
+
+Counters and histograms are sharded per thread: each thread only writes its own
+shard, so recording takes no lock, and shards are summed when the metrics are
+scraped. Gauges are callbacks evaluated at scrape time.
+"""
+import bisect
+import threading
+
+# Seconds, suited to request, SQL and bcrypt latencies
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames: tuple, labelvalues: tuple, extra: str = "") -> str:
+    _pairs = [f'{_name}="{_escape(_value)}"' for _name, _value in zip(labelnames, labelvalues)]
+    if extra:
+        _pairs.append(extra)
+    return "{" + ",".join(_pairs) + "}" if _pairs else ""
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _ShardedMetric:
+    """
+    Base of the metrics whose values are kept in one shard per recording thread.
+    """
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        """
+        Return the shard of the calling thread, registering it on first use.
+        """
+        try:
+            return self._local.shard
+        except AttributeError:
+            _shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(_shard)
+            return _shard
+
+    def _snapshot(self) -> list:
+        with self._shards_lock:
+            _shards = list(self._shards)
+        return [list(_shard.items()) for _shard in _shards]
+
+    def render(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_ShardedMetric):
+    """
+    Monotonically increasing value.
+    """
+    type = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1):
+        _shard = self._shard()
+        _shard[labelvalues] = _shard.get(labelvalues, 0) + amount
+
+    def render(self) -> list:
+        _totals = {}
+        for _items in self._snapshot():
+            for _labelvalues, _value in _items:
+                _totals[_labelvalues] = _totals.get(_labelvalues, 0) + _value
+        return super().render() + [
+            f"{self.name}{_format_labels(self.labelnames, _labelvalues)} {_format_value(_value)}"
+            for _labelvalues, _value in sorted(_totals.items())]
+
+
+class Histogram(_ShardedMetric):
+    """
+    Distribution of observed values over fixed buckets, with their sum and count.
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues):
+        _shard = self._shard()
+        _values = _shard.get(labelvalues)
+        if _values is None:
+            # Per bucket counts, the +Inf bucket, then the sum
+            _values = _shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        _values[bisect.bisect_left(self.buckets, value)] += 1
+        _values[-1] += value
+
+    def render(self) -> list:
+        _totals = {}
+        for _items in self._snapshot():
+            for _labelvalues, _values in _items:
+                _total = _totals.setdefault(_labelvalues, [0] * len(_values))
+                for _index, _value in enumerate(list(_values)):
+                    _total[_index] += _value
+        _lines = super().render()
+        for _labelvalues, _values in sorted(_totals.items()):
+            _cumulative = 0
+            for _bound, _count in zip(self.buckets + ("+Inf",), _values[:-1]):
+                _cumulative += _count
+                _bucket_labels = _format_labels(self.labelnames, _labelvalues, f'le="{_bound}"')
+                _lines.append(f"{self.name}_bucket{_bucket_labels} {_cumulative}")
+            _labels = _format_labels(self.labelnames, _labelvalues)
+            _lines.append(f"{self.name}_sum{_labels} {_format_value(_values[-1])}")
+            _lines.append(f"{self.name}_count{_labels} {_cumulative}")
+        return _lines
+
+
+class Gauge:
+    """
+    Value read at scrape time from a callback returning ``(labelvalues, value)`` pairs.
+    """
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, callback, type: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self.type = type
+
+    def render(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"] + [
+            f"{self.name}{_format_labels(self.labelnames, tuple(_labelvalues))} {_format_value(_value)}"
+            for _labelvalues, _value in self.callback()]
+
+
+class Registry:
+    """
+    Collection of metrics rendered together in the Prometheus text format.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple, callback, type: str = "gauge") -> Gauge:
+        """
+        Register a metric read from ``callback`` at scrape time, ``type`` may be "counter"
+        for totals kept elsewhere, e.g. cache hits.
+        """
+        return self._register(Gauge(name, documentation, labelnames, callback, type))
+
+    def render(self) -> str:
+        with self._lock:
+            _metrics = list(self._metrics.values())
+        _lines = []
+        for _metric in _metrics:
+            _lines.extend(_metric.render())
+        return "\n".join(_lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency, streamed bodies included.", ("method", "route"))
+db_statement_duration = registry.histogram(
+    "db_statement_duration_seconds", "SQL statement execution time.", ("operation",))
+password_verify_duration = registry.histogram(
+    "password_verify_duration_seconds", "bcrypt password verification time on the password pool.")
+login_throttled = registry.counter(
+    "login_throttled_total", "Login attempts rejected by the rate limiter.", ("scope",))
+
+
+def observe_query(statement: str, duration: float):
+    """
+    Database query observer recording the SQL statement durations by operation.
+    """
+    _words = statement.split(None, 1)
+    db_statement_duration.observe(duration, _words[0].upper() if _words else "OTHER")
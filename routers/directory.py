@@ -11,8 +11,9 @@ administration and operation endpoints.
 from fastapi import FastAPI
 
 from endpoints.administration.primaries import (cierrecaja, detallefactura,
-                                                factura, local_user, producto)
-from endpoints.operation import login
+                                                factura, local_user, producto,
+                                                reportes)
+from endpoints.operation import login, metrics
 from endpoints.shared.CustomLogger import CustomLogger
 
 logger = CustomLogger('routers/directory')
@@ -27,6 +28,9 @@ def redirect_to_endpoints(app:FastAPI):
     app.include_router(login.router,
                     prefix="/login",
                     tags=["Login"])
+    app.include_router(metrics.router,
+                    prefix="/metrics",
+                    tags=["Metrics"])
     app.include_router(producto.router,
                     prefix="/administration",
                     tags=["Productos"])
@@ -42,5 +46,8 @@ def redirect_to_endpoints(app:FastAPI):
     app.include_router(cierrecaja.router,
                     prefix="/administration",
                     tags=["Cierre Cajas"])
+    app.include_router(reportes.router,
+                    prefix="/administration",
+                    tags=["Reportes"])
 
 
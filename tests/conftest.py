@@ -0,0 +1,125 @@
+"""
+Team: MSG - AXIANS
+
+Shared fixtures of the test suite.
+
+The application runs in a temporary working directory, so its logs, images and the
+SQLite database are created there. The suite runs against SQLite by default and
+against Postgres when the DB_AXION_* settings point to one, e.g.:
+
+    DB_AXION_DRIVERNAME=postgresql+psycopg2 DB_AXION_HOSTNAME=localhost DB_AXION_USER=postgres \\
+    DB_AXION_PWD=postgres DB_AXION_DATABASE=mjpv_test python -m pytest tests
+
+The tables of that database are emptied before every test.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="mjpv-tests-")
+
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault("SECRET_KEY", "test-secret-key-of-at-least-32-bytes")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("FRONTEND_API_URL", "http://localhost")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("IMAGE_GC_INTERVAL_MINUTES", "0")
+os.environ.setdefault("LOG_QUEUE", "false")
+if not os.environ.get("DB_AXION_DRIVERNAME", "sqlite").startswith("postgresql"):
+    os.environ.setdefault("DB_AXION_DATABASE", os.path.join(WORKDIR, "test.db"))
+os.chdir(WORKDIR)
+
+USERNAME = "tester"
+PASSWORD = "tester-password"
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """
+    Client of the application, started once for the whole session.
+    """
+    from fastapi.testclient import TestClient
+
+    import main
+    from databases.axion.init_db import db
+
+    if db.get_engine().dialect.name == "postgresql":
+        db.create_database(db.get_engine().url.database)
+    with TestClient(main.app) as _client:
+        yield _client
+
+
+@pytest.fixture(scope="session")
+def database(app_client):
+    """
+    The Database of the application, its schema created by the application startup.
+    """
+    from databases.axion.init_db import db
+
+    return db
+
+
+@pytest.fixture(autouse=True)
+def clean_state(request):
+    """
+    Empty every table and reset the in-process caches and login limiter before each test.
+    """
+    if "database" not in request.fixturenames and "app_client" not in request.fixturenames:
+        yield
+        return
+    from databases.axion.handlers.primaries.LocalUser import local_user_cache
+    from databases.axion.handlers.primaries.Producto import catalog_cache
+    from databases.axion.init_db import Base, db
+    from modules.login.throttle import MemoryBackend, login_throttle
+
+    with db.get_engine().begin() as _connection:
+        for _table in reversed(Base.metadata.sorted_tables):
+            _connection.execute(_table.delete())
+    local_user_cache.clear()
+    catalog_cache.invalidate()
+    if isinstance(login_throttle.backend, MemoryBackend):
+        login_throttle.backend = MemoryBackend(login_throttle.backend.max_keys)
+    yield
+
+
+@pytest.fixture
+def session(database):
+    """
+    A database session closed after the test.
+    """
+    _session = database.get_session()
+    try:
+        yield _session
+    finally:
+        _session.close()
+
+
+@pytest.fixture
+def client(app_client):
+    """
+    Client of the application authenticated as a freshly created user.
+    """
+    _response = app_client.post("/administration/local-user", json={"username": USERNAME, "password": PASSWORD})
+    assert _response.status_code == 201, _response.text
+    _response = app_client.post("/login", data={"username": USERNAME, "password": PASSWORD})
+    assert _response.status_code == 200, _response.text
+    app_client.headers["Authorization"] = f"Bearer {_response.json()['access_token']}"
+    try:
+        yield app_client
+    finally:
+        app_client.headers.pop("Authorization", None)
+
+
+def create_producto(session, nombre: str = "Cafe", precio: float = 1.5):
+    """
+    Insert a producto directly in the database and return it.
+    """
+    from databases.axion.models.primaries.Producto import Producto
+
+    _producto = Producto(nombre=nombre, precio=precio, imagen_url="/images/none.png")
+    session.add(_producto)
+    session.commit()
+    return _producto
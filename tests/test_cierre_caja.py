@@ -0,0 +1,56 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the cierre de caja endpoints.
+"""
+from conftest import create_producto
+
+FECHA = "2024-05-02T12:00:00"
+CIERRE = "2024-05-02T20:00:00"
+
+
+def _checkout(client, producto_id, cantidad=1):
+    _response = client.post("/administration/checkout",
+                            json={"fecha": FECHA, "items": [{"producto_id": producto_id, "cantidad": cantidad}]})
+    assert _response.status_code == 201, _response.text
+    return _response.json()
+
+
+def test_cierre_caja_closes_listed_facturas(client, session):
+    _cafe = create_producto(session, "Cafe", 1.5)
+    _facturas = [_checkout(client, _cafe.id, 2), _checkout(client, _cafe.id, 1)]
+
+    _response = client.post("/administration/cierre-caja",
+                            json={"fecha": CIERRE, "factura_id": [_factura["id"] for _factura in _facturas]})
+
+    assert _response.status_code == 200, _response.text
+    assert _response.json()["total_ventas"] == 4.5
+
+
+def test_cierre_caja_closes_open_facturas_up_to_hasta(client, session):
+    _cafe = create_producto(session, "Cafe", 1.5)
+    _checkout(client, _cafe.id, 2)
+
+    _response = client.post("/administration/cierre-caja", json={"fecha": CIERRE, "hasta": CIERRE})
+
+    assert _response.status_code == 200, _response.text
+    assert _response.json()["total_ventas"] == 3.0
+
+
+def test_cierre_caja_without_facturas_selected_is_rejected(client):
+    _response = client.post("/administration/cierre-caja", json={"fecha": CIERRE})
+
+    assert _response.status_code == 422
+    assert "Either factura_id or hasta must be provided" in _response.text
+
+
+def test_cierre_caja_of_closed_factura_is_a_conflict(client, session):
+    _cafe = create_producto(session)
+    _factura = _checkout(client, _cafe.id)
+    assert client.post("/administration/cierre-caja",
+                       json={"fecha": CIERRE, "factura_id": [_factura["id"]]}).status_code == 200
+
+    _response = client.post("/administration/cierre-caja", json={"fecha": CIERRE, "factura_id": [_factura["id"]]})
+
+    assert _response.status_code == 409
+    assert "already closed" in _response.json()["detail"]
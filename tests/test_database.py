@@ -0,0 +1,58 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the Database wrapper and of the configured database backend.
+"""
+import os
+
+from sqlalchemy import text
+
+from databases.shared.database import Database, SQLiteTuning
+
+
+def test_build_url_defaults_to_the_local_sqlite_file():
+    _url = Database.build_url(None)
+
+    assert _url.get_backend_name() == "sqlite"
+    assert _url.database == "./mjpvcdb.db"
+
+
+def test_build_url_for_postgres():
+    _url = Database.build_url("postgresql+psycopg2", username="user", password="p@ss", host="db",
+                              port="5433", database="mjpv")
+
+    assert _url.get_backend_name() == "postgresql"
+    assert (_url.username, _url.password, _url.host, _url.port, _url.database) == ("user", "p@ss", "db", 5433, "mjpv")
+
+
+def test_postgres_database_connects_lazily():
+    # Nothing listens on port 1, the server is only contacted when first used
+    _db = Database(Database.build_url("postgresql+psycopg2", username="user", host="127.0.0.1", port=1,
+                                      database="mjpv"),
+                   pool_size=7, max_overflow=3)
+
+    assert _db.get_engine().dialect.name == "postgresql"
+    assert _db.get_engine().pool.size() == 7
+    assert _db.get_engine().pool._max_overflow == 3
+
+
+def test_sqlite_database_applies_tuning_and_pool_size(tmp_path):
+    _db = Database(Database.build_url("sqlite", database=str(tmp_path / "tuned.db")),
+                   tuning=SQLiteTuning(journal_mode="WAL", synchronous="NORMAL", busy_timeout=1234),
+                   pool_size=3, max_overflow=2)
+    try:
+        with _db.get_engine().connect() as _connection:
+            assert _connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert _connection.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert _connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        assert _db.get_engine().pool.size() == 3
+    finally:
+        _db.get_engine().dispose()
+
+
+def test_configured_backend_is_used(database):
+    _expected = os.environ.get("DB_AXION_DRIVERNAME") or "sqlite"
+
+    assert database.get_engine().dialect.name == _expected.split("+")[0]
+    with database.get_engine().connect() as _connection:
+        assert _connection.execute(text("SELECT 1")).scalar() == 1
@@ -0,0 +1,138 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the factura endpoints.
+"""
+import json
+
+from sqlalchemy import event
+
+from conftest import create_producto
+
+FECHA = "2024-05-02T12:00:00"
+
+
+def _checkout(client, items):
+    return client.post("/administration/checkout", json={"fecha": FECHA, "items": items})
+
+
+def test_checkout_returns_factura_with_detalles(client, session):
+    _cafe = create_producto(session, "Cafe", 1.5)
+    _te = create_producto(session, "Te", 1.25)
+
+    _response = _checkout(client, [{"producto_id": _cafe.id, "cantidad": 2},
+                                   {"producto_id": _te.id, "cantidad": 1}])
+
+    assert _response.status_code == 201, _response.text
+    _factura = _response.json()
+    assert _factura["total"] == 4.25
+    assert sorted((_detalle["producto_id"], _detalle["precio_final"]) for _detalle in _factura["detalles"]) == \
+        sorted([(_cafe.id, 3.0), (_te.id, 1.25)])
+
+
+def test_checkout_with_unknown_producto_is_not_found(client, session):
+    _cafe = create_producto(session)
+
+    _response = _checkout(client, [{"producto_id": _cafe.id, "cantidad": 1},
+                                   {"producto_id": _cafe.id + 100, "cantidad": 1}])
+
+    assert _response.status_code == 404
+    assert str(_cafe.id + 100) in _response.json()["detail"]
+
+
+def test_create_factura_rejects_detalles_of_another_factura(client, session):
+    from databases.axion.models.primaries.VentaDiaria import VentaDiaria
+
+    _cafe = create_producto(session)
+    _detalle_id = _checkout(client, [{"producto_id": _cafe.id, "cantidad": 2}]).json()["detalles"][0]["id"]
+
+    _response = client.post("/administration/factura", json={"fecha": FECHA, "detalle_ids": [_detalle_id]})
+
+    assert _response.status_code == 409
+    assert str(_detalle_id) in _response.json()["detail"]
+    _ventas = session.query(VentaDiaria).all()
+    assert [(_venta.producto_id, _venta.unidades) for _venta in _ventas] == [(_cafe.id, 2)]
+
+
+def test_create_factura_links_free_detalles(client, session):
+    _cafe = create_producto(session)
+    _detalle = client.post("/administration/detallefactura", json={"producto_id": _cafe.id, "cantidad": 3})
+    assert _detalle.status_code == 200, _detalle.text
+
+    _response = client.post("/administration/factura", json={"fecha": FECHA, "detalle_ids": [_detalle.json()["id"]]})
+
+    assert _response.status_code == 200, _response.text
+    assert _response.json()["total"] == 4.5
+
+
+def test_export_facturas_requires_authentication(app_client):
+    _response = app_client.get("/administration/export/facturas",
+                               params={"desde": "2024-01-01T00:00:00", "hasta": "2024-12-31T00:00:00"})
+
+    assert _response.status_code == 401
+
+
+def test_export_facturas_streams_detalles(client, session):
+    _cafe = create_producto(session)
+    _factura = _checkout(client, [{"producto_id": _cafe.id, "cantidad": 2}]).json()
+
+    _response = client.get("/administration/export/facturas",
+                           params={"desde": "2024-01-01T00:00:00", "hasta": "2024-12-31T00:00:00"})
+
+    assert _response.status_code == 200
+    _exported = [json.loads(_line) for _line in _response.text.splitlines()]
+    assert [(_row["id"], _row["total"], len(_row["detalles"])) for _row in _exported] == [(_factura["id"], 3.0, 1)]
+
+
+def _count_statements(database, request):
+    _statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        _statements.append(statement)
+
+    event.listen(database.get_engine(), "after_cursor_execute", _record)
+    try:
+        _response = request()
+    finally:
+        event.remove(database.get_engine(), "after_cursor_execute", _record)
+    assert _response.status_code == 200, _response.text
+    return _response.json(), _statements
+
+
+def test_factura_full_loads_detalles_and_productos_in_two_statements(client, session, database):
+    _productos = [create_producto(session, f"Producto {_index}", 1 + _index) for _index in range(4)]
+    _factura = _checkout(client, [{"producto_id": _producto.id, "cantidad": 1} for _producto in _productos]).json()
+
+    _body, _statements = _count_statements(database, lambda: client.get(f"/administration/factura/{_factura['id']}/full"))
+
+    assert len(_statements) == 2, _statements
+    assert sorted(_detalle["producto"]["nombre"] for _detalle in _body["detalles"]) == \
+        sorted(_producto.nombre for _producto in _productos)
+
+
+def test_facturas_full_statements_do_not_grow_with_facturas(client, session, database):
+    _productos = [create_producto(session, f"Producto {_index}", 1 + _index) for _index in range(3)]
+    _ids = [_checkout(client, [{"producto_id": _producto.id, "cantidad": 2} for _producto in _productos]).json()["id"]
+            for _ in range(5)]
+
+    for _count in (1, 5):
+        _body, _statements = _count_statements(
+            database, lambda: client.get("/administration/facturas/full", params={"ids": _ids[:_count]}))
+
+        assert len(_statements) == 2, _statements
+        assert [_factura["id"] for _factura in _body] == _ids[:_count]
+        assert all(len(_factura["detalles"]) == 3 and _factura["detalles"][0]["producto"]
+                   for _factura in _body)
+
+
+def test_missing_factura_full_is_not_found(client, session):
+    _producto = create_producto(session)
+    _id = _checkout(client, [{"producto_id": _producto.id, "cantidad": 1}]).json()["id"]
+
+    _response = client.get(f"/administration/factura/{_id + 1}/full")
+    assert _response.status_code == 404
+    assert str(_id + 1) in _response.json()["detail"]
+
+    _response = client.get("/administration/facturas/full", params={"ids": [_id, _id + 1]})
+    assert _response.status_code == 404
+    assert _response.json()["detail"] == f"Facturas with ids [{_id + 1}] not found"
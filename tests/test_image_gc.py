@@ -0,0 +1,118 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the garbage collection of product images.
+"""
+import fcntl
+import hashlib
+import os
+import time
+
+import pytest
+
+from databases.axion.models.primaries.Producto import Producto
+from modules.images import gc
+
+OLD = time.time() - 7200
+GRACE_PERIOD = 3600
+
+
+@pytest.fixture
+def images_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(gc, "IMAGES_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _write(images_dir, name: str, content: bytes = b"image", mtime: float = OLD):
+    _path = images_dir / name
+    _path.write_bytes(content)
+    os.utime(_path, (mtime, mtime))
+    return _path
+
+def _producto(session, imagen_url: str, imagen_variantes: dict | None = None) -> Producto:
+    _producto = Producto(nombre="Cafe", precio=1.5, imagen_url=imagen_url, imagen_variantes=imagen_variantes)
+    session.add(_producto)
+    session.commit()
+    return _producto
+
+def _names(images_dir) -> set:
+    return {_path.name for _path in images_dir.iterdir() if _path.name != gc._LOCK_NAME}
+
+
+def test_unreferenced_files_are_deleted_after_the_grace_period(session, images_dir):
+    _write(images_dir, "old.png", b"old")
+    _write(images_dir, "new.png", b"new", mtime=time.time())
+
+    _report = gc.collect_images(session, GRACE_PERIOD)
+
+    assert _names(images_dir) == {"new.png"}
+    assert _report == {"files": 2, "deduplicated": 0, "deleted": 1, "reclaimed_bytes": 3}
+
+
+def test_referenced_original_and_variants_are_kept(session, images_dir):
+    _digest = hashlib.sha256(b"cafe").hexdigest()
+    for _name in (f"{_digest}.png", f"{_digest}_160.webp", f"{_digest}_320.webp"):
+        _write(images_dir, _name, b"cafe")
+    _producto(session, f"/images/{_digest}.png",
+              {"160": f"/images/{_digest}_160.webp", "320": f"/images/{_digest}_320.webp"})
+
+    _report = gc.collect_images(session, GRACE_PERIOD)
+
+    assert _names(images_dir) == {f"{_digest}.png", f"{_digest}_160.webp", f"{_digest}_320.webp"}
+    assert _report["deleted"] == 0
+
+
+def test_duplicate_content_is_rewritten_to_the_hashed_file_and_its_variants(session, images_dir):
+    _digest = hashlib.sha256(b"cafe").hexdigest()
+    _write(images_dir, f"{_digest}.png", b"cafe")
+    _write(images_dir, f"{_digest}_160.webp", b"small")
+    _write(images_dir, "cafe.png", b"cafe")
+    _write(images_dir, "cafe_160.webp", b"small")
+    _hashed = _producto(session, f"/images/{_digest}.png", {"160": f"/images/{_digest}_160.webp"})
+    _legacy = _producto(session, "/images/cafe.png", {"160": "/images/cafe_160.webp"})
+
+    _report = gc.collect_images(session, GRACE_PERIOD)
+
+    session.expire_all()
+    for _item in (_hashed, _legacy):
+        assert _item.imagen_url == f"/images/{_digest}.png"
+        assert _item.imagen_variantes == {"160": f"/images/{_digest}_160.webp"}
+    assert _names(images_dir) == {f"{_digest}.png", f"{_digest}_160.webp"}
+    assert _report["deduplicated"] == 1
+    assert _report["deleted"] == 2
+
+
+def test_duplicate_without_variants_on_disk_keeps_its_own(session, images_dir):
+    _write(images_dir, "a.png", b"cafe")
+    _write(images_dir, "b.png", b"cafe")
+    _write(images_dir, "b_160.webp", b"small")
+    _producto(session, "/images/a.png")
+    _duplicate = _producto(session, "/images/b.png", {"160": "/images/b_160.webp"})
+
+    gc.collect_images(session, GRACE_PERIOD)
+
+    session.expire_all()
+    assert _duplicate.imagen_url == "/images/a.png"
+    assert _duplicate.imagen_variantes == {"160": "/images/b_160.webp"}
+    assert _names(images_dir) == {"a.png", "b_160.webp"}
+
+
+def test_leftover_temporary_files_are_removed(session, images_dir):
+    _write(images_dir, ".upload-old")
+    _write(images_dir, ".variant-old")
+    _write(images_dir, ".upload-in-progress", mtime=time.time())
+
+    gc.collect_images(session, GRACE_PERIOD)
+
+    assert _names(images_dir) == {".upload-in-progress"}
+
+
+def test_collection_is_skipped_while_another_process_collects(session, images_dir):
+    _write(images_dir, "old.png")
+
+    with open(images_dir / gc._LOCK_NAME, "a") as _lock:
+        fcntl.flock(_lock, fcntl.LOCK_EX)
+        assert gc.collect_images(session, GRACE_PERIOD) is None
+        assert _names(images_dir) == {"old.png"}
+
+    assert gc.collect_images(session, GRACE_PERIOD)["deleted"] == 1
@@ -0,0 +1,126 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the product image uploads and the request body limit.
+"""
+import asyncio
+import io
+import threading
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from endpoints.shared.middleware import BodySizeLimitMiddleware
+from modules.images.utils import store_image
+
+
+def _png(width: int, height: int) -> bytes:
+    _buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(_buffer, format="PNG")
+    return _buffer.getvalue()
+
+def _upload(client, content: bytes):
+    return client.post("/administration/producto", params={"nombre": "Cafe", "precio": 1.5},
+                       files={"file": ("cafe.png", content, "image/png")})
+
+def _limited_client(max_size: int):
+    """
+    Return a client of a bare upload app behind the body limit and the list of files it read.
+    """
+    _app = FastAPI()
+    _reached = []
+
+    @_app.post("/upload")
+    async def _endpoint(file: UploadFile = File(...)):
+        _reached.append(len(await file.read()))
+        return {"size": _reached[-1]}
+
+    return TestClient(BodySizeLimitMiddleware(_app, max_size=max_size)), _reached
+
+
+def test_upload_stores_image_and_variants(client):
+    _response = _upload(client, _png(400, 200))
+
+    assert _response.status_code == 201
+    _body = _response.json()
+    assert _body["imagen_url"].startswith("/images/")
+    assert sorted(_body["imagen_variantes"], key=int) == ["160", "320"]
+
+
+def test_declared_content_length_over_limit_is_rejected_before_reading():
+    _client, _reached = _limited_client(1024)
+
+    _response = _client.post("/upload", files={"file": ("big.bin", b"x" * 4096)})
+
+    assert _response.status_code == 413
+    assert _reached == []
+
+
+def test_chunked_body_over_limit_is_rejected_while_received():
+    _client, _reached = _limited_client(1024)
+    _multipart = (b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.bin\"\r\n\r\n"
+                  + b"x" * 4096 + b"\r\n--b--\r\n")
+
+    def _chunks():
+        for _start in range(0, len(_multipart), 512):
+            yield _multipart[_start:_start + 512]
+
+    _response = _client.post("/upload", content=_chunks(),
+                             headers={"Content-Type": "multipart/form-data; boundary=b"})
+
+    assert _response.status_code == 413
+    assert _reached == []
+
+
+def test_body_under_limit_is_accepted():
+    _client, _reached = _limited_client(1024)
+
+    _response = _client.post("/upload", files={"file": ("small.bin", b"x" * 100)})
+
+    assert _response.status_code == 200
+    assert _reached == [100]
+
+
+def test_image_with_too_many_pixels_is_rejected(client, monkeypatch):
+    monkeypatch.setattr("modules.images.utils.IMAGE_MAX_PIXELS", 100 * 100)
+
+    _response = _upload(client, _png(101, 100))
+
+    assert _response.status_code == 413
+
+
+def test_decompression_bomb_is_rejected(client, monkeypatch):
+    # Over twice Pillow's own limit, Image.open raises DecompressionBombError
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+
+    _response = _upload(client, _png(100, 100))
+
+    assert _response.status_code == 413
+
+
+def test_slow_upload_does_not_hold_a_render_slot(monkeypatch):
+    monkeypatch.setattr("modules.images.utils._image_slots", threading.BoundedSemaphore(1))
+
+    class _Upload:
+        def __init__(self, content: bytes, release: asyncio.Event | None = None):
+            self._chunks = [content]
+            self._release = release
+
+        async def read(self, size: int) -> bytes:
+            if self._release is not None:
+                await self._release.wait()
+            return self._chunks.pop() if self._chunks else b""
+
+    async def _run():
+        _release = asyncio.Event()
+        _slow = asyncio.create_task(store_image(_Upload(_png(300, 100), _release)))
+        await asyncio.sleep(0)
+        # The slow client is still streaming, the only slot is free for this one
+        _fast = await store_image(_Upload(_png(200, 100)))
+        _release.set()
+        return _fast, await _slow
+
+    _fast, _slow = asyncio.run(_run())
+
+    assert _fast[0] != _slow[0]
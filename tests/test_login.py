@@ -0,0 +1,175 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the login tokens, their refresh and revocation.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, text
+
+from conftest import PASSWORD, USERNAME
+from databases.axion.handlers.primaries.LocalUser import \
+    LocalUser as LocalUserHandler
+from databases.axion.handlers.primaries.LocalUser import local_user_cache
+from databases.axion.migrations import _0006_local_user_autoincrement
+from modules.login.revocation import RevocationSet
+from modules.login.utils import decode_token
+
+
+def _create_user(client, username: str) -> int:
+    _response = client.post("/administration/local-user", json={"username": username, "password": PASSWORD})
+    assert _response.status_code == 201, _response.text
+    return _response.json()["id"]
+
+def _login(client, username: str = USERNAME) -> dict:
+    _response = client.post("/login", data={"username": username, "password": PASSWORD})
+    assert _response.status_code == 200, _response.text
+    return _response.json()
+
+def _list_users(client, access_token: str):
+    return client.get("/administration/local-users", headers={"Authorization": f"Bearer {access_token}"})
+
+
+def test_deleted_user_id_is_not_reused(client):
+    _id = _create_user(client, "cajero")
+    _token = _login(client, "cajero")["access_token"]
+    assert _list_users(client, _token).status_code == 200
+
+    assert client.delete("/administration/local-user", params={"id": _id}).status_code == 200
+    _new_id = _create_user(client, "otro")
+
+    assert _new_id != _id
+    assert _list_users(client, _token).status_code == 401
+
+
+def test_token_of_deleted_user_is_rejected_for_user_on_same_id(client, session):
+    _id = _create_user(client, "cajero")
+    _token = _login(client, "cajero")["access_token"]
+    assert client.delete("/administration/local-user", params={"id": _id}).status_code == 200
+
+    # A database that reused the id, e.g. one deleted before the AUTOINCREMENT migration
+    session.execute(text("INSERT INTO local_users (id, username, password_hash, token_version)"
+                         " VALUES (:id, 'otro', 'x', 0)"), {"id": _id})
+    session.commit()
+
+    assert _list_users(client, _token).status_code == 401
+
+
+def test_user_read_before_a_password_change_is_not_cached(client, session, monkeypatch):
+    _id = _create_user(client, "cajero")
+    _token = _login(client, "cajero")["access_token"]
+    _get_local_user_by_id = LocalUserHandler.get_local_user_by_id
+
+    def _read_then_change_password(self, db, id):
+        # The password changes between the read of the user and its caching
+        _user = _get_local_user_by_id(self, db, id)
+        _stale = SimpleNamespace(username=_user.username, token_version=_user.token_version)
+        LocalUserHandler().update_local_user(session, id, "cajero", "new-password-hash")
+        return _stale
+
+    monkeypatch.setattr(LocalUserHandler, "get_local_user_by_id", _read_then_change_password)
+    assert _list_users(client, _token).status_code == 200
+    monkeypatch.undo()
+
+    assert local_user_cache.get(_id) is None
+    assert _list_users(client, _token).status_code == 401
+
+
+def test_local_users_are_rebuilt_with_autoincrement(tmp_path):
+    _engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with _engine.begin() as _connection:
+        _connection.execute(text(
+            "CREATE TABLE local_users (id INTEGER NOT NULL PRIMARY KEY, username VARCHAR(255) NOT NULL,"
+            " password_hash VARCHAR(255) NOT NULL, token_version INTEGER DEFAULT '0' NOT NULL,"
+            " UNIQUE (username))"))
+        _connection.execute(text("INSERT INTO local_users (id, username, password_hash, token_version)"
+                                 " VALUES (1, 'a', 'x', 0), (2, 'b', 'y', 3)"))
+
+    with _engine.begin() as _connection:
+        _0006_local_user_autoincrement(_connection)
+        # Applying it again is a no-op
+        _0006_local_user_autoincrement(_connection)
+
+    with _engine.begin() as _connection:
+        assert _connection.execute(text(
+            "SELECT id, username, password_hash, token_version FROM local_users ORDER BY id")).all() == [
+            (1, "a", "x", 0), (2, "b", "y", 3)]
+        _connection.execute(text("DELETE FROM local_users WHERE id = 2"))
+        _connection.execute(text("INSERT INTO local_users (username, password_hash) VALUES ('c', 'z')"))
+        assert _connection.execute(text("SELECT id FROM local_users WHERE username = 'c'")).scalar() == 3
+    _engine.dispose()
+
+
+def test_refresh_token_is_single_use(app_client):
+    _create_user(app_client, "cajero")
+    _refresh_token = _login(app_client, "cajero")["refresh_token"]
+
+    _first = app_client.post("/login/refresh", json={"refresh_token": _refresh_token})
+    _second = app_client.post("/login/refresh", json={"refresh_token": _refresh_token})
+
+    assert _first.status_code == 200
+    assert _list_users(app_client, _first.json()["access_token"]).status_code == 200
+    assert _second.status_code == 401
+
+
+def test_concurrent_refreshes_of_one_token_succeed_once(app_client, monkeypatch):
+    _create_user(app_client, "cajero")
+    _refresh_token = _login(app_client, "cajero")["refresh_token"]
+
+    # Both requests verify the token before either revokes it
+    _barrier = threading.Barrier(2, timeout=5)
+
+    def _decode_token(*args, **kwargs):
+        _payload = decode_token(*args, **kwargs)
+        _barrier.wait()
+        return _payload
+
+    monkeypatch.setattr("endpoints.operation.login.decode_token", _decode_token)
+    with ThreadPoolExecutor(max_workers=2) as _executor:
+        _statuses = list(_executor.map(
+            lambda _: app_client.post("/login/refresh", json={"refresh_token": _refresh_token}).status_code,
+            range(2)))
+
+    assert sorted(_statuses) == [200, 401]
+
+
+def test_revocation_set_revokes_each_token_once():
+    _revoked = RevocationSet()
+    _barrier = threading.Barrier(16)
+
+    def _revoke(_):
+        _barrier.wait()
+        return _revoked.revoke("jti", time.time() + 60)
+
+    with ThreadPoolExecutor(max_workers=16) as _executor:
+        assert sorted(_executor.map(_revoke, range(16))) == [False] * 15 + [True]
+    assert _revoked.is_revoked("jti")
+
+
+def test_refresh_reads_token_version_past_stale_cache(app_client, session):
+    _id = _create_user(app_client, "cajero")
+    _refresh_token = _login(app_client, "cajero")["refresh_token"]
+
+    # Password changed on another worker: the database moved on, this worker's cache did not
+    session.execute(text("UPDATE local_users SET token_version = token_version + 1 WHERE id = :id"), {"id": _id})
+    session.commit()
+    local_user_cache.set(_id, ("cajero", 0))
+
+    _response = app_client.post("/login/refresh", json={"refresh_token": _refresh_token})
+
+    assert _response.status_code == 401
+
+
+def test_logout_revokes_access_and_refresh_tokens(app_client):
+    _create_user(app_client, "cajero")
+    _tokens = _login(app_client, "cajero")
+
+    _response = app_client.post("/login/logout", json={"refresh_token": _tokens["refresh_token"]},
+                                headers={"Authorization": f"Bearer {_tokens['access_token']}"})
+
+    assert _response.status_code == 204
+    assert _list_users(app_client, _tokens["access_token"]).status_code == 401
+    assert app_client.post("/login/refresh", json={"refresh_token": _tokens["refresh_token"]}).status_code == 401
@@ -0,0 +1,147 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the in-process metrics registry, its Prometheus text exposition and the
+/metrics endpoint.
+"""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import create_producto
+from databases.axion.init_db import db
+from main import app
+from modules.metrics.registry import Registry, observe_query
+
+
+def _samples(text: str) -> dict:
+    """
+    Return the samples of a Prometheus text exposition by name and labels.
+    """
+    _samples = {}
+    for _line in text.splitlines():
+        if _line and not _line.startswith("#"):
+            _name, _value = _line.rsplit(" ", 1)
+            _samples[_name] = float(_value)
+    return _samples
+
+
+def test_counter_sums_the_shards_of_every_thread():
+    _counter = Registry().counter("events_total", "Events.", ("kind",))
+    _start = threading.Barrier(8)
+
+    def _record():
+        _start.wait()
+        for _ in range(1000):
+            _counter.inc("a")
+        _counter.inc("b", amount=2.5)
+
+    _threads = [threading.Thread(target=_record) for _ in range(8)]
+    for _thread in _threads:
+        _thread.start()
+    for _thread in _threads:
+        _thread.join()
+
+    assert _counter.render() == ["# HELP events_total Events.",
+                                 "# TYPE events_total counter",
+                                 'events_total{kind="a"} 8000',
+                                 'events_total{kind="b"} 20']
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    _histogram = Registry().histogram("latency_seconds", "Latency.", buckets=(0.5, 0.1))
+
+    def _record(*values):
+        for _value in values:
+            _histogram.observe(_value)
+
+    _record(0.25, 0.1)
+    _thread = threading.Thread(target=_record, args=(0.5, 2.0))
+    _thread.start()
+    _thread.join()
+
+    assert _histogram.render() == ["# HELP latency_seconds Latency.",
+                                   "# TYPE latency_seconds histogram",
+                                   'latency_seconds_bucket{le="0.1"} 1',
+                                   'latency_seconds_bucket{le="0.5"} 3',
+                                   'latency_seconds_bucket{le="+Inf"} 4',
+                                   "latency_seconds_sum 2.85",
+                                   "latency_seconds_count 4"]
+
+
+def test_label_values_are_escaped():
+    _counter = Registry().counter("paths_total", "Paths.", ("path",))
+
+    _counter.inc('a\\b"c\nd')
+
+    assert _counter.render()[-1] == 'paths_total{path="a\\\\b\\"c\\nd"} 1'
+
+
+def test_gauge_is_read_at_render_time():
+    _values = [(("x",), 1)]
+    _registry = Registry()
+    _registry.gauge("queue_size", "Queued jobs.", ("queue",), lambda: _values)
+
+    _values.append((("y",), 0.25))
+
+    assert _registry.render() == ("# HELP queue_size Queued jobs.\n"
+                                  "# TYPE queue_size gauge\n"
+                                  'queue_size{queue="x"} 1\n'
+                                  'queue_size{queue="y"} 0.25\n')
+
+
+def test_a_metric_name_is_registered_once():
+    _registry = Registry()
+    _registry.counter("events_total", "Events.")
+
+    with pytest.raises(ValueError):
+        _registry.histogram("events_total", "Events.")
+
+
+def test_query_observer_records_by_operation(monkeypatch):
+    _histogram = Registry().histogram("statements_seconds", "Statements.", ("operation",))
+    monkeypatch.setattr("modules.metrics.registry.db_statement_duration", _histogram)
+
+    observe_query("select 1", 0.001)
+    observe_query("  INSERT INTO producto VALUES (1)", 0.002)
+    observe_query("", 0.003)
+
+    _counts = _samples("\n".join(_histogram.render()))
+    assert _counts['statements_seconds_count{operation="SELECT"}'] == 1
+    assert _counts['statements_seconds_count{operation="INSERT"}'] == 1
+    assert _counts['statements_seconds_count{operation="OTHER"}'] == 1
+
+
+def test_query_observer_is_registered_by_the_lifespan(app_client):
+    _registered = db._query_observers.count(observe_query)
+
+    with TestClient(app):
+        assert db._query_observers.count(observe_query) == _registered + 1
+
+    assert db._query_observers.count(observe_query) == _registered
+
+
+def test_metrics_endpoint_exposes_requests_statements_and_collectors(client, session):
+    create_producto(session, "Cafe", 1.5)
+    _before = _samples(client.get("/metrics").text)
+
+    for _ in range(3):
+        assert client.get("/administration/productos").status_code == 200
+    assert client.get("/administration/producto-by-id/999999").status_code == 404
+    _response = client.get("/metrics")
+
+    assert _response.status_code == 200
+    assert _response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    _after = _samples(_response.text)
+
+    def _delta(name: str) -> float:
+        return _after.get(name, 0) - _before.get(name, 0)
+
+    assert _delta('http_requests_total{method="GET",route="/administration/productos",status="200"}') == 3
+    assert _delta('http_requests_total{method="GET",route="/administration/producto-by-id/{id}",status="404"}') == 1
+    assert _delta('http_request_duration_seconds_count{method="GET",route="/administration/productos"}') == 3
+    assert _delta('db_statement_duration_seconds_count{operation="SELECT"}') > 0
+    assert 'cache_misses_total{cache="catalog"}' in _after
+    assert 'cache_entries{cache="local_user"}' in _after
+    assert "db_pool_checked_out" in _after
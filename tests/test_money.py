@@ -0,0 +1,144 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the exact money arithmetic: the Money column type and the migration of
+float amounts to integer cents.
+"""
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import (Column, Float, Integer, MetaData, Table, create_engine,
+                        func, select)
+
+from conftest import create_producto
+from databases.axion.handlers.primaries.CierreCaja import CierreCaja
+from databases.axion.handlers.primaries.Factura import Factura
+from databases.axion.migrations import _0002_money_in_cents
+from databases.axion.models.primaries.DetalleFactura import DetalleFactura
+from databases.axion.models.primaries.Factura import Factura as FacturaModel
+from databases.axion.schemas.primaries.CierreCaja import RequestCierreCaja
+from databases.axion.schemas.primaries.Factura import (RequestCheckout,
+                                                       RequestCheckoutItem)
+from databases.shared.types import Money
+
+SEED = 20240502
+
+
+@pytest.mark.parametrize("value, cents", [
+    (0, 0),
+    (1.5, 150),
+    (0.1 + 0.2, 30),
+    (sum([0.1] * 10), 100),
+    (1.15 * 3, 345),
+    (1.005, 101),
+    (2.675, 268),
+    ("19.99", 1999),
+    (Decimal("0.005"), 1),
+    (-0.005, -1),
+    (None, None),
+])
+def test_money_binds_amounts_as_cents_rounded_half_up(value, cents):
+    assert Money().process_bind_param(value, None) == cents
+
+
+@pytest.mark.parametrize("stored, amount", [
+    (150, Decimal("1.50")),
+    (150.0, Decimal("1.50")),
+    (-1, Decimal("-0.01")),
+    (None, None),
+])
+def test_money_reads_cents_as_decimal(stored, amount):
+    _value = Money().process_result_value(stored, None)
+
+    assert _value == amount
+    assert _value is None or _value.as_tuple().exponent == -2
+
+
+def test_money_round_trips_random_amounts():
+    _rng = random.Random(SEED)
+    _money = Money()
+    for _ in range(10000):
+        _amount = Decimal(_rng.randint(-10**9, 10**9)) / 100
+        assert _money.process_result_value(_money.process_bind_param(_amount, None), None) == _amount
+        assert _money.process_result_value(_money.process_bind_param(float(_amount), None), None) == _amount
+
+
+def test_sql_totals_match_python_totals_across_random_facturas(session):
+    _rng = random.Random(SEED)
+    _productos = [create_producto(session, f"Producto {_index}", _rng.randint(1, 5000) / 100)
+                  for _index in range(20)]
+    _precios = {_producto.id: _producto.precio for _producto in _productos}
+    _fecha = datetime(2024, 5, 1)
+
+    def _random_items():
+        return [(_rng.choice(_productos).id, _rng.randint(1, 9)) for _ in range(_rng.randint(1, 5))]
+
+    def _python_total(items):
+        return sum((_precios[_producto_id] * _cantidad for _producto_id, _cantidad in items), Decimal(0))
+
+    # Through the checkout handler, which prices the detalles
+    _expected_totals = []
+    for _index in range(200):
+        _items = _random_items()
+        _factura = Factura().checkout(session, RequestCheckout(
+            fecha=_fecha + timedelta(minutes=_index),
+            items=[RequestCheckoutItem(producto_id=_producto_id, cantidad=_cantidad) for _producto_id, _cantidad in _items]))
+        assert _factura.total == _python_total(_items)
+        _expected_totals.append(_factura.total)
+
+    # And in bulk, with amounts bound as floats as older clients computed them
+    for _index in range(3000):
+        _items = _random_items()
+        _detalles = [DetalleFactura(producto_id=_producto_id, cantidad=_cantidad,
+                                    precio_unitario=float(_precios[_producto_id]),
+                                    precio_final=float(_precios[_producto_id] * _cantidad))
+                     for _producto_id, _cantidad in _items]
+        _total = _python_total(_items)
+        session.add(FacturaModel(fecha=_fecha + timedelta(hours=_index), total=float(_total), detalles=_detalles))
+        _expected_totals.append(_total)
+    session.commit()
+
+    _expected_sum = sum(_expected_totals, Decimal(0))
+    assert session.query(func.count(FacturaModel.id)).scalar() == 3200
+    assert session.query(func.sum(FacturaModel.total)).scalar() == _expected_sum
+    assert session.query(func.sum(DetalleFactura.precio_final)).scalar() == _expected_sum
+    assert sorted(_total for (_total,) in session.query(FacturaModel.total)) == sorted(_expected_totals)
+
+    _cierre = CierreCaja().create_cierre_caja(session, RequestCierreCaja(fecha=_fecha, hasta=datetime(2030, 1, 1)))
+    assert _cierre.total_ventas == _expected_sum
+
+
+def test_migration_converts_float_amounts_to_cents(tmp_path):
+    _engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    _legacy = MetaData()
+    _productos = Table("productos", _legacy, Column("id", Integer, primary_key=True), Column("precio", Float))
+    _facturas = Table("facturas", _legacy, Column("id", Integer, primary_key=True), Column("total", Float))
+    _legacy.create_all(_engine)
+
+    # Amounts as the float columns held them: rounded to the cent, with float noise
+    _rng = random.Random(SEED)
+    _precios = [_rng.randint(0, 10**6) / 100 for _ in range(1000)]
+    _totales = [round(sum([_precio] * 3), 2) for _precio in _precios] + [0.1 + 0.2, sum([0.1] * 10), None]
+    with _engine.begin() as _connection:
+        _connection.execute(_productos.insert(), [{"precio": _precio} for _precio in _precios])
+        _connection.execute(_facturas.insert(), [{"total": _total} for _total in _totales])
+
+    with _engine.begin() as _connection:
+        _0002_money_in_cents(_connection)
+
+    _migrated = MetaData()
+    _productos = Table("productos", _migrated, Column("id", Integer, primary_key=True), Column("precio", Money))
+    _facturas = Table("facturas", _migrated, Column("id", Integer, primary_key=True), Column("total", Money))
+    with _engine.connect() as _connection:
+        _read_precios = _connection.execute(select(_productos.c.precio).order_by(_productos.c.id)).scalars().all()
+        _read_totales = _connection.execute(select(_facturas.c.total).order_by(_facturas.c.id)).scalars().all()
+        _sum = _connection.execute(select(func.sum(_facturas.c.total))).scalar()
+
+    _expected_totales = [None if _total is None else Decimal(str(_total)).quantize(Decimal("0.01"))
+                         for _total in _totales]
+    assert _read_precios == [Decimal(str(_precio)).quantize(Decimal("0.01")) for _precio in _precios]
+    assert _read_totales == _expected_totales
+    assert _sum == sum(_total for _total in _expected_totales if _total is not None)
+    _engine.dispose()
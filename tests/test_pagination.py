@@ -0,0 +1,53 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the keyset pagination of the list endpoints.
+"""
+import pytest
+
+from conftest import create_producto
+from databases.shared.pagination import encode_cursor
+
+LISTS = ["/administration/productos", "/administration/facturas", "/administration/cierres-caja",
+         "/administration/detallefacturas", "/administration/local-users"]
+
+
+def _checkout(client, producto_id, fecha):
+    _response = client.post("/administration/checkout",
+                            json={"fecha": fecha, "items": [{"producto_id": producto_id, "cantidad": 1}]})
+    assert _response.status_code == 201, _response.text
+    return _response.json()
+
+
+def test_facturas_are_paged_by_fecha_and_id(client, session):
+    _cafe = create_producto(session)
+    _ids = [_checkout(client, _cafe.id, f"2024-05-0{_day}T12:00:00")["id"] for _day in (3, 1, 2)]
+
+    _seen, _cursor = [], None
+    while True:
+        _params = {"limit": 2, **({"cursor": _cursor} if _cursor else {})}
+        _page = client.get("/administration/facturas", params=_params).json()
+        _seen += [_factura["id"] for _factura in _page["items"]]
+        _cursor = _page["next_cursor"]
+        if _cursor is None:
+            break
+
+    assert _seen == [_ids[1], _ids[2], _ids[0]]
+
+
+@pytest.mark.parametrize("path", LISTS)
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(["x"]), encode_cursor(["zzz", 1]),
+                                    encode_cursor([1, 2, 3]), encode_cursor([True]), encode_cursor([None])])
+def test_malformed_cursor_is_a_bad_request(client, session, path, cursor):
+    create_producto(session)
+
+    _response = client.get(path, params={"cursor": cursor})
+
+    assert _response.status_code == 400, _response.text
+    assert isinstance(_response.json()["detail"], str)
+
+
+def test_cursor_with_wrong_fecha_type_is_a_bad_request(client):
+    _response = client.get("/administration/facturas", params={"cursor": encode_cursor([1, 1])})
+
+    assert _response.status_code == 400
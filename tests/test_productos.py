@@ -0,0 +1,82 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the product catalog ETag and its invalidation on writes.
+"""
+import io
+
+import pytest
+from PIL import Image
+
+
+def _png(color: tuple) -> bytes:
+    _buffer = io.BytesIO()
+    Image.new("RGB", (200, 100), color).save(_buffer, format="PNG")
+    return _buffer.getvalue()
+
+def _create(client, nombre: str = "Cafe", color: tuple = (200, 30, 30)) -> dict:
+    _response = client.post("/administration/producto", params={"nombre": nombre, "precio": 1.5},
+                            files={"file": ("producto.png", _png(color), "image/png")})
+    assert _response.status_code == 201, _response.text
+    return _response.json()
+
+def _etag(client) -> str:
+    _response = client.get("/administration/productos")
+    assert _response.status_code == 200, _response.text
+    return _response.headers["ETag"]
+
+
+def test_matching_etag_returns_304(client):
+    _create(client)
+    _response = client.get("/administration/productos")
+
+    _not_modified = client.get("/administration/productos", headers={"If-None-Match": _response.headers["ETag"]})
+
+    assert _not_modified.status_code == 304
+    assert _not_modified.headers["ETag"] == _response.headers["ETag"]
+    assert _not_modified.content == b""
+
+
+@pytest.mark.parametrize("if_none_match", ['*', '"other", {etag}', '{etag},"other"'])
+def test_wildcard_and_lists_of_etags_match(client, if_none_match):
+    _create(client)
+    _etag_value = _etag(client)
+
+    _response = client.get("/administration/productos",
+                           headers={"If-None-Match": if_none_match.format(etag=_etag_value)})
+
+    assert _response.status_code == 304
+
+
+def test_stale_etag_returns_catalog(client):
+    _create(client)
+
+    _response = client.get("/administration/productos", headers={"If-None-Match": '"stale", "older"'})
+
+    assert _response.status_code == 200
+    assert [_item["nombre"] for _item in _response.json()["items"]] == ["Cafe"]
+
+
+def test_etag_changes_on_every_write(client):
+    _producto = _create(client)
+    _etags = [_etag(client)]
+
+    _create(client, nombre="Te")
+    _etags.append(_etag(client))
+
+    _response = client.put("/administration/producto", json={**_producto, "precio": 2.0})
+    assert _response.status_code == 200, _response.text
+    _etags.append(_etag(client))
+
+    _response = client.put("/administration/producto/imagen", params={"item_id": _producto["id"]},
+                           files={"file": ("producto.png", _png((30, 30, 200)), "image/png")})
+    assert _response.status_code == 200, _response.text
+    _etags.append(_etag(client))
+
+    assert client.delete("/administration/producto", params={"id": _producto["id"]}).status_code == 200
+    _etags.append(_etag(client))
+
+    assert len(set(_etags)) == len(_etags)
+    _stale = client.get("/administration/productos", headers={"If-None-Match": _etags[0]})
+    assert _stale.status_code == 200
+    assert [_item["nombre"] for _item in _stale.json()["items"]] == ["Te"]
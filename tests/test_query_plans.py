@@ -0,0 +1,134 @@
+"""
+Team: MSG - AXIANS
+
+Tests that the hot queries are answered through the indexes of the migrations.
+
+The statements are captured as the handlers execute them and explained with
+their parameters. On Postgres sequential scans are disabled while explaining,
+otherwise the planner rightly prefers them on the tiny tables of the tests.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, inspect
+
+from conftest import create_producto
+from databases.axion.handlers.primaries.CierreCaja import CierreCaja
+from databases.axion.handlers.primaries.DetalleFactura import DetalleFactura
+from databases.axion.handlers.primaries.Factura import Factura
+from databases.axion.migrations import MIGRATIONS, schema_version, upgrade
+from databases.axion.schemas.primaries.CierreCaja import RequestCierreCaja
+from databases.axion.schemas.primaries.Factura import (RequestCheckout,
+                                                       RequestCheckoutItem)
+from databases.shared.pagination import decode_cursor
+
+FECHA = datetime(2024, 5, 2, 12)
+
+HOT_INDEXES = {
+    "detalles_facturas": {"ix_detalles_facturas_factura_id", "ix_detalles_facturas_producto_id"},
+    "facturas": {"ix_facturas_fecha_id", "ix_facturas_cierre_caja_id_fecha"},
+    "cierres_caja": {"ix_cierres_caja_fecha_id"},
+}
+
+
+@pytest.fixture
+def capture(database):
+    """
+    Return a function running a callable and returning the statements it executed.
+    """
+    def _capture(operation):
+        _statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            _statements.append((statement, parameters))
+
+        event.listen(database.get_engine(), "before_cursor_execute", _record)
+        try:
+            operation()
+        finally:
+            event.remove(database.get_engine(), "before_cursor_execute", _record)
+        return _statements
+    return _capture
+
+
+def _plan(database, statement: str, parameters) -> str:
+    with database.get_engine().connect() as _connection:
+        if _connection.dialect.name == "postgresql":
+            _connection.exec_driver_sql("SET enable_seqscan = off")
+            _rows = _connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+            return "\n".join(_row[0] for _row in _rows)
+        _rows = _connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return "\n".join(_row[-1] for _row in _rows)
+
+
+def _assert_uses_index(database, statements: list, marker: str, index: str):
+    _matching = [(_statement, _parameters) for _statement, _parameters in statements if marker in _statement]
+    assert _matching, f"no statement containing {marker!r} was executed"
+    for _statement, _parameters in _matching:
+        _plan_text = _plan(database, _statement, _parameters)
+        assert index in _plan_text, f"{_statement}\n{_plan_text}"
+
+
+@pytest.fixture
+def facturas(session):
+    """
+    Two closed and one open factura with their detalles.
+    """
+    _cafe = create_producto(session)
+    _ids = [Factura().checkout(session, RequestCheckout(fecha=FECHA, items=[
+        RequestCheckoutItem(producto_id=_cafe.id, cantidad=1)])).id for _ in range(3)]
+    CierreCaja().create_cierre_caja(session, RequestCierreCaja(fecha=FECHA, factura_id=_ids[:2]))
+    return _ids
+
+
+def test_detalles_of_a_factura_use_the_factura_id_index(database, session, capture, facturas):
+    _statements = capture(lambda: DetalleFactura().get_detalle_factura_by_factura_id(session, facturas[0]))
+
+    _assert_uses_index(database, _statements, "FROM detalles_facturas", "ix_detalles_facturas_factura_id")
+
+
+def test_facturas_of_a_cierre_use_the_cierre_caja_id_index(database, session, capture, facturas):
+    _statements = capture(lambda: Factura().get_factura_by_cierre_caja_id(session, 1))
+
+    _assert_uses_index(database, _statements, "FROM facturas", "ix_facturas_cierre_caja_id_fecha")
+
+
+def test_facturas_pages_use_the_fecha_id_index(database, session, capture, facturas):
+    _, _cursor = Factura().get_facturas(session, None, 1)
+
+    _statements = capture(lambda: Factura().get_facturas(session, decode_cursor(_cursor), 1))
+
+    _assert_uses_index(database, _statements, "FROM facturas", "ix_facturas_fecha_id")
+
+
+def test_cierres_caja_pages_use_the_fecha_id_index(database, session, capture, facturas):
+    _statements = capture(lambda: CierreCaja().get_cierres_caja(session, [FECHA.isoformat(), 0], 10))
+
+    _assert_uses_index(database, _statements, "FROM cierres_caja", "ix_cierres_caja_fecha_id")
+
+
+def test_facturas_export_range_uses_the_fecha_id_index(database, session, capture, facturas):
+    _statements = capture(lambda: list(Factura().iter_export_rows(session, datetime(2024, 5, 1), datetime(2024, 5, 3))))
+
+    _assert_uses_index(database, _statements, "FROM facturas", "ix_facturas_fecha_id")
+
+
+def test_closing_up_to_hasta_uses_the_cierre_caja_id_fecha_index(database, session, capture, facturas):
+    _statements = capture(lambda: CierreCaja().create_cierre_caja(session, RequestCierreCaja(fecha=FECHA, hasta=FECHA)))
+
+    _assert_uses_index(database, _statements, "UPDATE facturas", "ix_facturas_cierre_caja_id_fecha")
+
+
+def test_upgrade_adds_the_hot_indexes_to_a_legacy_database(database):
+    _engine = database.get_engine()
+    with _engine.begin() as _connection:
+        for _indexes in HOT_INDEXES.values():
+            for _index in _indexes:
+                _connection.exec_driver_sql(f"DROP INDEX IF EXISTS {_index}")
+        _connection.execute(schema_version.delete())
+
+    assert upgrade(_engine) == [_version for _version, _, _ in MIGRATIONS]
+
+    _inspector = inspect(_engine)
+    for _table, _indexes in HOT_INDEXES.items():
+        assert _indexes <= {_index["name"] for _index in _inspector.get_indexes(_table)}
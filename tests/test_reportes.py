@@ -0,0 +1,107 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the sales reports against known facturas, around hour and day boundaries.
+"""
+import pytest
+
+from conftest import create_producto
+
+REPORTES = ["/administration/reportes/top-productos",
+            "/administration/reportes/ventas-por-hora",
+            "/administration/reportes/ventas-diarias"]
+
+
+@pytest.fixture
+def facturas(client, session):
+    """
+    Check out known facturas and return the ids of the productos Cafe (1.50) and Te (2.00).
+    """
+    _cafe = create_producto(session, "Cafe", 1.5).id
+    _te = create_producto(session, "Te", 2.0).id
+    for _fecha, _producto_id, _cantidad in (
+        ("2024-05-01T23:59:59", _cafe, 2),  # 3.00
+        ("2024-05-02T00:00:00", _te, 1),    # 2.00
+        ("2024-05-02T09:30:00", _cafe, 1),  # 1.50
+        ("2024-05-02T09:59:59", _te, 3),    # 6.00
+        ("2024-05-02T10:00:00", _cafe, 4),  # 6.00
+        ("2024-05-03T00:00:00", _cafe, 1),  # 1.50
+    ):
+        _response = client.post("/administration/checkout", json={
+            "fecha": _fecha, "items": [{"producto_id": _producto_id, "cantidad": _cantidad}]})
+        assert _response.status_code == 201, _response.text
+    return _cafe, _te
+
+
+def _get(client, path: str, **params):
+    _response = client.get(path, params=params)
+    assert _response.status_code == 200, _response.text
+    return _response.json()
+
+
+def test_ventas_por_hora_groups_by_hour_within_the_range(client, facturas):
+    _rows = _get(client, "/administration/reportes/ventas-por-hora",
+                 desde="2024-05-02T00:00:00", hasta="2024-05-02T23:59:59")
+
+    assert _rows == [{"hora": 0, "facturas": 1, "ingresos": 2.0},
+                     {"hora": 9, "facturas": 2, "ingresos": 7.5},
+                     {"hora": 10, "facturas": 1, "ingresos": 6.0}]
+
+
+def test_ventas_por_hora_range_is_inclusive(client, facturas):
+    _rows = _get(client, "/administration/reportes/ventas-por-hora",
+                 desde="2024-05-02T09:59:59", hasta="2024-05-02T10:00:00")
+
+    assert _rows == [{"hora": 9, "facturas": 1, "ingresos": 6.0},
+                     {"hora": 10, "facturas": 1, "ingresos": 6.0}]
+
+
+def test_ventas_diarias_groups_by_day(client, facturas):
+    _rows = _get(client, "/administration/reportes/ventas-diarias",
+                 desde="2024-05-01T00:00:00", hasta="2024-05-03T00:00:00")
+
+    assert _rows == [{"fecha": "2024-05-01", "facturas": 1, "ingresos": 3.0},
+                     {"fecha": "2024-05-02", "facturas": 4, "ingresos": 15.5},
+                     {"fecha": "2024-05-03", "facturas": 1, "ingresos": 1.5}]
+
+
+def test_ventas_diarias_excludes_facturas_past_hasta(client, facturas):
+    _rows = _get(client, "/administration/reportes/ventas-diarias",
+                 desde="2024-05-02T00:00:00", hasta="2024-05-02T23:59:59")
+
+    assert _rows == [{"fecha": "2024-05-02", "facturas": 4, "ingresos": 15.5}]
+
+
+def test_top_productos_counts_whole_days(client, facturas):
+    _cafe, _te = facturas
+
+    # Read from the daily rollup, so the times of desde and hasta do not cut the day
+    _rows = _get(client, "/administration/reportes/top-productos",
+                 desde="2024-05-02T12:00:00", hasta="2024-05-02T12:00:00")
+
+    assert _rows == [{"producto_id": _te, "nombre": "Te", "unidades": 4, "ingresos": 8.0},
+                     {"producto_id": _cafe, "nombre": "Cafe", "unidades": 5, "ingresos": 7.5}]
+
+
+def test_top_productos_orders_by_revenue_and_limits(client, facturas):
+    _cafe, _te = facturas
+
+    _rows = _get(client, "/administration/reportes/top-productos",
+                 desde="2024-05-01T00:00:00", hasta="2024-05-03T00:00:00", limit=1)
+
+    assert _rows == [{"producto_id": _cafe, "nombre": "Cafe", "unidades": 8, "ingresos": 12.0}]
+
+
+@pytest.mark.parametrize("path", REPORTES)
+def test_desde_after_hasta_is_rejected(client, path):
+    _response = client.get(path, params={"desde": "2024-05-02T00:00:01", "hasta": "2024-05-02T00:00:00"})
+
+    assert _response.status_code == 400
+    assert _response.json()["detail"] == "desde must not be after hasta"
+
+
+@pytest.mark.parametrize("path", REPORTES)
+def test_reports_require_authentication(app_client, path):
+    _response = app_client.get(path, params={"desde": "2024-05-02T00:00:00", "hasta": "2024-05-02T00:00:00"})
+
+    assert _response.status_code == 401
@@ -0,0 +1,56 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the caching headers of the product images.
+"""
+import os
+
+import pytest
+
+from config import IMAGES_DIR
+
+DIGEST = "ab" * 32
+
+
+@pytest.fixture
+def image_file():
+    """
+    Write a file of the given name into the images directory, removed after the test.
+    """
+    _paths = []
+
+    def _write(name: str) -> str:
+        os.makedirs(IMAGES_DIR, exist_ok=True)
+        _path = os.path.join(IMAGES_DIR, name)
+        with open(_path, "wb") as _out:
+            _out.write(b"image")
+        _paths.append(_path)
+        return f"/images/{name}"
+
+    yield _write
+    for _path in _paths:
+        os.remove(_path)
+
+
+@pytest.mark.parametrize("name", [f"{DIGEST}.png", f"{DIGEST}_160.webp"])
+def test_content_hashed_images_are_immutable(app_client, image_file, name):
+    _response = app_client.get(image_file(name))
+
+    assert _response.status_code == 200
+    assert _response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+
+@pytest.mark.parametrize("name", ["logo.png", f"{DIGEST[:-1]}.png", f"{DIGEST}_small.png"])
+def test_other_images_are_revalidated(app_client, image_file, name):
+    _response = app_client.get(image_file(name))
+
+    assert _response.status_code == 200
+    assert _response.headers["Cache-Control"] == "no-cache"
+    assert "ETag" in _response.headers
+
+
+@pytest.mark.parametrize("name", [".upload-1234", ".variant-1234", ".hidden.png"])
+def test_dot_files_are_not_served(app_client, image_file, name):
+    _response = app_client.get(image_file(name))
+
+    assert _response.status_code == 404
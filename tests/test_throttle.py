@@ -0,0 +1,100 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the login rate limiter.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import PASSWORD, USERNAME
+from modules.login.throttle import DatabaseBackend, login_throttle
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(login_throttle, "per_ip", 5)
+    monkeypatch.setattr(login_throttle, "per_username", 3)
+
+
+def _login(client, username: str = USERNAME, password: str = PASSWORD, ip: str | None = None):
+    _headers = {"X-Forwarded-For": ip} if ip else {}
+    return client.post("/login", data={"username": username, "password": password}, headers=_headers)
+
+
+def test_successful_logins_are_not_counted(client, limits):
+    for _ in range(10):
+        assert _login(client).status_code == 200
+
+
+@pytest.mark.parametrize("backend", [None, DatabaseBackend])
+def test_failed_logins_lock_the_username(client, limits, monkeypatch, backend):
+    if backend is not None:
+        monkeypatch.setattr(login_throttle, "backend", backend())
+    for _ in range(3):
+        assert _login(client, password="wrong").status_code == 401
+
+    _response = _login(client)
+
+    assert _response.status_code == 429
+    assert int(_response.headers["Retry-After"]) >= 1
+
+
+@pytest.mark.parametrize("backend", [None, DatabaseBackend])
+def test_concurrent_failed_logins_do_not_pass_the_limit(client, limits, monkeypatch, backend):
+    if backend is not None:
+        monkeypatch.setattr(login_throttle, "backend", backend())
+    _verified = []
+    _lock = threading.Lock()
+
+    async def _wrong_password(password, password_hash):
+        with _lock:
+            _verified.append(password)
+        # Keeps the verifications in flight while the other attempts arrive
+        await asyncio.sleep(0.1)
+        return False
+
+    monkeypatch.setattr("endpoints.operation.login.verify_password_async", _wrong_password)
+
+    with ThreadPoolExecutor(max_workers=8) as _executor:
+        _statuses = list(_executor.map(lambda _: _login(client, password="wrong").status_code, range(8)))
+
+    assert len(_verified) <= 3
+    assert sorted(_statuses) == [401] * len(_verified) + [429] * (8 - len(_verified))
+
+
+def test_successful_login_refunds_its_attempt(client, limits):
+    for _ in range(2):
+        assert _login(client, password="wrong").status_code == 401
+    for _ in range(5):
+        assert _login(client).status_code == 200
+
+    assert _login(client, password="wrong").status_code == 401
+    assert _login(client).status_code == 429
+
+
+def test_failed_logins_lock_the_client_ip(client, limits):
+    for _number in range(5):
+        assert _login(client, username=f"unknown-{_number}").status_code == 401
+
+    assert _login(client).status_code == 429
+
+
+def test_client_ip_is_read_from_the_configured_proxy_header(client, limits, monkeypatch):
+    monkeypatch.setattr("modules.login.throttle.LOGIN_CLIENT_IP_HEADER", "X-Forwarded-For")
+    for _number in range(5):
+        assert _login(client, username=f"unknown-{_number}", ip="10.0.0.1").status_code == 401
+
+    assert _login(client, ip="10.0.0.2").status_code == 200
+    assert _login(client, ip="10.0.0.1").status_code == 429
+    # Entries before the one added by the proxy are sent by the client
+    assert _login(client, ip="10.0.0.3, 10.0.0.1").status_code == 429
+
+
+def test_proxy_header_is_ignored_unless_configured(client, limits):
+    for _number in range(5):
+        assert _login(client, username=f"unknown-{_number}", ip=f"10.0.0.{_number}").status_code == 401
+
+    assert _login(client, ip="10.0.0.9").status_code == 429
@@ -0,0 +1,92 @@
+"""
+Team: MSG - AXIANS
+
+Tests of the ventas_diarias rollup: the rows maintained incrementally by checkout and
+cierre de caja must be the ones rebuilt from the facturas.
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+import manage
+from conftest import create_producto
+from databases.axion.models.primaries.VentaDiaria import VentaDiaria
+
+
+@pytest.fixture
+def productos(client, session):
+    """
+    Check out facturas on both sides of UTC midnights and return the ids of Cafe and Te.
+    """
+    _cafe = create_producto(session, "Cafe", 1.5).id
+    _te = create_producto(session, "Te", 2.0).id
+    for _fecha, _items in (
+        ("2024-05-01T10:00:00", [(_cafe, 2)]),
+        # 2024-05-01T23:30:00 in UTC
+        ("2024-05-02T01:30:00+02:00", [(_te, 1)]),
+        ("2024-05-02T09:00:00", [(_cafe, 1), (_te, 2)]),
+        # 2024-05-03T02:30:00 in UTC
+        ("2024-05-02T23:30:00-03:00", [(_cafe, 3)]),
+    ):
+        _response = client.post("/administration/checkout", json={
+            "fecha": _fecha,
+            "items": [{"producto_id": _producto_id, "cantidad": _cantidad} for _producto_id, _cantidad in _items]})
+        assert _response.status_code == 201, _response.text
+    return _cafe, _te
+
+
+def _rollup(session) -> list:
+    session.expire_all()
+    return session.execute(select(
+        VentaDiaria.fecha, VentaDiaria.producto_id, VentaDiaria.unidades, VentaDiaria.ingresos,
+        VentaDiaria.unidades_cerradas, VentaDiaria.ingresos_cerrados,
+    ).order_by(VentaDiaria.fecha, VentaDiaria.producto_id)).all()
+
+
+def test_checkout_buckets_facturas_by_utc_day(session, productos):
+    _cafe, _te = productos
+
+    assert _rollup(session) == [
+        (date(2024, 5, 1), _cafe, 2, Decimal("3.00"), 0, Decimal("0.00")),
+        (date(2024, 5, 1), _te, 1, Decimal("2.00"), 0, Decimal("0.00")),
+        (date(2024, 5, 2), _cafe, 1, Decimal("1.50"), 0, Decimal("0.00")),
+        (date(2024, 5, 2), _te, 2, Decimal("4.00"), 0, Decimal("0.00")),
+        (date(2024, 5, 3), _cafe, 3, Decimal("4.50"), 0, Decimal("0.00")),
+    ]
+
+
+def test_cierre_caja_moves_its_facturas_to_the_closed_columns(client, session, productos):
+    _cafe, _te = productos
+
+    _response = client.post("/administration/cierre-caja",
+                            json={"fecha": "2024-05-02T12:00:00", "hasta": "2024-05-02T12:00:00"})
+    assert _response.status_code == 200, _response.text
+
+    assert _rollup(session) == [
+        (date(2024, 5, 1), _cafe, 2, Decimal("3.00"), 2, Decimal("3.00")),
+        (date(2024, 5, 1), _te, 1, Decimal("2.00"), 1, Decimal("2.00")),
+        (date(2024, 5, 2), _cafe, 1, Decimal("1.50"), 1, Decimal("1.50")),
+        (date(2024, 5, 2), _te, 2, Decimal("4.00"), 2, Decimal("4.00")),
+        (date(2024, 5, 3), _cafe, 3, Decimal("4.50"), 0, Decimal("0.00")),
+    ]
+
+
+def test_rebuild_reproduces_the_incremental_rollup(client, session, productos):
+    _response = client.post("/administration/cierre-caja",
+                            json={"fecha": "2024-05-02T12:00:00", "hasta": "2024-05-02T12:00:00"})
+    assert _response.status_code == 200, _response.text
+    _incremental = _rollup(session)
+
+    manage.main(["rebuild-ventas-diarias"])
+
+    assert _rollup(session) == _incremental
+
+
+def test_rebuild_of_a_range_leaves_other_days_untouched(session, productos):
+    _incremental = _rollup(session)
+
+    manage.main(["rebuild-ventas-diarias", "--desde", "2024-05-02", "--hasta", "2024-05-03"])
+
+    assert _rollup(session) == _incremental